@@ -1,11 +1,21 @@
 """
 Configuración de la base de datos PostgreSQL con Supabase
+Incluye un pool de conexiones reutilizables para evitar abrir una conexión
+(TCP + TLS + autenticación) por cada consulta, y una capa asincrona para
+usar la base de datos desde rutas async sin bloquear el event loop
 """
 import os
+import time
+import threading
+import functools
+from collections import deque
 from dotenv import load_dotenv
+import anyio
 import psycopg2
+import psycopg2.extensions
 from psycopg2.extras import RealDictCursor
 from contextlib import contextmanager
+from typing import Any, Callable, Optional, TypeVar
 
 load_dotenv()
 
@@ -21,6 +31,282 @@ DATABASE_CONFIG = {
 # Alternativa: usar DATABASE_URL directamente
 DATABASE_URL = os.getenv('DATABASE_URL')
 
+# Configuración del pool de conexiones
+POOL_CONFIG = {
+    'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),  # Conexiones abiertas al iniciar
+    'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),  # Conexiones persistentes maximas
+    'max_overflow': int(os.getenv('DB_POOL_MAX_OVERFLOW', '5')),  # Conexiones temporales extra en picos
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),  # Segundos de espera por una conexion libre
+    'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),  # Segundos antes de reciclar una conexion
+    'health_check_after': float(os.getenv('DB_POOL_HEALTH_CHECK_AFTER', '30')),  # Segundos inactiva antes de validarla
+}
+
+
+class PoolTimeoutError(Exception):
+    """No se obtuvo una conexion libre del pool dentro del tiempo de espera"""
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones PostgreSQL seguro para hilos
+
+    - Mantiene entre min_size y max_size conexiones persistentes
+    - Permite hasta max_overflow conexiones temporales que se cierran al devolverse
+    - Si no hay conexiones disponibles espera hasta timeout segundos
+    - Recicla conexiones que superan max_lifetime
+    - Valida con SELECT 1 las conexiones inactivas mas de health_check_after segundos
+    """
+
+    def __init__(
+        self,
+        min_size: int = 2,
+        max_size: int = 10,
+        max_overflow: int = 5,
+        timeout: float = 10.0,
+        max_lifetime: float = 1800.0,
+        health_check_after: float = 30.0
+    ):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (conexion, creada_en, ultimo_uso)
+        self._created_at = {}  # id(conexion) -> momento de creacion
+        self._total = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+
+        self._stats = {
+            "adquisiciones": 0,
+            "esperas": 0,
+            "timeouts": 0,
+            "conexiones_creadas": 0,
+            "conexiones_descartadas": 0,
+            "chequeos_fallidos": 0,
+        }
+
+    def open(self):
+        """Abre las conexiones minimas del pool"""
+        for _ in range(self.min_size):
+            with self._cond:
+                if self._total >= self.min_size:
+                    break
+                self._total += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append((conn, self._created_at[id(conn)], time.monotonic()))
+                self._cond.notify()
+
+    def getconn(self, timeout: Optional[float] = None):
+        """
+        Obtiene una conexion del pool
+
+        Args:
+            timeout: Segundos maximos de espera (por defecto el del pool)
+
+        Returns:
+            Conexion psycopg2 lista para usarse
+
+        Raises:
+            PoolTimeoutError: Si no se libera ninguna conexion a tiempo
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            candidate = None
+            must_create = False
+
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("El pool de conexiones esta cerrado")
+
+                waited = False
+                while not self._idle and self._total >= self.max_size + self.max_overflow:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"No hay conexiones disponibles despues de {timeout:.1f} segundos"
+                        )
+                    if not waited:
+                        self._stats["esperas"] += 1
+                        waited = True
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+                    if self._closed:
+                        raise RuntimeError("El pool de conexiones esta cerrado")
+
+                if self._idle:
+                    candidate = self._idle.pop()  # LIFO: la conexion mas reciente sigue "caliente"
+                else:
+                    self._total += 1
+                    must_create = True
+                self._in_use += 1
+
+            if must_create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._in_use -= 1
+                        self._cond.notify()
+                    raise
+                return self._checkout(conn)
+
+            conn, created_at, last_used = candidate
+            now = time.monotonic()
+
+            if now - created_at > self.max_lifetime:
+                self._discard(conn, counted_in_use=True)
+                continue
+
+            if conn.closed or (now - last_used > self.health_check_after and not self._is_healthy(conn)):
+                with self._cond:
+                    self._stats["chequeos_fallidos"] += 1
+                self._discard(conn, counted_in_use=True)
+                continue
+
+            return self._checkout(conn)
+
+    def putconn(self, conn, discard: bool = False):
+        """
+        Devuelve una conexion al pool
+
+        Args:
+            conn: Conexion obtenida con getconn
+            discard: Forzar el cierre de la conexion (p.ej. si quedo en mal estado)
+        """
+        if not discard and not conn.closed:
+            status = conn.get_transaction_status()
+            if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                discard = True
+            elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    discard = True
+
+        created_at = self._created_at.get(id(conn), 0)
+        expired = time.monotonic() - created_at > self.max_lifetime
+
+        with self._cond:
+            # Las conexiones de desborde se cierran solo cuando nadie las espera
+            overflow = self._total > self.max_size and self._waiting == 0
+            if discard or conn.closed or expired or overflow or self._closed:
+                self._in_use -= 1
+                self._total -= 1
+                self._forget(conn)
+                self._cond.notify()
+                close = True
+            else:
+                self._in_use -= 1
+                self._idle.append((conn, created_at, time.monotonic()))
+                self._cond.notify()
+                close = False
+
+        if close:
+            self._close_quietly(conn)
+
+    def close(self):
+        """Cierra todas las conexiones inactivas; las que esten en uso se cierran al devolverse"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._total -= len(idle)
+            for conn, _, _ in idle:
+                self._forget(conn)
+            self._cond.notify_all()
+
+        for conn, _, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self) -> dict:
+        """
+        Estadisticas del pool
+
+        Returns:
+            Diccionario con tamaños configurados, uso actual y contadores acumulados
+        """
+        with self._cond:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "max_overflow": self.max_overflow,
+                "conexiones_totales": self._total,
+                "conexiones_en_uso": self._in_use,
+                "conexiones_libres": len(self._idle),
+                "solicitudes_esperando": self._waiting,
+                **self._stats,
+            }
+
+    def _connect(self):
+        conn = get_connection()
+        self._created_at[id(conn)] = time.monotonic()
+        with self._cond:
+            self._stats["conexiones_creadas"] += 1
+        return conn
+
+    def _checkout(self, conn):
+        with self._cond:
+            self._stats["adquisiciones"] += 1
+        return conn
+
+    def _discard(self, conn, counted_in_use: bool = False):
+        with self._cond:
+            self._total -= 1
+            if counted_in_use:
+                self._in_use -= 1
+            self._forget(conn)
+            self._cond.notify()
+        self._close_quietly(conn)
+
+    def _forget(self, conn):
+        self._created_at.pop(id(conn), None)
+        self._stats["conexiones_descartadas"] += 1
+
+    @staticmethod
+    def _is_healthy(conn) -> bool:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+
+# Pool global (se inicializa en el ciclo de vida de la aplicacion)
+_pool: Optional[ConnectionPool] = None
+
+# Limita los hilos que ejecutan trabajo de base de datos al numero de conexiones posibles
+_db_limiter: Optional[anyio.CapacityLimiter] = None
+
+T = TypeVar("T")
+
 
 def get_connection():
     """
@@ -37,26 +323,147 @@ def get_connection():
         raise
 
 
+def init_pool() -> ConnectionPool:
+    """
+    Inicializa el pool global de conexiones
+
+    Returns:
+        Pool de conexiones inicializado
+    """
+    global _pool
+    if _pool is None:
+        pool = ConnectionPool(**POOL_CONFIG)
+        try:
+            pool.open()
+        except Exception as e:
+            print(f"No se pudieron abrir las conexiones iniciales del pool: {e}")
+        _pool = pool
+    return _pool
+
+
+def close_pool():
+    """Cierra el pool global de conexiones"""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+def get_pool_stats() -> Optional[dict]:
+    """
+    Estadisticas del pool global
+
+    Returns:
+        Estadisticas del pool o None si no esta inicializado
+    """
+    return _pool.stats() if _pool is not None else None
+
+
 @contextmanager
 def get_db_cursor():
     """
     Context manager para obtener un cursor de la base de datos
+    Usa una conexion del pool si esta inicializado; si no, abre una conexion directa
     Uso:
         with get_db_cursor() as cursor:
             cursor.execute("SELECT * FROM productos")
             results = cursor.fetchall()
     """
-    conn = get_connection()
+    pool = _pool
+    conn = pool.getconn() if pool is not None else get_connection()
     cursor = conn.cursor()
+    broken = False
     try:
         yield cursor
         conn.commit()
     except Exception as e:
-        conn.rollback()
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            broken = True
         raise e
     finally:
         cursor.close()
-        conn.close()
+        if pool is not None:
+            pool.putconn(conn, discard=broken)
+        else:
+            conn.close()
+
+
+@contextmanager
+def get_db_server_cursor(nombre: str, itersize: int = 1000, solo_lectura: bool = True):
+    """
+    Context manager para un cursor del servidor (DECLARE ... CURSOR)
+    Las filas se traen en bloques de itersize al iterar, en lugar de cargar
+    todo el resultado en memoria como un cursor normal
+    Uso:
+        with get_db_server_cursor("reporte_ventas") as cursor:
+            cursor.execute("SELECT * FROM ventas")
+            for venta in cursor:
+                ...
+
+    Args:
+        nombre: Nombre del cursor en el servidor
+        itersize: Filas por viaje al servidor
+        solo_lectura: Abrir la transaccion como REPEATABLE READ READ ONLY, para que
+            todas las consultas del bloque vean la misma foto de los datos
+    """
+    pool = _pool
+    conn = pool.getconn() if pool is not None else get_connection()
+    broken = False
+    try:
+        if solo_lectura:
+            with conn.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        cursor = conn.cursor(name=nombre)
+        cursor.itersize = itersize
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+        conn.commit()
+    except Exception as e:
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            broken = True
+        raise e
+    finally:
+        if pool is not None:
+            pool.putconn(conn, discard=broken)
+        else:
+            conn.close()
+
+
+def _get_db_limiter() -> anyio.CapacityLimiter:
+    global _db_limiter
+    if _db_limiter is None:
+        _db_limiter = anyio.CapacityLimiter(POOL_CONFIG['max_size'] + POOL_CONFIG['max_overflow'])
+    return _db_limiter
+
+
+async def run_in_db_thread(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Ejecuta una funcion bloqueante de base de datos (p.ej. un metodo de controlador)
+    en un hilo de trabajo, sin bloquear el event loop
+
+    La cantidad de hilos simultaneos se limita al tamaño maximo del pool, de modo que
+    las solicitudes en exceso esperan en el event loop y no ocupando hilos.
+
+    Uso:
+        return await run_in_db_thread(VentaController.crear_venta, venta)
+
+    Args:
+        func: Funcion sincrona a ejecutar
+        *args, **kwargs: Argumentos de la funcion
+
+    Returns:
+        El resultado de la funcion
+    """
+    return await anyio.to_thread.run_sync(
+        functools.partial(func, *args, **kwargs),
+        limiter=_get_db_limiter()
+    )
 
 
 def test_connection():
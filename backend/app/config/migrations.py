@@ -0,0 +1,360 @@
+"""
+Migraciones versionadas del esquema
+Aplica en orden los scripts de backend/migrations y registra cada version en la
+tabla schema_migrations, para que el esquema y los indices viajen con el codigo
+
+- NNN_nombre.sql: script de subida (version = nombre del archivo sin extension)
+- NNN_nombre.down.sql: script de bajada (opcional)
+
+Los scripts sin prefijo NNN_ (add_pagado_to_servicios.sql) y 000_init_database.sql
+son heredados y no se aplican automaticamente: el esquema base se crea a mano
+(database_production.sql y add_pagado_to_servicios.sql) antes de usar la herramienta.
+
+Uso desde la linea de comandos: ver backend/migrate.py
+"""
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+from app.config.database import get_db_cursor
+
+# Carpeta con los scripts de migracion
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent.parent / "migrations"
+
+# Clave del advisory lock que serializa las migraciones entre procesos/workers
+MIGRATIONS_LOCK_KEY = 7301_2026
+
+SUFIJO_BAJADA = ".down.sql"
+
+# Nombre de los scripts versionados (NNN_nombre.sql)
+PATRON_VERSION = re.compile(r"^\d{3}_")
+
+# 000_init_database.sql crea el esquema completo e inserta un usuario admin con la
+# contrasena en texto plano: solo sirve como referencia para una instalacion manual
+SCRIPTS_EXCLUIDOS = {"000_init_database"}
+
+
+class MigrationError(Exception):
+    """Error al aplicar o revertir una migracion"""
+
+
+class Migracion(NamedTuple):
+    """Script de migracion encontrado en MIGRATIONS_DIR"""
+    version: str
+    subida: Path
+    bajada: Optional[Path]
+    checksum: str
+
+
+class ConsultaIndexada(NamedTuple):
+    """Consulta frecuente y el indice que su plan debe usar"""
+    nombre: str
+    sql: str
+    params: tuple
+    indice: str
+
+
+# Predicados frecuentes de app/controllers y app/utils
+CONSULTAS_INDEXADAS = (
+    ConsultaIndexada(
+        "productos por categoria",
+        "SELECT * FROM productos WHERE categoria = %s",
+        ("Consolas",),
+        "idx_productos_categoria",
+    ),
+    ConsultaIndexada(
+        "listado de productos (cursor)",
+        "SELECT * FROM productos WHERE (fecha_registro, id_producto) < (NOW(), 0) "
+        "ORDER BY fecha_registro DESC, id_producto DESC LIMIT 50",
+        (),
+        "idx_productos_fecha_registro",
+    ),
+    ConsultaIndexada(
+        "ventas por rango de fecha (cursor)",
+        "SELECT * FROM ventas WHERE fecha_venta >= %s AND fecha_venta < %s "
+        "ORDER BY fecha_venta DESC, id_venta DESC LIMIT 50",
+        ("2024-01-01", "2024-01-02"),
+        "idx_ventas_fecha_id",
+    ),
+    ConsultaIndexada(
+        "ventas por cliente",
+        "SELECT * FROM ventas WHERE id_cliente = %s",
+        (1,),
+        "idx_ventas_cliente",
+    ),
+    ConsultaIndexada(
+        "detalle de una venta",
+        "SELECT * FROM detalle_ventas WHERE id_venta = ANY(%s)",
+        ([1, 2, 3],),
+        "idx_detalle_ventas_venta",
+    ),
+    ConsultaIndexada(
+        "servicios por estado",
+        "SELECT * FROM servicios WHERE estado = %s",
+        ("pendiente",),
+        "idx_servicios_estado",
+    ),
+    ConsultaIndexada(
+        "intentos de login por IP",
+        "SELECT COUNT(*) FROM login_attempts WHERE ip_address = %s AND fecha_intento > NOW() - INTERVAL '15 minutes'",
+        ("127.0.0.1",),
+        "idx_login_attempts_ip_fecha",
+    ),
+    ConsultaIndexada(
+        "refresh token por hash",
+        "SELECT * FROM refresh_tokens WHERE token_hash = %s AND revocado = FALSE",
+        ("x" * 64,),
+        "idx_refresh_tokens_token_hash",
+    ),
+    ConsultaIndexada(
+        "auditoria por fecha",
+        "SELECT * FROM auditoria WHERE fecha_accion >= %s ORDER BY fecha_accion DESC LIMIT 100",
+        ("2024-01-01",),
+        "idx_auditoria_fecha",
+    ),
+)
+
+
+def descubrir_migraciones(directorio: Path = MIGRATIONS_DIR) -> List[Migracion]:
+    """
+    Lista los scripts de subida ordenados por version
+    (solo NNN_nombre.sql, sin los scripts heredados de SCRIPTS_EXCLUIDOS)
+
+    Returns:
+        Migraciones con su script de bajada (si existe) y checksum
+    """
+    migraciones = []
+    for subida in sorted(directorio.glob("*.sql"), key=lambda p: p.name):
+        if subida.name.endswith(SUFIJO_BAJADA):
+            continue
+        if not PATRON_VERSION.match(subida.name) or subida.stem in SCRIPTS_EXCLUIDOS:
+            continue
+        bajada = subida.with_name(subida.stem + SUFIJO_BAJADA)
+        migraciones.append(Migracion(
+            version=subida.stem,
+            subida=subida,
+            bajada=bajada if bajada.exists() else None,
+            checksum=hashlib.sha256(subida.read_bytes()).hexdigest(),
+        ))
+    return migraciones
+
+
+def _asegurar_tabla(cursor) -> None:
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(255) PRIMARY KEY,
+            checksum VARCHAR(64) NOT NULL,
+            duracion_ms INTEGER,
+            aplicada_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+
+def _bloquear(cursor) -> None:
+    """Serializa las migraciones hasta el fin de la transaccion (varios workers al iniciar)"""
+    cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATIONS_LOCK_KEY,))
+
+
+def _aplicadas(cursor) -> Dict[str, dict]:
+    cursor.execute("SELECT version, checksum, aplicada_en FROM schema_migrations ORDER BY version")
+    return {fila["version"]: dict(fila) for fila in cursor.fetchall()}
+
+
+def _ultima_aplicada(cursor, versiones: set) -> Optional[str]:
+    """Ultima version aplicada (por fecha de aplicacion) entre las versiones indicadas"""
+    cursor.execute(
+        "SELECT version FROM schema_migrations ORDER BY aplicada_en DESC, version DESC"
+    )
+    for fila in cursor.fetchall():
+        if fila["version"] in versiones:
+            return fila["version"]
+    return None
+
+
+def obtener_aplicadas() -> Dict[str, dict]:
+    """
+    Versiones registradas en schema_migrations
+
+    Returns:
+        Diccionario version -> {version, checksum, aplicada_en}
+    """
+    with get_db_cursor() as cursor:
+        _asegurar_tabla(cursor)
+        return _aplicadas(cursor)
+
+
+def estado() -> List[dict]:
+    """
+    Estado de cada migracion
+
+    Returns:
+        Lista de {version, aplicada, aplicada_en, modificada, reversible};
+        modificada indica que el archivo cambio despues de aplicarse
+    """
+    aplicadas = obtener_aplicadas()
+    resultado = []
+    for migracion in descubrir_migraciones():
+        registro = aplicadas.get(migracion.version)
+        resultado.append({
+            "version": migracion.version,
+            "aplicada": registro is not None,
+            "aplicada_en": registro["aplicada_en"] if registro else None,
+            "modificada": bool(registro) and registro["checksum"] != migracion.checksum,
+            "reversible": migracion.bajada is not None,
+        })
+    return resultado
+
+
+def aplicar(hasta: Optional[str] = None) -> List[str]:
+    """
+    Aplica las migraciones pendientes en orden, cada una en su propia transaccion
+
+    Args:
+        hasta: Ultima version a aplicar (por defecto todas)
+
+    Returns:
+        Versiones aplicadas
+
+    Raises:
+        MigrationError: Si una migracion falla (las anteriores quedan aplicadas)
+    """
+    migraciones = descubrir_migraciones()
+    if hasta is not None and hasta not in {m.version for m in migraciones}:
+        raise MigrationError(f"Version de migracion desconocida: {hasta}")
+
+    aplicadas = []
+    for migracion in migraciones:
+        try:
+            with get_db_cursor() as cursor:
+                _asegurar_tabla(cursor)
+                _bloquear(cursor)
+                # Otro proceso pudo aplicarla mientras se esperaba el lock
+                if migracion.version not in _aplicadas(cursor):
+                    inicio = time.perf_counter()
+                    cursor.execute(migracion.subida.read_text(encoding="utf-8"))
+                    cursor.execute(
+                        "INSERT INTO schema_migrations (version, checksum, duracion_ms) VALUES (%s, %s, %s)",
+                        (migracion.version, migracion.checksum, int((time.perf_counter() - inicio) * 1000))
+                    )
+                    aplicadas.append(migracion.version)
+        except Exception as e:
+            raise MigrationError(f"Error aplicando {migracion.version}: {e}") from e
+
+        if migracion.version == hasta:
+            break
+
+    return aplicadas
+
+
+def revertir(pasos: int = 1) -> List[str]:
+    """
+    Revierte las ultimas migraciones aplicadas con sus scripts de bajada, en el
+    orden inverso al que se aplicaron (los registros de scripts que ya no forman
+    parte de la secuencia, como los heredados, se ignoran)
+
+    Args:
+        pasos: Cantidad de migraciones a revertir
+
+    Returns:
+        Versiones revertidas
+
+    Raises:
+        MigrationError: Si una migracion no tiene script de bajada o falla
+    """
+    por_version = {m.version: m for m in descubrir_migraciones()}
+    revertidas = []
+
+    for _ in range(pasos):
+        with get_db_cursor() as cursor:
+            _asegurar_tabla(cursor)
+            _bloquear(cursor)
+            version = _ultima_aplicada(cursor, set(por_version))
+            if version is None:
+                break
+
+            migracion = por_version[version]
+            if migracion.bajada is None:
+                raise MigrationError(f"La migracion {version} no tiene script de bajada")
+
+            try:
+                cursor.execute(migracion.bajada.read_text(encoding="utf-8"))
+                cursor.execute("DELETE FROM schema_migrations WHERE version = %s", (version,))
+            except Exception as e:
+                raise MigrationError(f"Error revirtiendo {version}: {e}") from e
+        revertidas.append(version)
+
+    return revertidas
+
+
+def marcar_aplicadas(hasta: str) -> List[str]:
+    """
+    Registra migraciones como aplicadas sin ejecutarlas (bases de datos creadas
+    antes de schema_migrations, con los scripts ejecutados a mano)
+
+    Args:
+        hasta: Ultima version ya presente en la base de datos
+
+    Returns:
+        Versiones registradas
+    """
+    migraciones = descubrir_migraciones()
+    if hasta not in {m.version for m in migraciones}:
+        raise MigrationError(f"Version de migracion desconocida: {hasta}")
+
+    registradas = []
+    with get_db_cursor() as cursor:
+        _asegurar_tabla(cursor)
+        _bloquear(cursor)
+        existentes = _aplicadas(cursor)
+        for migracion in migraciones:
+            if migracion.version not in existentes:
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, checksum) VALUES (%s, %s)",
+                    (migracion.version, migracion.checksum)
+                )
+                registradas.append(migracion.version)
+            if migracion.version == hasta:
+                break
+
+    return registradas
+
+
+def _indices_del_plan(nodo: dict) -> set:
+    """Nombres de indice usados en un nodo del plan de EXPLAIN (FORMAT JSON) y sus hijos"""
+    indices = {nodo["Index Name"]} if "Index Name" in nodo else set()
+    for hijo in nodo.get("Plans", []):
+        indices |= _indices_del_plan(hijo)
+    return indices
+
+
+def verificar_indices() -> List[dict]:
+    """
+    Comprueba con EXPLAIN que las consultas frecuentes pueden usar su indice
+
+    Los sequential scans se desactivan durante la verificacion: con tablas pequeñas
+    el planificador los prefiere aunque el indice exista, y lo que interesa es que
+    el indice exista y sea aplicable al predicado.
+
+    Returns:
+        Lista de {consulta, indice, usado, indices_plan}
+    """
+    resultados = []
+    with get_db_cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        for consulta in CONSULTAS_INDEXADAS:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {consulta.sql}", consulta.params or None)
+            plan = cursor.fetchone()["QUERY PLAN"]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            indices = _indices_del_plan(plan[0]["Plan"])
+            resultados.append({
+                "consulta": consulta.nombre,
+                "indice": consulta.indice,
+                "usado": consulta.indice in indices,
+                "indices_plan": sorted(indices),
+            })
+    return resultados
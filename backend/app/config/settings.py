@@ -2,6 +2,7 @@
 Configuración general de la aplicación
 """
 import os
+import tempfile
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
@@ -32,12 +33,69 @@ class Settings(BaseSettings):
     db_user: str = os.getenv("DB_USER", "postgres")
     db_password: str = os.getenv("DB_PASSWORD", "")
     db_port: str = os.getenv("DB_PORT", "5432")
+    # Aplicar migraciones pendientes (backend/migrations) al iniciar
+    db_migrate_on_startup: bool = os.getenv("DB_MIGRATE_ON_STARTUP", "False") == "True"
+    # Invalidacion de caches entre procesos (LISTEN/NOTIFY). Necesita una conexion
+    # directa (el transaction pooler, puerto 6543, no admite LISTEN); vacio = desactivado
+    database_listen_url: str = os.getenv("DATABASE_LISTEN_URL", "")
+    notify_reconnect_seconds: float = float(os.getenv("NOTIFY_RECONNECT_SECONDS", "5"))
 
     # Seguridad
     secret_key: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     algorithm: str = os.getenv("ALGORITHM", "HS256")
     access_token_expire_minutes: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
+    # Cache del usuario autenticado (por proceso)
+    user_cache_ttl_seconds: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+    user_cache_max_size: int = int(os.getenv("USER_CACHE_MAX_SIZE", "1024"))
+
+    # Cache del catalogo de productos (por proceso): productos por id y listados por filtros
+    product_cache_ttl_seconds: int = int(os.getenv("PRODUCT_CACHE_TTL_SECONDS", "30"))
+    product_cache_max_size: int = int(os.getenv("PRODUCT_CACHE_MAX_SIZE", "2048"))
+    product_list_cache_max_size: int = int(os.getenv("PRODUCT_LIST_CACHE_MAX_SIZE", "256"))
+
+    # Solicitudes condicionales (ETag): segundos maximos que un ETag sigue vigente
+    # (limita cuanto tarda en verse un cambio hecho por otro proceso)
+    etag_window_seconds: int = int(os.getenv("ETAG_WINDOW_SECONDS", "30"))
+
+    # Compresion gzip de respuestas (bytes minimos para comprimir / nivel 1-9)
+    gzip_minimum_size: int = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+    gzip_level: int = int(os.getenv("GZIP_LEVEL", "6"))
+
+    # Pool de hashing de contrasenas (bcrypt)
+    password_hash_workers: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    password_hash_max_queue: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+    # Escritura de auditoria por lotes
+    audit_queue_max: int = int(os.getenv("AUDIT_QUEUE_MAX", "10000"))
+    audit_batch_size: int = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+    audit_flush_interval: float = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+    audit_queue_policy: str = os.getenv("AUDIT_QUEUE_POLICY", "sincrona")
+
+    # Rate limiting de login: memoria (por proceso), local (almacen simulado) o redis
+    rate_limit_backend: str = os.getenv("RATE_LIMIT_BACKEND", "memoria")
+    rate_limit_redis_url: str = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+
+    # Generacion de reportes (PDF): reportes simultaneos y MB en memoria antes de pasar a disco
+    report_workers: int = int(os.getenv("REPORT_WORKERS", "2"))
+    report_spool_max_mb: int = int(os.getenv("REPORT_SPOOL_MAX_MB", "8"))
+    # Exportaciones CSV/NDJSON simultaneas
+    export_max_concurrent: int = int(os.getenv("EXPORT_MAX_CONCURRENT", "2"))
+    # Cache en disco de reportes generados y trabajos recordados por proceso
+    report_cache_dir: str = os.getenv(
+        "REPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "playzone_reportes")
+    )
+    report_cache_max_mb: int = int(os.getenv("REPORT_CACHE_MAX_MB", "200"))
+    report_jobs_max: int = int(os.getenv("REPORT_JOBS_MAX", "200"))
+
+    # Eventos en tiempo real (SSE /api/eventos): clientes conectados por proceso,
+    # eventos pendientes por cliente, intervalo del heartbeat y duracion maxima de
+    # cada conexion (el navegador reconecta solo; permite apagar el servidor sin esperar)
+    events_max_clients: int = int(os.getenv("EVENTS_MAX_CLIENTS", "200"))
+    events_queue_max: int = int(os.getenv("EVENTS_QUEUE_MAX", "100"))
+    events_heartbeat_seconds: float = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+    events_max_stream_seconds: float = float(os.getenv("EVENTS_MAX_STREAM_SECONDS", "300"))
+
     # CORS
     allowed_origins: str = "http://localhost:5500,http://127.0.0.1:5500,http://localhost:3000"
 
@@ -6,6 +6,10 @@ from .producto_controller import ProductoController
 from .cliente_controller import ClienteController
 from .venta_controller import VentaController
 from .servicio_controller import ServicioController
+from .dashboard_controller import DashboardController
+from .busqueda_controller import BusquedaController
+from .reporte_controller import ReporteController
+from .exportacion_controller import ExportacionController
 
 __all__ = [
     "AuthController",
@@ -13,4 +17,8 @@ __all__ = [
     "ClienteController",
     "VentaController",
     "ServicioController",
+    "DashboardController",
+    "BusquedaController",
+    "ReporteController",
+    "ExportacionController",
 ]
@@ -8,11 +8,12 @@ from typing import Optional
 from fastapi import HTTPException, status
 from app.models.usuario import UsuarioLogin, UsuarioCreate, UsuarioResponse, Token
 from app.models.security import TokenPair
-from app.utils.security import verify_password, create_access_token, hash_password
+from app.utils.security import create_access_token, hash_password_async, verify_password_async
 from app.utils.rate_limiter import RateLimiter
 from app.utils.refresh_token import RefreshTokenManager
 from app.utils.audit import AuditLogger
-from app.config.database import get_db_cursor
+from app.middleware.auth import invalidar_usuario_cache
+from app.config.database import get_db_cursor, run_in_db_thread
 from app.config.settings import settings
 from app.services.email_service import email_service
 import secrets
@@ -23,13 +24,121 @@ class AuthController:
     """Controlador para operaciones de autenticacion"""
 
     @staticmethod
-    def login(usuario_login: UsuarioLogin, ip_address: str = "0.0.0.0", user_agent: Optional[str] = None) -> dict:
+    def _registrar_fallo_login(
+        username: str,
+        ip_address: str,
+        user_agent: Optional[str],
+        razon_fallo: str,
+        razon_auditoria: Optional[str] = None
+    ) -> None:
+        """
+        Registra un intento de login fallido (rate limiting y, opcionalmente, auditoria)
+
+        Args:
+            username: Usuario que intento iniciar sesion
+            ip_address: Direccion IP del cliente
+            user_agent: User agent del navegador
+            razon_fallo: Razon guardada en login_attempts
+            razon_auditoria: Razon guardada en auditoria (None = no auditar)
+        """
+        RateLimiter.registrar_intento(
+            username,
+            ip_address,
+            exitoso=False,
+            razon_fallo=razon_fallo,
+            user_agent=user_agent
+        )
+        if razon_auditoria is not None:
+            AuditLogger.log_login(
+                username,
+                exitoso=False,
+                ip_address=ip_address,
+                user_agent=user_agent,
+                razon=razon_auditoria
+            )
+
+    @staticmethod
+    def _buscar_usuario_login(username: str) -> Optional[dict]:
+        """Obtiene el usuario que intenta iniciar sesion"""
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT id_usuario, username, email, password, activo, eliminado, bloqueado_hasta
+                FROM usuarios
+                WHERE username = %s
+                """,
+                (username,)
+            )
+            return cursor.fetchone()
+
+    @staticmethod
+    def _completar_login(
+        user: dict,
+        nuevo_hash: Optional[str],
+        ip_address: str,
+        user_agent: Optional[str]
+    ) -> str:
+        """
+        Persiste un login exitoso en una sola transacción
+
+        En la misma transacción se actualiza el usuario (última sesión, desbloqueo y,
+        si corresponde, el hash bcrypt de una contraseña en texto plano) y se guarda
+        el refresh token. El intento y la auditoría se encolan para escribirse en lote.
+
+        Args:
+            user: Usuario autenticado
+            nuevo_hash: Hash bcrypt si la contrasena estaba en texto plano
+            ip_address: Direccion IP del cliente
+            user_agent: User agent del navegador
+
+        Returns:
+            Refresh token generado
+        """
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE usuarios
+                SET fecha_ultima_sesion = NOW(),
+                    intentos_fallidos = 0,
+                    bloqueado_hasta = NULL,
+                    password = COALESCE(%s, password)
+                WHERE id_usuario = %s
+                """,
+                (nuevo_hash, user["id_usuario"])
+            )
+
+            refresh_token = RefreshTokenManager.crear_refresh_token(
+                id_usuario=user["id_usuario"],
+                ip_address=ip_address,
+                user_agent=user_agent,
+                cursor=cursor
+            )
+
+        # REGISTRAR ÉXITO (el desbloqueo del usuario ya quedó en la transacción)
+        RateLimiter.registrar_intento(
+            user["username"],
+            ip_address,
+            exitoso=True,
+            user_agent=user_agent,
+            actualizar_usuario=False
+        )
+        AuditLogger.log_login(
+            user["username"],
+            exitoso=True,
+            ip_address=ip_address,
+            user_agent=user_agent
+        )
+
+        return refresh_token
+
+    @staticmethod
+    async def login(usuario_login: UsuarioLogin, ip_address: str = "0.0.0.0", user_agent: Optional[str] = None) -> dict:
         """
         RF-01: Iniciar sesion - Valida credenciales y retorna tokens
 
         Incluye:
         - Rate limiting (prevención de fuerza bruta)
-        - Hashing de contraseñas con bcrypt
+        - Hashing de contraseñas con bcrypt (en el pool de hashing, fuera del event loop)
         - Refresh tokens para sesiones persistentes
         - Auditoría de intentos de login
 
@@ -45,26 +154,18 @@ class AuthController:
             HTTPException: Si las credenciales son invalidas o usuario bloqueado
         """
         # 1. VERIFICAR RATE LIMITING
-        puede_intentar, mensaje_bloqueo = RateLimiter.puede_intentar_login(
+        puede_intentar, mensaje_bloqueo = await run_in_db_thread(
+            RateLimiter.puede_intentar_login,
             usuario_login.username,
             ip_address
         )
 
         if not puede_intentar:
             # Registrar intento bloqueado
-            RateLimiter.registrar_intento(
-                usuario_login.username,
-                ip_address,
-                exitoso=False,
-                razon_fallo="Bloqueado por rate limiting",
-                user_agent=user_agent
-            )
-            AuditLogger.log_login(
-                usuario_login.username,
-                exitoso=False,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                razon="Rate limiting"
+            await run_in_db_thread(
+                AuthController._registrar_fallo_login,
+                usuario_login.username, ip_address, user_agent,
+                "Bloqueado por rate limiting", "Rate limiting"
             )
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
@@ -72,32 +173,14 @@ class AuthController:
             )
 
         # 2. BUSCAR USUARIO Y VERIFICAR ESTADO
-        with get_db_cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT id_usuario, username, email, password, activo, eliminado
-                FROM usuarios
-                WHERE username = %s
-                """,
-                (usuario_login.username,)
-            )
-            user = cursor.fetchone()
+        user = await run_in_db_thread(AuthController._buscar_usuario_login, usuario_login.username)
 
         # Validar si el usuario existe
         if not user:
-            RateLimiter.registrar_intento(
-                usuario_login.username,
-                ip_address,
-                exitoso=False,
-                razon_fallo="Usuario no existe",
-                user_agent=user_agent
-            )
-            AuditLogger.log_login(
-                usuario_login.username,
-                exitoso=False,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                razon="Usuario no encontrado"
+            await run_in_db_thread(
+                AuthController._registrar_fallo_login,
+                usuario_login.username, ip_address, user_agent,
+                "Usuario no existe", "Usuario no encontrado"
             )
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -106,12 +189,10 @@ class AuthController:
 
         # Verificar si el usuario está eliminado (soft delete)
         if user['eliminado']:
-            RateLimiter.registrar_intento(
-                usuario_login.username,
-                ip_address,
-                exitoso=False,
-                razon_fallo="Usuario eliminado",
-                user_agent=user_agent
+            await run_in_db_thread(
+                AuthController._registrar_fallo_login,
+                usuario_login.username, ip_address, user_agent,
+                "Usuario eliminado"
             )
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -120,62 +201,57 @@ class AuthController:
 
         # Verificar si el usuario está activo
         if not user['activo']:
-            RateLimiter.registrar_intento(
-                usuario_login.username,
-                ip_address,
-                exitoso=False,
-                razon_fallo="Usuario inactivo",
-                user_agent=user_agent
+            await run_in_db_thread(
+                AuthController._registrar_fallo_login,
+                usuario_login.username, ip_address, user_agent,
+                "Usuario inactivo"
             )
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Usuario inactivo. Contacte al administrador"
             )
 
+        # Verificar el bloqueo guardado en la base de datos (administrador u otro proceso)
+        bloqueado, mensaje_bloqueo = RateLimiter.verificar_bloqueo_persistido(
+            user["username"], user["bloqueado_hasta"]
+        )
+        if bloqueado:
+            await run_in_db_thread(
+                AuthController._registrar_fallo_login,
+                usuario_login.username, ip_address, user_agent,
+                "Usuario bloqueado", "Rate limiting"
+            )
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=mensaje_bloqueo
+            )
+
         # 3. VALIDAR CONTRASEÑA
         # Intentar con hash bcrypt primero (nuevas contraseñas)
         password_valida = False
-        necesita_rehash = False
+        nuevo_hash = None
 
         if user["password"].startswith("$2b$"):
             # Es un hash bcrypt
-            password_valida = verify_password(usuario_login.password, user["password"])
+            password_valida = await verify_password_async(usuario_login.password, user["password"])
         else:
             # Es texto plano (contraseñas antiguas)
             if usuario_login.password == user["password"]:
                 password_valida = True
-                necesita_rehash = True
+                nuevo_hash = await hash_password_async(usuario_login.password)
 
         if not password_valida:
-            RateLimiter.registrar_intento(
-                usuario_login.username,
-                ip_address,
-                exitoso=False,
-                razon_fallo="Contraseña incorrecta",
-                user_agent=user_agent
-            )
-            AuditLogger.log_login(
-                usuario_login.username,
-                exitoso=False,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                razon="Contraseña incorrecta"
+            await run_in_db_thread(
+                AuthController._registrar_fallo_login,
+                usuario_login.username, ip_address, user_agent,
+                "Contraseña incorrecta", "Contraseña incorrecta"
             )
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Usuario o contraseña incorrectos"
             )
 
-        # 4. ACTUALIZAR HASH SI ES NECESARIO (migración de texto plano a bcrypt)
-        if necesita_rehash:
-            with get_db_cursor() as cursor:
-                nuevo_hash = hash_password(usuario_login.password)
-                cursor.execute(
-                    "UPDATE usuarios SET password = %s WHERE id_usuario = %s",
-                    (nuevo_hash, user["id_usuario"])
-                )
-
-        # 5. LOGIN EXITOSO - GENERAR TOKENS
+        # 4. LOGIN EXITOSO - GENERAR TOKENS
         # Crear access token
         access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
         access_token = create_access_token(
@@ -186,32 +262,10 @@ class AuthController:
             expires_delta=access_token_expires
         )
 
-        # Crear refresh token
-        refresh_token = RefreshTokenManager.crear_refresh_token(
-            id_usuario=user["id_usuario"],
-            ip_address=ip_address,
-            user_agent=user_agent
-        )
-
-        # 6. ACTUALIZAR USUARIO
-        with get_db_cursor() as cursor:
-            cursor.execute(
-                "UPDATE usuarios SET fecha_ultima_sesion = NOW() WHERE id_usuario = %s",
-                (user["id_usuario"],)
-            )
-
-        # 7. REGISTRAR ÉXITO
-        RateLimiter.registrar_intento(
-            usuario_login.username,
-            ip_address,
-            exitoso=True,
-            user_agent=user_agent
-        )
-        AuditLogger.log_login(
-            usuario_login.username,
-            exitoso=True,
-            ip_address=ip_address,
-            user_agent=user_agent
+        # 5. PERSISTIR LOGIN (una transacción: usuario + refresh token)
+        refresh_token = await run_in_db_thread(
+            AuthController._completar_login,
+            user, nuevo_hash, ip_address, user_agent
         )
 
         return {
@@ -228,16 +282,9 @@ class AuthController:
         }
 
     @staticmethod
-    def register(usuario: UsuarioCreate, ip_address: Optional[str] = None) -> dict:
+    def _insertar_usuario(usuario: UsuarioCreate, password_hash: str, ip_address: Optional[str]) -> dict:
         """
-        Registrar un nuevo usuario con contraseña hasheada
-
-        Args:
-            usuario: Datos del usuario a crear
-            ip_address: IP del solicitante (para auditoría)
-
-        Returns:
-            Datos del usuario creado
+        Inserta el usuario ya hasheado si el username y email estan disponibles
 
         Raises:
             HTTPException: Si el usuario ya existe
@@ -256,9 +303,6 @@ class AuthController:
                     detail="El usuario o email ya esta registrado"
                 )
 
-            # Hashear la contraseña
-            password_hash = hash_password(usuario.password)
-
             # Insertar usuario con contraseña hasheada
             cursor.execute(
                 """
@@ -281,6 +325,28 @@ class AuthController:
             ip_address=ip_address
         )
 
+        return new_user
+
+    @staticmethod
+    async def register(usuario: UsuarioCreate, ip_address: Optional[str] = None) -> dict:
+        """
+        Registrar un nuevo usuario con contraseña hasheada
+
+        Args:
+            usuario: Datos del usuario a crear
+            ip_address: IP del solicitante (para auditoría)
+
+        Returns:
+            Datos del usuario creado
+
+        Raises:
+            HTTPException: Si el usuario ya existe
+        """
+        # Hashear la contraseña antes de abrir la transaccion
+        password_hash = await hash_password_async(usuario.password)
+
+        new_user = await run_in_db_thread(AuthController._insertar_usuario, usuario, password_hash, ip_address)
+
         return {
             "success": True,
             "message": "Usuario registrado exitosamente",
@@ -387,6 +453,7 @@ class AuthController:
         """
         # Revocar todos los tokens del usuario
         tokens_revocados = RefreshTokenManager.revocar_todos_tokens_usuario(id_usuario)
+        invalidar_usuario_cache(id_usuario)
 
         # Auditoría
         AuditLogger.log(
@@ -405,7 +472,7 @@ class AuthController:
         }
 
     @staticmethod
-    def request_password_reset(email: str, ip_address: Optional[str] = None) -> dict:
+    async def request_password_reset(email: str, ip_address: Optional[str] = None) -> dict:
         """
         Solicita recuperación de contraseña enviando email con token
 
@@ -419,7 +486,36 @@ class AuthController:
         Raises:
             HTTPException: Si hay errores
         """
-        # Buscar usuario por email
+        # Por seguridad, siempre retornar mensaje genérico
+        # (no revelar si el email existe o no)
+        mensaje_generico = "Si el email está registrado, recibirás un enlace de recuperación"
+
+        user = await run_in_db_thread(AuthController._buscar_usuario_recuperacion, email, ip_address)
+        if not user:
+            return {
+                "success": True,
+                "message": mensaje_generico
+            }
+
+        # Generar token seguro y hashearlo fuera de los hilos de base de datos
+        reset_token = secrets.token_urlsafe(32)
+        token_hash = await hash_password_async(reset_token)
+
+        # Calcular fecha de expiración (UTC)
+        expires_at = datetime.now(timezone.utc) + timedelta(minutes=settings.reset_token_expire_minutes)
+
+        await run_in_db_thread(
+            AuthController._guardar_token_recuperacion, user, reset_token, token_hash, expires_at, ip_address
+        )
+
+        return {
+            "success": True,
+            "message": mensaje_generico
+        }
+
+    @staticmethod
+    def _buscar_usuario_recuperacion(email: str, ip_address: Optional[str]) -> Optional[dict]:
+        """Busca el usuario activo del email; audita y retorna None si no puede recuperar la contraseña"""
         with get_db_cursor() as cursor:
             cursor.execute(
                 """
@@ -431,10 +527,6 @@ class AuthController:
             )
             user = cursor.fetchone()
 
-        # Por seguridad, siempre retornar mensaje genérico
-        # (no revelar si el email existe o no)
-        mensaje_generico = "Si el email está registrado, recibirás un enlace de recuperación"
-
         if not user:
             # Registrar intento en auditoría
             AuditLogger.log(
@@ -443,10 +535,7 @@ class AuthController:
                 datos_nuevos={"email": email, "razon": "Email no encontrado"},
                 ip_address=ip_address
             )
-            return {
-                "success": True,
-                "message": mensaje_generico
-            }
+            return None
 
         # Verificar si el usuario está activo
         if not user['activo'] or user['eliminado']:
@@ -458,20 +547,20 @@ class AuthController:
                 datos_nuevos={"email": email, "razon": "Usuario inactivo o eliminado"},
                 ip_address=ip_address
             )
-            return {
-                "success": True,
-                "message": mensaje_generico
-            }
+            return None
 
-        # Generar token seguro
-        reset_token = secrets.token_urlsafe(32)
-
-        # Calcular fecha de expiración (UTC)
-        expires_at = datetime.now(timezone.utc) + timedelta(minutes=settings.reset_token_expire_minutes)
+        return dict(user)
 
-        # Guardar token en BD (hasheado)
+    @staticmethod
+    def _guardar_token_recuperacion(
+        user: dict,
+        reset_token: str,
+        token_hash: str,
+        expires_at: datetime,
+        ip_address: Optional[str]
+    ) -> None:
+        """Guarda el token de recuperación (hasheado), envía el email y audita"""
         with get_db_cursor() as cursor:
-            token_hash = hash_password(reset_token)
             cursor.execute(
                 """
                 UPDATE usuarios
@@ -498,28 +587,9 @@ class AuthController:
             ip_address=ip_address
         )
 
-        return {
-            "success": True,
-            "message": mensaje_generico
-        }
-
     @staticmethod
-    def reset_password(token: str, new_password: str, ip_address: Optional[str] = None) -> dict:
-        """
-        Restablece la contraseña usando el token de recuperación
-
-        Args:
-            token: Token de recuperación
-            new_password: Nueva contraseña
-            ip_address: IP del solicitante
-
-        Returns:
-            Mensaje de confirmación
-
-        Raises:
-            HTTPException: Si el token es inválido o expiró
-        """
-        # Buscar usuario con token válido
+    def _buscar_usuarios_con_token() -> list:
+        """Obtiene los usuarios activos con un token de recuperación vigente"""
         with get_db_cursor() as cursor:
             cursor.execute(
                 """
@@ -531,24 +601,11 @@ class AuthController:
                 AND eliminado = FALSE
                 """
             )
-            usuarios_con_token = cursor.fetchall()
-
-        # Buscar el usuario cuyo token hash coincida
-        user = None
-        for usuario in usuarios_con_token:
-            if verify_password(token, usuario['reset_token']):
-                user = usuario
-                break
-
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Token de recuperación inválido o expirado"
-            )
-
-        # Hashear nueva contraseña
-        new_password_hash = hash_password(new_password)
+            return cursor.fetchall()
 
+    @staticmethod
+    def _actualizar_password(user: dict, new_password_hash: str, ip_address: Optional[str]) -> None:
+        """Guarda la nueva contraseña, cierra las sesiones, notifica y audita"""
         # Actualizar contraseña y limpiar token
         with get_db_cursor() as cursor:
             cursor.execute(
@@ -564,6 +621,7 @@ class AuthController:
 
         # Revocar todos los refresh tokens (cerrar sesiones activas)
         RefreshTokenManager.revocar_todos_tokens_usuario(user['id_usuario'])
+        invalidar_usuario_cache(user['id_usuario'])
 
         # Enviar email de confirmación
         email_service.send_password_changed_notification(user['email'])
@@ -578,6 +636,43 @@ class AuthController:
             ip_address=ip_address
         )
 
+    @staticmethod
+    async def reset_password(token: str, new_password: str, ip_address: Optional[str] = None) -> dict:
+        """
+        Restablece la contraseña usando el token de recuperación
+
+        Args:
+            token: Token de recuperación
+            new_password: Nueva contraseña
+            ip_address: IP del solicitante
+
+        Returns:
+            Mensaje de confirmación
+
+        Raises:
+            HTTPException: Si el token es inválido o expiró
+        """
+        # Buscar usuario con token válido
+        usuarios_con_token = await run_in_db_thread(AuthController._buscar_usuarios_con_token)
+
+        # Buscar el usuario cuyo token hash coincida
+        user = None
+        for usuario in usuarios_con_token:
+            if await verify_password_async(token, usuario['reset_token']):
+                user = usuario
+                break
+
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Token de recuperación inválido o expirado"
+            )
+
+        # Hashear nueva contraseña
+        new_password_hash = await hash_password_async(new_password)
+
+        await run_in_db_thread(AuthController._actualizar_password, user, new_password_hash, ip_address)
+
         return {
             "success": True,
             "message": "Contraseña actualizada exitosamente"
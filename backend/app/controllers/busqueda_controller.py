@@ -0,0 +1,114 @@
+"""
+Controlador de Busqueda
+RF-10: Busqueda especifica de productos
+RF-14: Busqueda de servicios y clientes
+
+Consulta la tabla busqueda_indice (migracion 005), que los triggers mantienen
+sincronizada con clientes, servicios y productos.
+"""
+import re
+from typing import List, Optional, Tuple
+from app.config.database import get_db_cursor
+
+# Tipos de entidad indexados
+TIPOS_BUSQUEDA = ("cliente", "servicio", "producto")
+
+
+class BusquedaController:
+    """Controlador para la busqueda unificada"""
+
+    @staticmethod
+    def _consulta_prefijos(termino: str) -> str:
+        """
+        Convierte el termino en una consulta tsquery de prefijos
+        (ej: 'mario kar' -> 'mario:* & kar:*') para buscar mientras se escribe
+        """
+        palabras = re.findall(r"\w+", termino)
+        return " & ".join(f"{palabra}:*" for palabra in palabras)
+
+    @staticmethod
+    def condicion_busqueda(tipo: str, termino: str, alias: str = "b") -> Tuple[str, list]:
+        """
+        Construye la condicion de coincidencia sobre busqueda_indice
+
+        Coincide por texto completo (prefijos, sin acentos) o por texto parcial
+        (p.ej. digitos en medio de un documento).
+
+        Args:
+            tipo: Tipo de entidad ('cliente', 'servicio', 'producto')
+            termino: Texto buscado
+            alias: Alias de la tabla busqueda_indice en la consulta
+
+        Returns:
+            Tupla (fragmento SQL, parametros)
+        """
+        condicion = f"{alias}.texto LIKE lower(f_unaccent(%s))"
+        params = [f"%{termino}%"]
+
+        consulta = BusquedaController._consulta_prefijos(termino)
+        if consulta:
+            condicion = f"{alias}.contenido @@ to_tsquery('spanish', f_unaccent(%s)) OR {condicion}"
+            params.insert(0, consulta)
+
+        return f"{alias}.tipo = %s AND ({condicion})", [tipo, *params]
+
+    @staticmethod
+    def ids_coincidentes(tipo: str, termino: str) -> Tuple[str, list]:
+        """
+        Subconsulta con los ids de un tipo de entidad que coinciden con el termino,
+        para filtrar los listados (ej: c.id_cliente IN (...))
+
+        Returns:
+            Tupla (subconsulta SQL, parametros)
+        """
+        condicion, params = BusquedaController.condicion_busqueda(tipo, termino)
+        return f"SELECT b.id_entidad FROM busqueda_indice b WHERE {condicion}", params
+
+    @staticmethod
+    def buscar(termino: str, tipos: Optional[List[str]] = None, limite: int = 20) -> List[dict]:
+        """
+        RF-10, RF-14: Buscar clientes, servicios y productos ordenados por relevancia
+
+        Args:
+            termino: Texto buscado
+            tipos: Tipos de entidad a incluir (por defecto todos)
+            limite: Cantidad maxima de resultados
+
+        Returns:
+            Lista de resultados (tipo, id, titulo, subtitulo, detalle, fecha, relevancia)
+        """
+        tipos = list(tipos or TIPOS_BUSQUEDA)
+        consulta = BusquedaController._consulta_prefijos(termino)
+        patron = f"%{termino}%"
+
+        if consulta:
+            coincidencia = "(b.contenido @@ q.consulta OR b.texto LIKE lower(f_unaccent(%(patron)s)))"
+            rango = "ts_rank_cd(b.contenido, q.consulta) + similarity(b.texto, lower(f_unaccent(%(termino)s)))"
+            origen = "busqueda_indice b, (SELECT to_tsquery('spanish', f_unaccent(%(consulta)s)) AS consulta) q"
+        else:
+            coincidencia = "b.texto LIKE lower(f_unaccent(%(patron)s))"
+            rango = "similarity(b.texto, lower(f_unaccent(%(termino)s)))"
+            origen = "busqueda_indice b"
+
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT b.tipo, b.id_entidad, b.titulo, b.subtitulo, b.detalle, b.fecha,
+                       ROUND(({rango})::numeric, 4) AS relevancia
+                FROM {origen}
+                WHERE b.tipo = ANY(%(tipos)s)
+                AND {coincidencia}
+                ORDER BY relevancia DESC, b.fecha DESC NULLS LAST
+                LIMIT %(limite)s
+                """,
+                {
+                    "consulta": consulta,
+                    "patron": patron,
+                    "termino": termino,
+                    "tipos": tipos,
+                    "limite": limite,
+                }
+            )
+            resultados = cursor.fetchall()
+
+        return [dict(r) for r in resultados]
@@ -2,16 +2,25 @@
 Controlador de Clientes
 RF-07: Datos Basicos Clientes
 """
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from fastapi import HTTPException, status
 from app.models.cliente import ClienteCreate, ClienteUpdate
 from app.config.database import get_db_cursor
+from app.utils.pagination import condicion_keyset
+from app.utils.conditional import modifica_tablas, versiones_tablas
+from app.utils.notificaciones import canal_cambios
+from app.controllers.busqueda_controller import BusquedaController
+
+
+# Los cambios de clientes hechos por otros procesos invalidan los ETag de este
+canal_cambios.suscribir("clientes", lambda cambio: versiones_tablas.incrementar("clientes"))
 
 
 class ClienteController:
     """Controlador para operaciones de clientes"""
 
     @staticmethod
+    @modifica_tablas("clientes")
     def crear_cliente(cliente: ClienteCreate) -> dict:
         """
         RF-07: Crear un nuevo cliente
@@ -63,6 +72,9 @@ class ClienteController:
                         params
                     )
                     updated_cliente = cursor.fetchone()
+                    canal_cambios.notificar(cursor, "clientes", {
+                        "accion": "actualizado", "id_cliente": updated_cliente["id_cliente"]
+                    })
                     return {
                         "success": True,
                         "message": "Cliente actualizado",
@@ -97,6 +109,7 @@ class ClienteController:
                 (cliente.nombre, cliente.documento, cliente.telefono, cliente.email)
             )
             new_cliente = cursor.fetchone()
+            canal_cambios.notificar(cursor, "clientes", {"accion": "creado", "id_cliente": new_cliente["id_cliente"]})
 
         return {
             "success": True,
@@ -106,39 +119,77 @@ class ClienteController:
         }
 
     @staticmethod
-    def obtener_clientes(busqueda: Optional[str] = None) -> List[dict]:
+    def _filtros_clientes(busqueda: Optional[str] = None) -> Tuple[str, list]:
+        """
+        Construye las condiciones WHERE de los filtros de clientes
+
+        Returns:
+            Tupla (fragmento SQL, parametros)
+        """
+        if not busqueda:
+            return "", []
+
+        # Busqueda por nombre o documento sobre el indice de busqueda (migracion 005)
+        subconsulta, params = BusquedaController.ids_coincidentes("cliente", busqueda)
+        return f" AND c.id_cliente IN ({subconsulta})", params
+
+    @staticmethod
+    def obtener_clientes(
+        busqueda: Optional[str] = None,
+        limite: Optional[int] = None,
+        cursor_pagina: Optional[str] = None
+    ) -> List[dict]:
         """
         Obtener lista de clientes con busqueda opcional
 
         Args:
             busqueda: Buscar por nombre o documento (opcional)
+            limite: Cantidad maxima de resultados (opcional)
+            cursor_pagina: Cursor de paginacion de la pagina anterior (opcional)
 
         Returns:
             Lista de clientes
         """
-        with get_db_cursor() as cursor:
-            query = """
-                SELECT c.id_cliente, c.nombre, c.documento, c.telefono, c.email, c.fecha_registro,
-                       COUNT(DISTINCT v.id_venta) as total_compras,
-                       COUNT(DISTINCT s.id_servicio) as total_servicios
-                FROM clientes c
-                LEFT JOIN ventas v ON c.id_cliente = v.id_cliente
-                LEFT JOIN servicios s ON c.id_cliente = s.id_cliente
-                WHERE 1=1
-            """
-            params = []
-
-            if busqueda:
-                query += " AND (LOWER(c.nombre) LIKE LOWER(%s) OR c.documento LIKE %s)"
-                params.extend([f"%{busqueda}%", f"%{busqueda}%"])
+        condiciones, params_filtros = ClienteController._filtros_clientes(busqueda)
+        condicion_cursor, params_cursor = condicion_keyset("c.fecha_registro", "c.id_cliente", cursor_pagina)
+
+        query = f"""
+            SELECT c.id_cliente, c.nombre, c.documento, c.telefono, c.email, c.fecha_registro,
+                   COUNT(DISTINCT v.id_venta) as total_compras,
+                   COUNT(DISTINCT s.id_servicio) as total_servicios
+            FROM clientes c
+            LEFT JOIN ventas v ON c.id_cliente = v.id_cliente
+            LEFT JOIN servicios s ON c.id_cliente = s.id_cliente
+            WHERE 1=1{condiciones}{condicion_cursor}
+            GROUP BY c.id_cliente
+            ORDER BY c.fecha_registro DESC, c.id_cliente DESC
+        """
+        params = [*params_filtros, *params_cursor]
 
-            query += " GROUP BY c.id_cliente ORDER BY c.fecha_registro DESC"
+        if limite:
+            query += " LIMIT %s"
+            params.append(limite)
 
+        with get_db_cursor() as cursor:
             cursor.execute(query, params)
             clientes = cursor.fetchall()
 
         return [dict(c) for c in clientes]
 
+    @staticmethod
+    def contar_clientes(busqueda: Optional[str] = None) -> int:
+        """
+        Contar los clientes que cumplen la busqueda
+
+        Returns:
+            Total de clientes
+        """
+        condiciones, params = ClienteController._filtros_clientes(busqueda)
+
+        with get_db_cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) as total FROM clientes c WHERE 1=1{condiciones}", params)
+            return cursor.fetchone()["total"]
+
     @staticmethod
     def buscar_por_documento(documento: str) -> dict:
         """
@@ -213,6 +264,7 @@ class ClienteController:
         return dict(cliente)
 
     @staticmethod
+    @modifica_tablas("clientes")
     def actualizar_cliente(id_cliente: int, cliente: ClienteUpdate) -> dict:
         """
         Actualizar un cliente existente
@@ -267,6 +319,8 @@ class ClienteController:
             """
             cursor.execute(query, params)
             updated_cliente = cursor.fetchone()
+            if updated_cliente:
+                canal_cambios.notificar(cursor, "clientes", {"accion": "actualizado", "id_cliente": id_cliente})
 
         return {
             "success": True,
@@ -275,6 +329,7 @@ class ClienteController:
         }
 
     @staticmethod
+    @modifica_tablas("clientes")
     def eliminar_cliente(id_cliente: int) -> dict:
         """
         Eliminar un cliente
@@ -312,6 +367,8 @@ class ClienteController:
                 (id_cliente,)
             )
             deleted = cursor.fetchone()
+            if deleted:
+                canal_cambios.notificar(cursor, "clientes", {"accion": "eliminado", "id_cliente": id_cliente})
 
         if not deleted:
             raise HTTPException(
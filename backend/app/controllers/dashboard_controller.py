@@ -0,0 +1,96 @@
+"""
+Controlador del Dashboard
+RF-08: Tablero Inicial
+"""
+from app.config.database import get_db_cursor
+from app.controllers.producto_controller import ProductoController
+from app.models.servicio import EstadoServicio
+
+
+class DashboardController:
+    """Controlador para el resumen del tablero inicial"""
+
+    DIAS_GRAFICA = 7  # Dias de la serie de ventas diarias
+
+    @staticmethod
+    def obtener_resumen(dias: int = DIAS_GRAFICA) -> dict:
+        """
+        RF-08: Obtener el resumen del tablero en una sola consulta
+
+        Calcula en la base de datos los contadores del tablero, los ingresos del mes,
+        el producto mas vendido y la serie de ventas por dia. Los totales de ventas
+        se leen de ventas_resumen_diario (una fila por dia y usuario)
+
+        Args:
+            dias: Cantidad de dias de la serie de ventas (incluye hoy)
+
+        Returns:
+            Resumen con contadores, ingresos y serie diaria
+        """
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                """
+                WITH dias AS (
+                    SELECT generate_series(
+                        CURRENT_DATE - (%(dias)s - 1), CURRENT_DATE, INTERVAL '1 day'
+                    )::date AS dia
+                ),
+                ventas_dia AS (
+                    SELECT dia,
+                           SUM(total_ventas) AS ventas,
+                           SUM(monto_total) AS ingresos
+                    FROM ventas_resumen_diario
+                    WHERE dia >= CURRENT_DATE - (%(dias)s - 1)
+                    AND dia <= CURRENT_DATE
+                    GROUP BY dia
+                ),
+                mas_vendido AS (
+                    SELECT p.id_producto, p.nombre, p.imagen_url, SUM(dv.cantidad) AS cantidad
+                    FROM detalle_ventas dv
+                    JOIN productos p ON dv.id_producto = p.id_producto
+                    GROUP BY p.id_producto, p.nombre, p.imagen_url
+                    ORDER BY cantidad DESC
+                    LIMIT 1
+                )
+                SELECT
+                    (SELECT COUNT(*) FROM productos) AS total_productos,
+                    (SELECT COUNT(*) FROM productos WHERE cantidad <= %(stock_minimo)s) AS stock_bajo,
+                    (SELECT COALESCE(SUM(total_ventas), 0)::int FROM ventas_resumen_diario) AS total_ventas,
+                    (SELECT COALESCE(SUM(total_ventas), 0)::int FROM ventas_resumen_diario
+                     WHERE dia = CURRENT_DATE) AS ventas_hoy,
+                    (SELECT COALESCE(SUM(monto_total), 0) FROM ventas_resumen_diario
+                     WHERE dia >= date_trunc('month', CURRENT_DATE)::date) AS ingresos_ventas_mes,
+                    (SELECT COALESCE(SUM(costo), 0) FROM servicios
+                     WHERE pagado = TRUE
+                     AND fecha_ingreso >= date_trunc('month', CURRENT_DATE)
+                     AND fecha_ingreso < date_trunc('month', CURRENT_DATE) + INTERVAL '1 month') AS ingresos_servicios_mes,
+                    (SELECT COUNT(*) FROM servicios WHERE estado = %(estado_pendiente)s) AS servicios_pendientes,
+                    (SELECT row_to_json(m) FROM mas_vendido m) AS producto_mas_vendido,
+                    (SELECT json_agg(
+                        json_build_object(
+                            'fecha', d.dia,
+                            'ventas', COALESCE(vd.ventas, 0),
+                            'ingresos', COALESCE(vd.ingresos, 0)
+                        ) ORDER BY d.dia
+                     )
+                     FROM dias d
+                     LEFT JOIN ventas_dia vd ON vd.dia = d.dia) AS ventas_por_dia
+                """,
+                {
+                    "dias": dias,
+                    "stock_minimo": ProductoController.STOCK_MINIMO,
+                    "estado_pendiente": EstadoServicio.EN_REPARACION.value,
+                }
+            )
+            resumen = dict(cursor.fetchone())
+
+        resumen["ingresos_mes"] = resumen["ingresos_ventas_mes"] + resumen["ingresos_servicios_mes"]
+        resumen["producto_mas_vendido"] = resumen["producto_mas_vendido"] or {
+            "id_producto": None,
+            "nombre": "N/A",
+            "imagen_url": None,
+            "cantidad": 0
+        }
+        resumen["ventas_por_dia"] = resumen["ventas_por_dia"] or []
+
+        return resumen
@@ -0,0 +1,251 @@
+"""
+Controlador de Exportaciones
+Exportacion masiva de ventas (con sus lineas), productos y servicios en CSV o NDJSON
+
+Las filas se leen con un cursor del servidor y se emiten por bloques, de modo que
+la memoria usada no depende del tamaño de la exportacion.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Iterable, Iterator, List, Optional
+from app.config.database import get_db_server_cursor
+from app.controllers.producto_controller import ProductoController
+from app.controllers.servicio_controller import ServicioController
+from app.controllers.venta_controller import VentaController
+from app.models.servicio import EstadoServicio
+
+# Formatos disponibles -> tipo de contenido
+FORMATOS_EXPORTACION = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+COLUMNAS_VENTAS = [
+    "id_venta", "fecha_venta", "id_cliente", "nombre_cliente", "documento_cliente", "nombre_usuario",
+    "total_venta", "id_producto", "codigo", "nombre_producto", "categoria", "cantidad",
+    "precio_unitario", "subtotal",
+]
+
+COLUMNAS_PRODUCTOS = [
+    "id_producto", "codigo", "nombre", "descripcion", "categoria", "precio", "cantidad",
+    "imagen_url", "fecha_registro",
+]
+
+COLUMNAS_SERVICIOS = [
+    "id_servicio", "id_cliente", "nombre_cliente", "documento_cliente", "consola", "descripcion",
+    "costo", "pagado", "estado", "fecha_ingreso", "fecha_entrega",
+]
+
+
+def _valor_json(valor):
+    """Convierte los tipos de la base de datos que json no serializa"""
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+def _valor_csv(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    return valor
+
+
+class ExportacionController:
+    """Controlador para las exportaciones en CSV y NDJSON"""
+
+    FILAS_POR_VIAJE = 2000  # Filas por FETCH del cursor del servidor
+    FILAS_POR_BLOQUE = 500  # Filas por bloque enviado al cliente
+
+    @staticmethod
+    def _emitir(
+        registros: Iterable[dict],
+        formato: str,
+        columnas: List[str],
+        filas_csv: Optional[Callable[[dict], Iterable[dict]]] = None
+    ) -> Iterator[bytes]:
+        """
+        Convierte registros en bloques de bytes CSV o NDJSON
+
+        Args:
+            registros: Registros a exportar
+            formato: 'csv' o 'ndjson'
+            columnas: Columnas del CSV (en orden)
+            filas_csv: Funcion que expande un registro en varias filas CSV (opcional)
+        """
+        buffer = io.StringIO()
+        pendientes = 0
+
+        if formato == "csv":
+            # BOM para que Excel reconozca UTF-8
+            buffer.write("\ufeff")
+            escritor = csv.DictWriter(buffer, fieldnames=columnas, extrasaction="ignore")
+            escritor.writeheader()
+
+        for registro in registros:
+            if formato == "csv":
+                for fila in (filas_csv(registro) if filas_csv else [registro]):
+                    escritor.writerow({columna: _valor_csv(fila.get(columna)) for columna in columnas})
+            else:
+                buffer.write(json.dumps(registro, default=_valor_json, ensure_ascii=False))
+                buffer.write("\n")
+
+            pendientes += 1
+            if pendientes >= ExportacionController.FILAS_POR_BLOQUE:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+                pendientes = 0
+
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    @staticmethod
+    def _consultar(nombre: str, query: str, params: list) -> Iterator[dict]:
+        """Ejecuta una consulta con un cursor del servidor y produce sus filas"""
+        with get_db_server_cursor(nombre, itersize=ExportacionController.FILAS_POR_VIAJE) as cursor:
+            cursor.execute(query, params)
+            for fila in cursor:
+                yield fila
+
+    @staticmethod
+    def exportar_ventas(
+        formato: str,
+        fecha_inicio: Optional[datetime] = None,
+        fecha_fin: Optional[datetime] = None,
+        id_cliente: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """
+        Exportar ventas con sus lineas
+
+        En CSV se emite una fila por linea de venta (con los datos de la venta
+        repetidos); en NDJSON un objeto por venta con la lista de productos.
+
+        Args:
+            formato: 'csv' o 'ndjson'
+            fecha_inicio: Fecha inicial (opcional)
+            fecha_fin: Fecha final (opcional)
+            id_cliente: Filtrar por cliente (opcional)
+
+        Returns:
+            Generador de bloques de bytes (bloqueante: consumir en un hilo de trabajo)
+        """
+        condiciones, params = VentaController._filtros_ventas(fecha_inicio, fecha_fin, id_cliente)
+        query = f"""
+            SELECT v.id_venta, v.fecha_venta, v.id_cliente, c.nombre as nombre_cliente,
+                   c.documento as documento_cliente, u.username as nombre_usuario, v.total,
+                   (SELECT json_agg(json_build_object(
+                        'id_producto', dv.id_producto,
+                        'codigo', p.codigo,
+                        'nombre', p.nombre,
+                        'categoria', p.categoria,
+                        'cantidad', dv.cantidad,
+                        'precio_unitario', dv.precio_unitario,
+                        'subtotal', dv.cantidad * dv.precio_unitario
+                    ) ORDER BY dv.id_detalle)
+                    FROM detalle_ventas dv
+                    JOIN productos p ON dv.id_producto = p.id_producto
+                    WHERE dv.id_venta = v.id_venta) as productos
+            FROM ventas v
+            JOIN clientes c ON v.id_cliente = c.id_cliente
+            JOIN usuarios u ON v.id_usuario = u.id_usuario
+            WHERE 1=1{condiciones}
+            ORDER BY v.fecha_venta, v.id_venta
+        """
+
+        def lineas(venta: dict) -> Iterable[dict]:
+            base = {**venta, "total_venta": venta["total"]}
+            for producto in venta["productos"] or [{}]:
+                yield {
+                    **base,
+                    **producto,
+                    "nombre_producto": producto.get("nombre"),
+                }
+
+        return ExportacionController._emitir(
+            ExportacionController._consultar("exportar_ventas", query, params),
+            formato,
+            COLUMNAS_VENTAS,
+            lineas
+        )
+
+    @staticmethod
+    def exportar_productos(
+        formato: str,
+        categoria: Optional[str] = None,
+        stock_bajo: bool = False
+    ) -> Iterator[bytes]:
+        """
+        Exportar productos
+
+        Args:
+            formato: 'csv' o 'ndjson'
+            categoria: Filtrar por categoria (opcional)
+            stock_bajo: Solo productos con stock bajo
+
+        Returns:
+            Generador de bloques de bytes (bloqueante: consumir en un hilo de trabajo)
+        """
+        condiciones, params = ProductoController._filtros_productos(categoria=categoria, stock_bajo=stock_bajo)
+        query = f"""
+            SELECT {', '.join(COLUMNAS_PRODUCTOS)}
+            FROM productos
+            WHERE 1=1{condiciones}
+            ORDER BY id_producto
+        """
+        return ExportacionController._emitir(
+            ExportacionController._consultar("exportar_productos", query, params),
+            formato,
+            COLUMNAS_PRODUCTOS
+        )
+
+    @staticmethod
+    def exportar_servicios(
+        formato: str,
+        estado: Optional[EstadoServicio] = None,
+        id_cliente: Optional[int] = None,
+        fecha_inicio: Optional[datetime] = None,
+        fecha_fin: Optional[datetime] = None
+    ) -> Iterator[bytes]:
+        """
+        Exportar servicios de reparacion
+
+        Args:
+            formato: 'csv' o 'ndjson'
+            estado: Filtrar por estado (opcional)
+            id_cliente: Filtrar por cliente (opcional)
+            fecha_inicio: Fecha de ingreso inicial (opcional)
+            fecha_fin: Fecha de ingreso final (opcional)
+
+        Returns:
+            Generador de bloques de bytes (bloqueante: consumir en un hilo de trabajo)
+        """
+        condiciones, params = ServicioController._filtros_servicios(estado, id_cliente)
+
+        if fecha_inicio:
+            condiciones += " AND s.fecha_ingreso >= %s"
+            params.append(fecha_inicio)
+
+        if fecha_fin:
+            condiciones += " AND s.fecha_ingreso <= %s"
+            params.append(fecha_fin)
+
+        query = f"""
+            SELECT s.id_servicio, s.id_cliente, c.nombre as nombre_cliente, c.documento as documento_cliente,
+                   s.consola, s.descripcion, s.costo, s.pagado, s.estado, s.fecha_ingreso, s.fecha_entrega
+            FROM servicios s
+            JOIN clientes c ON s.id_cliente = c.id_cliente
+            WHERE 1=1{condiciones}
+            ORDER BY s.fecha_ingreso, s.id_servicio
+        """
+        return ExportacionController._emitir(
+            ExportacionController._consultar("exportar_servicios", query, params),
+            formato,
+            COLUMNAS_SERVICIOS
+        )
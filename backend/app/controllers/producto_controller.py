@@ -7,17 +7,116 @@ RF-09: Filtrado de productos
 RF-10: Busqueda Especifica de productos
 RF-11: Alertas visuales por bajo stock
 """
-from typing import List, Optional
+from typing import Iterable, List, Optional, Sequence, Tuple
 from fastapi import HTTPException, status
 from app.models.producto import ProductoCreate, ProductoUpdate, ProductoResponse
 from app.utils.generators import generar_codigo_producto
+from app.utils.cache import TTLCache
+from app.utils.conditional import versiones_tablas
+from app.utils.eventos import bus_eventos, EVENTO_PRODUCTO
+from app.utils.notificaciones import canal_cambios
 from app.config.database import get_db_cursor
+from app.config.settings import settings
+from app.utils.pagination import condicion_keyset
+
+# Nombre y termino de busqueda normalizados (sin acentos, en minusculas).
+# La expresion del nombre coincide con el indice idx_productos_nombre_trgm (migracion 004).
+NOMBRE_NORMALIZADO = "lower(f_unaccent(nombre))"
+TERMINO_NORMALIZADO = "lower(f_unaccent(%s))"
+
+# Cache del catalogo (por proceso). Los cambios de este proceso invalidan las
+# entradas afectadas; los de otros procesos llegan por el canal de LISTEN/NOTIFY
+# (app.utils.notificaciones) o, si esta desactivado, se ven cuando vence el TTL.
+# Productos por id_producto
+productos_cache = TTLCache(
+    maxsize=settings.product_cache_max_size,
+    ttl=settings.product_cache_ttl_seconds,
+    nombre="productos"
+)
+# Listados y totales por combinacion de filtros
+catalogo_cache = TTLCache(
+    maxsize=settings.product_list_cache_max_size,
+    ttl=settings.product_cache_ttl_seconds,
+    nombre="catalogo"
+)
+
+
+def invalidar_catalogo_cache(ids_producto: Iterable[int] = ()) -> None:
+    """
+    Descarta de la cache los productos indicados y todos los listados, e
+    incrementa la version de la tabla (ETag de los listados)
+    Debe llamarse despues de confirmar cualquier cambio en productos (incluido el stock)
+
+    Args:
+        ids_producto: IDs de los productos modificados
+    """
+    for id_producto in ids_producto:
+        productos_cache.invalidate(id_producto)
+    catalogo_cache.clear()
+    versiones_tablas.incrementar("productos")
+
+
+def publicar_evento_producto(accion: str, id_producto: int, cantidad: Optional[int] = None) -> None:
+    """
+    Publica el cambio de un producto a los clientes de /api/eventos
+    Debe llamarse despues de confirmar la transaccion
+
+    Args:
+        accion: creado, actualizado, eliminado o venta
+        id_producto: ID del producto
+        cantidad: Stock resultante (None si el producto se elimino)
+    """
+    bus_eventos.publicar(EVENTO_PRODUCTO, {
+        "accion": accion,
+        "id_producto": id_producto,
+        "cantidad": cantidad,
+        "stock_bajo": cantidad is not None and cantidad <= ProductoController.STOCK_MINIMO,
+    })
+
+
+def notificar_cambio_productos(cursor, accion: str, productos: Sequence[Tuple[int, Optional[int]]]) -> None:
+    """
+    Avisa a los demas procesos del cambio de productos (dentro de la transaccion)
+
+    Args:
+        cursor: Cursor de la transaccion que modifica los productos
+        accion: creado, actualizado, eliminado o venta
+        productos: Pares (id_producto, stock resultante o None si se elimino)
+    """
+    canal_cambios.notificar(cursor, "productos", {
+        "accion": accion,
+        "productos": [[id_producto, cantidad] for id_producto, cantidad in productos],
+    })
+
+
+def _aplicar_cambio_remoto(cambio: Optional[dict]) -> None:
+    """Aplica un cambio de productos hecho por otro proceso (cache y eventos)"""
+    if cambio is None:
+        # No se sabe que cambio: descartar todo y pedir a los clientes que recarguen
+        productos_cache.clear()
+        invalidar_catalogo_cache()
+        bus_eventos.reiniciar()
+        return
+
+    productos = cambio.get("productos", [])
+    invalidar_catalogo_cache(id_producto for id_producto, _ in productos)
+    for id_producto, cantidad in productos:
+        publicar_evento_producto(cambio.get("accion"), id_producto, cantidad)
+
+
+canal_cambios.suscribir("productos", _aplicar_cambio_remoto)
+
+
+def _copiar(productos) -> List[dict]:
+    """Copia de una lista de la cache, para que quien la recibe no modifique la entrada"""
+    return [dict(p) for p in productos]
 
 
 class ProductoController:
     """Controlador para operaciones de productos"""
 
     STOCK_MINIMO = 5  # RF-11: Umbral para alerta de stock bajo
+    UMBRAL_SIMILITUD = 0.3  # RF-10: Similitud minima para aceptar nombres con errores de escritura
 
     @staticmethod
     def crear_producto(producto: ProductoCreate) -> dict:
@@ -61,6 +160,10 @@ class ProductoController:
                  producto.cantidad, producto.descripcion, producto.imagen_url)
             )
             new_producto = cursor.fetchone()
+            notificar_cambio_productos(cursor, "creado", [(new_producto["id_producto"], new_producto["cantidad"])])
+
+        invalidar_catalogo_cache()
+        publicar_evento_producto("creado", new_producto["id_producto"], new_producto["cantidad"])
 
         return {
             "success": True,
@@ -68,11 +171,54 @@ class ProductoController:
             "data": dict(new_producto)
         }
 
+    @staticmethod
+    def _filtros_productos(
+        categoria: Optional[str] = None,
+        busqueda: Optional[str] = None,
+        stock_bajo: bool = False,
+        tolerante: bool = False
+    ) -> Tuple[str, list]:
+        """
+        Construye las condiciones WHERE de los filtros de productos
+
+        Args:
+            tolerante: Si es True la busqueda tambien acepta nombres parecidos
+                (errores de escritura) por similitud de trigramas
+
+        Returns:
+            Tupla (fragmento SQL, parametros)
+        """
+        condiciones = ""
+        params = []
+
+        # RF-09: Filtrar por categoria
+        if categoria:
+            condiciones += " AND categoria = %s"
+            params.append(categoria)
+
+        # RF-10: Busqueda especifica por nombre (sin acentos ni mayusculas, indice de trigramas)
+        if busqueda:
+            if tolerante:
+                condiciones += f" AND ({NOMBRE_NORMALIZADO} LIKE {TERMINO_NORMALIZADO} OR {TERMINO_NORMALIZADO} <%% {NOMBRE_NORMALIZADO})"
+                params.extend([f"%{busqueda}%", busqueda])
+            else:
+                condiciones += f" AND {NOMBRE_NORMALIZADO} LIKE {TERMINO_NORMALIZADO}"
+                params.append(f"%{busqueda}%")
+
+        # RF-11: Filtrar solo stock bajo
+        if stock_bajo:
+            condiciones += " AND cantidad <= %s"
+            params.append(ProductoController.STOCK_MINIMO)
+
+        return condiciones, params
+
     @staticmethod
     def obtener_productos(
         categoria: Optional[str] = None,
         busqueda: Optional[str] = None,
-        stock_bajo: bool = False
+        stock_bajo: bool = False,
+        limite: Optional[int] = None,
+        cursor_pagina: Optional[str] = None
     ) -> List[dict]:
         """
         RF-08, RF-09, RF-10, RF-11: Obtener lista de productos con filtros
@@ -81,56 +227,154 @@ class ProductoController:
             categoria: Filtrar por categoria (opcional)
             busqueda: Busqueda por nombre (opcional)
             stock_bajo: Solo productos con stock bajo (opcional)
+            limite: Cantidad maxima de resultados (opcional)
+            cursor_pagina: Cursor de paginacion de la pagina anterior (opcional)
 
         Returns:
-            Lista de productos
+            Lista de productos ordenada por fecha de registro descendente
+        """
+        clave = ("listado", categoria, busqueda, stock_bajo, limite, cursor_pagina)
+        productos = catalogo_cache.get(clave)
+        if productos is not None:
+            return _copiar(productos)
+
+        generacion = catalogo_cache.generacion
+        condiciones, params_filtros = ProductoController._filtros_productos(categoria, busqueda, stock_bajo)
+        condicion_cursor, params_cursor = condicion_keyset("fecha_registro", "id_producto", cursor_pagina)
+
+        query = f"""
+            SELECT id_producto, codigo, nombre, categoria, precio, cantidad,
+                   descripcion, imagen_url, fecha_registro,
+                   CASE WHEN cantidad <= %s THEN true ELSE false END as stock_bajo
+            FROM productos
+            WHERE 1=1{condiciones}{condicion_cursor}
+            ORDER BY fecha_registro DESC, id_producto DESC
         """
+        params = [ProductoController.STOCK_MINIMO, *params_filtros, *params_cursor]
+
+        if limite:
+            query += " LIMIT %s"
+            params.append(limite)
+
         with get_db_cursor() as cursor:
-            query = """
-                SELECT id_producto, codigo, nombre, categoria, precio, cantidad,
-                       descripcion, imagen_url, fecha_registro,
-                       CASE WHEN cantidad <= %s THEN true ELSE false END as stock_bajo
-                FROM productos
-                WHERE 1=1
-            """
-            params = [ProductoController.STOCK_MINIMO]
+            cursor.execute(query, params)
+            productos = [dict(p) for p in cursor.fetchall()]
 
-            # RF-09: Filtrar por categoria
-            if categoria:
-                query += " AND categoria = %s"
-                params.append(categoria)
+        catalogo_cache.set(clave, productos, generacion=generacion)
+        return _copiar(productos)
 
-            # RF-10: Busqueda especifica por nombre
-            if busqueda:
-                query += " AND LOWER(nombre) LIKE LOWER(%s)"
-                params.append(f"%{busqueda}%")
+    @staticmethod
+    def buscar_productos(
+        busqueda: str,
+        categoria: Optional[str] = None,
+        stock_bajo: bool = False,
+        limite: Optional[int] = None
+    ) -> List[dict]:
+        """
+        RF-10: Busqueda de productos ordenada por relevancia
+
+        Ignora acentos y mayusculas y tolera errores de escritura. Primero aparecen
+        los nombres que empiezan con el termino, luego los que lo contienen y al
+        final los parecidos, cada grupo ordenado por similitud.
+
+        Args:
+            busqueda: Texto a buscar
+            categoria: Filtrar por categoria (opcional)
+            stock_bajo: Solo productos con stock bajo
+            limite: Cantidad maxima de resultados
 
-            # RF-11: Filtrar solo stock bajo
-            if stock_bajo:
-                query += f" AND cantidad <= %s"
-                params.append(ProductoController.STOCK_MINIMO)
+        Returns:
+            Lista de productos con su puntaje de relevancia
+        """
+        clave = ("relevancia", busqueda, categoria, stock_bajo, limite)
+        productos = catalogo_cache.get(clave)
+        if productos is not None:
+            return _copiar(productos)
+
+        generacion = catalogo_cache.generacion
+        condiciones, params_filtros = ProductoController._filtros_productos(
+            categoria, busqueda, stock_bajo, tolerante=True
+        )
+
+        query = f"""
+            SELECT id_producto, codigo, nombre, categoria, precio, cantidad,
+                   descripcion, imagen_url, fecha_registro,
+                   CASE WHEN cantidad <= %s THEN true ELSE false END as stock_bajo,
+                   ROUND(word_similarity({TERMINO_NORMALIZADO}, {NOMBRE_NORMALIZADO})::numeric, 3) as relevancia
+            FROM productos
+            WHERE 1=1{condiciones}
+            ORDER BY
+                CASE
+                    WHEN {NOMBRE_NORMALIZADO} LIKE {TERMINO_NORMALIZADO} THEN 0
+                    WHEN {NOMBRE_NORMALIZADO} LIKE {TERMINO_NORMALIZADO} THEN 1
+                    ELSE 2
+                END,
+                relevancia DESC,
+                similarity({TERMINO_NORMALIZADO}, {NOMBRE_NORMALIZADO}) DESC,
+                id_producto DESC
+        """
+        params = [
+            ProductoController.STOCK_MINIMO, busqueda,
+            *params_filtros,
+            f"{busqueda}%", f"%{busqueda}%", busqueda
+        ]
 
-            query += " ORDER BY fecha_registro DESC"
+        if limite:
+            query += " LIMIT %s"
+            params.append(limite)
 
+        with get_db_cursor() as cursor:
+            ProductoController._fijar_umbral_similitud(cursor)
             cursor.execute(query, params)
-            productos = cursor.fetchall()
+            productos = [dict(p) for p in cursor.fetchall()]
 
-        return [dict(p) for p in productos]
+        catalogo_cache.set(clave, productos, generacion=generacion)
+        return _copiar(productos)
 
     @staticmethod
-    def obtener_producto(id_producto: int) -> dict:
+    def _fijar_umbral_similitud(cursor) -> None:
+        """Ajusta el umbral del operador <% solo para la transaccion actual"""
+        cursor.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+            (str(ProductoController.UMBRAL_SIMILITUD),)
+        )
+
+    @staticmethod
+    def contar_productos(
+        categoria: Optional[str] = None,
+        busqueda: Optional[str] = None,
+        stock_bajo: bool = False,
+        tolerante: bool = False
+    ) -> int:
         """
-        Obtener un producto por ID
+        Contar los productos que cumplen los filtros
 
         Args:
-            id_producto: ID del producto
+            tolerante: Contar como en la busqueda por relevancia (incluye nombres parecidos)
 
         Returns:
-            Datos del producto
-
-        Raises:
-            HTTPException: Si el producto no existe
+            Total de productos
         """
+        clave = ("total", categoria, busqueda, stock_bajo, tolerante)
+        total = catalogo_cache.get(clave)
+        if total is not None:
+            return total
+
+        generacion = catalogo_cache.generacion
+        condiciones, params = ProductoController._filtros_productos(categoria, busqueda, stock_bajo, tolerante)
+
+        with get_db_cursor() as cursor:
+            if tolerante and busqueda:
+                ProductoController._fijar_umbral_similitud(cursor)
+            cursor.execute(f"SELECT COUNT(*) as total FROM productos WHERE 1=1{condiciones}", params)
+            total = cursor.fetchone()["total"]
+
+        catalogo_cache.set(clave, total, generacion=generacion)
+        return total
+
+    @staticmethod
+    def _consultar_producto(id_producto: int) -> Optional[dict]:
+        """Lee un producto directamente de la base de datos (None si no existe)"""
         with get_db_cursor() as cursor:
             cursor.execute(
                 """
@@ -144,11 +388,34 @@ class ProductoController:
             )
             producto = cursor.fetchone()
 
-        if not producto:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Producto no encontrado"
-            )
+        return dict(producto) if producto else None
+
+    @staticmethod
+    def obtener_producto(id_producto: int) -> dict:
+        """
+        Obtener un producto por ID (desde la cache del catalogo si esta vigente)
+
+        Args:
+            id_producto: ID del producto
+
+        Returns:
+            Datos del producto
+
+        Raises:
+            HTTPException: Si el producto no existe
+        """
+        producto = productos_cache.get(id_producto)
+        if producto is None:
+            generacion = productos_cache.generacion
+            producto = ProductoController._consultar_producto(id_producto)
+
+            if not producto:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Producto no encontrado"
+                )
+
+            productos_cache.set(id_producto, producto, generacion=generacion)
 
         return dict(producto)
 
@@ -167,8 +434,12 @@ class ProductoController:
         Raises:
             HTTPException: Si el producto no existe
         """
-        # Verificar que el producto existe
-        ProductoController.obtener_producto(id_producto)
+        # Verificar que el producto existe (sin pasar por la cache)
+        if not ProductoController._consultar_producto(id_producto):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Producto no encontrado"
+            )
 
         # Construir query dinamica solo con campos presentes
         updates = []
@@ -216,6 +487,18 @@ class ProductoController:
             """
             cursor.execute(query, params)
             updated_producto = cursor.fetchone()
+            if updated_producto:
+                notificar_cambio_productos(cursor, "actualizado", [(id_producto, updated_producto["cantidad"])])
+
+        invalidar_catalogo_cache([id_producto])
+
+        if not updated_producto:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Producto no encontrado"
+            )
+
+        publicar_evento_producto("actualizado", id_producto, updated_producto["cantidad"])
 
         return {
             "success": True,
@@ -257,6 +540,10 @@ class ProductoController:
                 (id_producto,)
             )
             deleted = cursor.fetchone()
+            if deleted:
+                notificar_cambio_productos(cursor, "eliminado", [(id_producto, None)])
+
+        invalidar_catalogo_cache([id_producto])
 
         if not deleted:
             raise HTTPException(
@@ -264,6 +551,8 @@ class ProductoController:
                 detail="Producto no encontrado"
             )
 
+        publicar_evento_producto("eliminado", id_producto)
+
         return {
             "success": True,
             "message": "Producto eliminado exitosamente"
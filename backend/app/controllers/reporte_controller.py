@@ -0,0 +1,109 @@
+"""
+Controlador de Reportes
+Reportes generados en segundo plano y servidos desde la cache en disco
+"""
+from typing import BinaryIO, Optional
+from fastapi import HTTPException, status
+from app.controllers.venta_controller import VentaController
+from app.models.reporte import ReporteSolicitud
+from app.utils.report_jobs import report_jobs, ReportJob, TipoReporte, ESTADO_ERROR, ESTADO_LISTO
+
+# Tipos de reporte disponibles
+report_jobs.registrar(TipoReporte(
+    nombre="ventas_pdf",
+    version=VentaController.version_datos_reporte,
+    generar=VentaController.generar_reporte_pdf,
+    extension="pdf",
+    media_type="application/pdf",
+))
+
+
+class ReporteController:
+    """Controlador para los trabajos de reportes"""
+
+    MAX_ESPERA = 30  # Segundos maximos de una consulta de estado con espera
+
+    @staticmethod
+    async def solicitar(solicitud: ReporteSolicitud, id_usuario: Optional[int] = None) -> ReportJob:
+        """
+        Crea un trabajo de reporte (o reutiliza el archivo ya generado)
+
+        Args:
+            solicitud: Tipo de reporte y filtros
+            id_usuario: Usuario que lo solicita
+
+        Returns:
+            Trabajo del reporte
+
+        Raises:
+            HTTPException: Si el tipo de reporte no existe
+        """
+        if solicitud.tipo not in report_jobs.tipos:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Tipo de reporte invalido. Opciones: {', '.join(report_jobs.tipos)}"
+            )
+
+        params = solicitud.model_dump(exclude={"tipo"})
+        return await report_jobs.solicitar(solicitud.tipo, params, id_usuario)
+
+    @staticmethod
+    async def obtener(id_trabajo: str, esperar: float = 0) -> ReportJob:
+        """
+        Obtiene un trabajo, esperando opcionalmente a que termine
+
+        Args:
+            id_trabajo: ID del trabajo
+            esperar: Segundos maximos de espera si aun no termino
+
+        Returns:
+            Trabajo del reporte
+
+        Raises:
+            HTTPException: Si el trabajo no existe
+        """
+        trabajo = report_jobs.obtener(id_trabajo)
+        if trabajo is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Trabajo de reporte no encontrado"
+            )
+
+        if esperar and not trabajo.finalizado:
+            await report_jobs.esperar(trabajo, min(esperar, ReporteController.MAX_ESPERA))
+
+        return trabajo
+
+    @staticmethod
+    def abrir_archivo(trabajo: ReportJob) -> BinaryIO:
+        """
+        Abre el archivo generado por un trabajo
+
+        Args:
+            trabajo: Trabajo del reporte
+
+        Returns:
+            Archivo abierto en modo binario (lo cierra quien lo lee)
+
+        Raises:
+            HTTPException: Si el trabajo no termino, fallo o el archivo ya no esta en la cache
+        """
+        if trabajo.estado == ESTADO_ERROR:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error al generar el reporte: {trabajo.error}"
+            )
+
+        if trabajo.estado != ESTADO_LISTO:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="El reporte aun se esta generando"
+            )
+
+        try:
+            return report_jobs.abrir(trabajo)
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="El reporte ya no esta disponible, solicitelo nuevamente"
+            )
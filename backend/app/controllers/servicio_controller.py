@@ -4,18 +4,53 @@ RF-06: Registrar Servicios de Reparacion
 RF-13: Marcar reparacion como lista para entrega
 RF-14: Busqueda de reparaciones por cliente o consola
 """
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
 from fastapi import HTTPException, status
 from app.models.servicio import ServicioCreate, ServicioUpdate, EstadoServicio
 from app.utils.generators import generar_codigo_servicio
 from app.config.database import get_db_cursor
+from app.utils.pagination import condicion_keyset
+from app.utils.conditional import modifica_tablas, versiones_tablas
+from app.utils.eventos import bus_eventos, EVENTO_SERVICIO
+from app.utils.notificaciones import canal_cambios
+from app.controllers.busqueda_controller import BusquedaController
 
 
 class ServicioController:
     """Controlador para operaciones de servicios de reparacion"""
 
     @staticmethod
+    def _datos_evento(accion: str, id_servicio: int, servicio: Optional[dict] = None) -> dict:
+        """Contenido del evento de un servicio (/api/eventos y aviso a otros procesos)"""
+        return {
+            "accion": accion,
+            "id_servicio": id_servicio,
+            "id_cliente": servicio["id_cliente"] if servicio else None,
+            "estado": servicio["estado"] if servicio else None,
+        }
+
+    @staticmethod
+    def _publicar_evento(accion: str, id_servicio: int, servicio: Optional[dict] = None) -> None:
+        """Publica el cambio de un servicio a los clientes de /api/eventos (despues del commit)"""
+        bus_eventos.publicar(EVENTO_SERVICIO, ServicioController._datos_evento(accion, id_servicio, servicio))
+
+    @staticmethod
+    def _notificar_cambio(cursor, accion: str, id_servicio: int, servicio: Optional[dict] = None) -> None:
+        """Avisa a los demas procesos del cambio de un servicio (dentro de la transaccion)"""
+        canal_cambios.notificar(cursor, "servicios", ServicioController._datos_evento(accion, id_servicio, servicio))
+
+    @staticmethod
+    def _aplicar_cambio_remoto(cambio: Optional[dict]) -> None:
+        """Aplica un cambio de servicios hecho por otro proceso (ETag y eventos)"""
+        versiones_tablas.incrementar("servicios")
+        if cambio is None:
+            bus_eventos.reiniciar()
+        else:
+            bus_eventos.publicar(EVENTO_SERVICIO, cambio)
+
+    @staticmethod
+    @modifica_tablas("servicios")
     def crear_servicio(servicio: ServicioCreate) -> dict:
         """
         RF-06: Crear un nuevo servicio de reparacion
@@ -69,6 +104,9 @@ class ServicioController:
                 (nuevo_servicio["id_servicio"],)
             )
             servicio_completo = cursor.fetchone()
+            ServicioController._notificar_cambio(cursor, "creado", servicio_completo["id_servicio"], servicio_completo)
+
+        ServicioController._publicar_evento("creado", servicio_completo["id_servicio"], servicio_completo)
 
         return {
             "success": True,
@@ -77,10 +115,41 @@ class ServicioController:
         }
 
     @staticmethod
-    def obtener_servicios(
+    def _filtros_servicios(
         estado: Optional[EstadoServicio] = None,
         id_cliente: Optional[int] = None,
         consola: Optional[str] = None
+    ) -> Tuple[str, list]:
+        """
+        Construye las condiciones WHERE de los filtros de servicios
+
+        Returns:
+            Tupla (fragmento SQL, parametros)
+        """
+        condiciones = ""
+        params = []
+
+        if estado:
+            condiciones += " AND s.estado = %s"
+            params.append(estado.value)
+
+        if id_cliente:
+            condiciones += " AND s.id_cliente = %s"
+            params.append(id_cliente)
+
+        if consola:
+            condiciones += " AND LOWER(s.consola) LIKE LOWER(%s)"
+            params.append(f"%{consola}%")
+
+        return condiciones, params
+
+    @staticmethod
+    def obtener_servicios(
+        estado: Optional[EstadoServicio] = None,
+        id_cliente: Optional[int] = None,
+        consola: Optional[str] = None,
+        limite: Optional[int] = None,
+        cursor_pagina: Optional[str] = None
     ) -> List[dict]:
         """
         RF-14: Obtener lista de servicios con filtros
@@ -89,44 +158,58 @@ class ServicioController:
             estado: Filtrar por estado (opcional)
             id_cliente: Filtrar por cliente (opcional)
             consola: Buscar por tipo de consola (opcional)
+            limite: Cantidad maxima de resultados (opcional)
+            cursor_pagina: Cursor de paginacion de la pagina anterior (opcional)
 
         Returns:
             Lista de servicios
         """
-        with get_db_cursor() as cursor:
-            query = """
-                SELECT s.id_servicio, s.id_usuario, s.id_cliente, s.consola,
-                       s.descripcion, s.estado, s.costo, s.pagado, s.fecha_ingreso, s.fecha_entrega,
-                       c.nombre as nombre_cliente, c.documento as documento_cliente,
-                       c.telefono as telefono_cliente, c.email as email_cliente,
-                       u.username as nombre_usuario,
-                       EXTRACT(DAY FROM (COALESCE(s.fecha_entrega, NOW()) - s.fecha_ingreso)) as dias_en_servicio
-                FROM servicios s
-                JOIN clientes c ON s.id_cliente = c.id_cliente
-                JOIN usuarios u ON s.id_usuario = u.id_usuario
-                WHERE 1=1
-            """
-            params = []
-
-            if estado:
-                query += " AND s.estado = %s"
-                params.append(estado.value)
-
-            if id_cliente:
-                query += " AND s.id_cliente = %s"
-                params.append(id_cliente)
-
-            if consola:
-                query += " AND LOWER(s.consola) LIKE LOWER(%s)"
-                params.append(f"%{consola}%")
+        condiciones, params_filtros = ServicioController._filtros_servicios(estado, id_cliente, consola)
+        condicion_cursor, params_cursor = condicion_keyset("s.fecha_ingreso", "s.id_servicio", cursor_pagina)
+
+        query = f"""
+            SELECT s.id_servicio, s.id_usuario, s.id_cliente, s.consola,
+                   s.descripcion, s.estado, s.costo, s.pagado, s.fecha_ingreso, s.fecha_entrega,
+                   c.nombre as nombre_cliente, c.documento as documento_cliente,
+                   c.telefono as telefono_cliente, c.email as email_cliente,
+                   u.username as nombre_usuario,
+                   EXTRACT(DAY FROM (COALESCE(s.fecha_entrega, NOW()) - s.fecha_ingreso)) as dias_en_servicio
+            FROM servicios s
+            JOIN clientes c ON s.id_cliente = c.id_cliente
+            JOIN usuarios u ON s.id_usuario = u.id_usuario
+            WHERE 1=1{condiciones}{condicion_cursor}
+            ORDER BY s.fecha_ingreso DESC, s.id_servicio DESC
+        """
+        params = [*params_filtros, *params_cursor]
 
-            query += " ORDER BY s.fecha_ingreso DESC"
+        if limite:
+            query += " LIMIT %s"
+            params.append(limite)
 
+        with get_db_cursor() as cursor:
             cursor.execute(query, params)
             servicios = cursor.fetchall()
 
         return [dict(s) for s in servicios]
 
+    @staticmethod
+    def contar_servicios(
+        estado: Optional[EstadoServicio] = None,
+        id_cliente: Optional[int] = None,
+        consola: Optional[str] = None
+    ) -> int:
+        """
+        Contar los servicios que cumplen los filtros
+
+        Returns:
+            Total de servicios
+        """
+        condiciones, params = ServicioController._filtros_servicios(estado, id_cliente, consola)
+
+        with get_db_cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) as total FROM servicios s WHERE 1=1{condiciones}", params)
+            return cursor.fetchone()["total"]
+
     @staticmethod
     def obtener_servicio(id_servicio: int) -> dict:
         """
@@ -168,6 +251,7 @@ class ServicioController:
         return dict(servicio)
 
     @staticmethod
+    @modifica_tablas("servicios")
     def actualizar_servicio(id_servicio: int, servicio: ServicioUpdate) -> dict:
         """
         RF-13: Actualizar un servicio (marcar como listo, etc)
@@ -245,6 +329,10 @@ class ServicioController:
                 (id_servicio,)
             )
             servicio_completo = cursor.fetchone()
+            if servicio_completo:
+                ServicioController._notificar_cambio(cursor, "actualizado", id_servicio, servicio_completo)
+
+        ServicioController._publicar_evento("actualizado", id_servicio, servicio_completo)
 
         return {
             "success": True,
@@ -253,6 +341,7 @@ class ServicioController:
         }
 
     @staticmethod
+    @modifica_tablas("servicios")
     def eliminar_servicio(id_servicio: int) -> dict:
         """
         Eliminar un servicio
@@ -272,6 +361,8 @@ class ServicioController:
                 (id_servicio,)
             )
             deleted = cursor.fetchone()
+            if deleted:
+                ServicioController._notificar_cambio(cursor, "eliminado", id_servicio)
 
         if not deleted:
             raise HTTPException(
@@ -279,6 +370,8 @@ class ServicioController:
                 detail="Servicio no encontrado"
             )
 
+        ServicioController._publicar_evento("eliminado", id_servicio)
+
         return {
             "success": True,
             "message": "Servicio eliminado exitosamente"
@@ -297,7 +390,7 @@ class ServicioController:
     @staticmethod
     def buscar_por_cliente_o_consola(termino: str) -> List[dict]:
         """
-        RF-14: Buscar servicios por nombre de cliente o tipo de consola
+        RF-14: Buscar servicios por nombre o documento del cliente, consola o descripcion
 
         Args:
             termino: Termino de busqueda
@@ -305,9 +398,12 @@ class ServicioController:
         Returns:
             Lista de servicios que coinciden
         """
+        # Coincidencias sobre el indice de busqueda (migracion 005)
+        subconsulta, params = BusquedaController.ids_coincidentes("servicio", termino)
+
         with get_db_cursor() as cursor:
             cursor.execute(
-                """
+                f"""
                 SELECT s.id_servicio, s.id_usuario, s.id_cliente, s.consola,
                        s.descripcion, s.estado, s.costo, s.fecha_ingreso, s.fecha_entrega,
                        c.nombre as nombre_cliente, c.telefono as telefono_cliente,
@@ -315,11 +411,14 @@ class ServicioController:
                 FROM servicios s
                 JOIN clientes c ON s.id_cliente = c.id_cliente
                 JOIN usuarios u ON s.id_usuario = u.id_usuario
-                WHERE LOWER(c.nombre) LIKE LOWER(%s) OR LOWER(s.consola) LIKE LOWER(%s)
+                WHERE s.id_servicio IN ({subconsulta})
                 ORDER BY s.fecha_ingreso DESC
                 """,
-                (f"%{termino}%", f"%{termino}%")
+                params
             )
             servicios = cursor.fetchall()
 
         return [dict(s) for s in servicios]
+
+
+canal_cambios.suscribir("servicios", ServicioController._aplicar_cambio_remoto)
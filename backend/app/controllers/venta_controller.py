@@ -3,22 +3,45 @@ Controlador de Ventas
 RF-04: Registro Ventas
 RF-05: Listado de Ventas
 """
-from typing import List, Optional
-from datetime import datetime, date
+import random
+import tempfile
+import time
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from datetime import datetime, date, timedelta
+from decimal import Decimal
 from fastapi import HTTPException, status
+from psycopg2 import errors
+from psycopg2.extras import execute_values
 from app.models.venta import VentaCreate
 from app.utils.generators import generar_codigo_venta
-from app.config.database import get_db_cursor
+from app.config.database import get_db_cursor, get_db_server_cursor
+from app.config.settings import settings
+from app.controllers.producto_controller import (
+    invalidar_catalogo_cache, notificar_cambio_productos, publicar_evento_producto
+)
+from app.utils.pdf_generator import PDFGenerator
+from app.utils.pagination import condicion_keyset
 
 
 class VentaController:
     """Controlador para operaciones de ventas"""
 
+    # Reintentos ante conflictos de concurrencia (deadlock / serializacion)
+    MAX_REINTENTOS_VENTA = 3
+
+    # Agrupaciones del reporte de ventas -> unidad de date_trunc
+    AGRUPACIONES_REPORTE = {"dia": "day", "semana": "week", "mes": "month"}
+    MAX_DIAS_REPORTE = 3660  # Rango maximo del reporte (~10 años)
+    LOTE_REPORTE = 500  # Ventas por viaje al servidor al generar el PDF
+
     @staticmethod
     def crear_venta(venta: VentaCreate) -> dict:
         """
         RF-04: Crear una nueva venta y actualizar inventario
 
+        La transaccion se reintenta si PostgreSQL la aborta por un deadlock o
+        un fallo de serializacion con otra caja que vende los mismos productos.
+
         Args:
             venta: Datos de la venta incluyendo productos
 
@@ -26,16 +49,59 @@ class VentaController:
             Venta creada con detalles
 
         Raises:
-            HTTPException: Si hay stock insuficiente o productos no existen
+            HTTPException: Si hay stock insuficiente, productos no existen
+                o la venta no se pudo registrar por concurrencia
+        """
+        # Un mismo producto puede venir en varias lineas del carrito
+        cantidades_por_producto: Dict[int, int] = {}
+        for detalle in venta.productos:
+            cantidades_por_producto[detalle.id_producto] = (
+                cantidades_por_producto.get(detalle.id_producto, 0) + detalle.cantidad
+            )
+
+        for intento in range(1, VentaController.MAX_REINTENTOS_VENTA + 1):
+            try:
+                return VentaController._registrar_venta(venta, cantidades_por_producto)
+            except (errors.SerializationFailure, errors.DeadlockDetected):
+                if intento == VentaController.MAX_REINTENTOS_VENTA:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="No se pudo registrar la venta por operaciones simultaneas, intente nuevamente"
+                    )
+                time.sleep(random.uniform(0.01, 0.05) * intento)
+
+    @staticmethod
+    def _registrar_venta(venta: VentaCreate, cantidades_por_producto: Dict[int, int]) -> dict:
+        """
+        Registra la venta en una transaccion
+
+        Las filas de productos se bloquean en orden de id para que dos ventas
+        concurrentes no puedan cruzarse (deadlock) ni vender el mismo stock.
+
+        Args:
+            venta: Datos de la venta incluyendo productos
+            cantidades_por_producto: Cantidad total solicitada por producto
+
+        Returns:
+            Venta creada con detalles
         """
         with get_db_cursor() as cursor:
+            # Bloquear y leer todos los productos de la venta en una sola consulta
+            cursor.execute(
+                """
+                SELECT id_producto, nombre, categoria, cantidad, precio
+                FROM productos
+                WHERE id_producto = ANY(%s)
+                ORDER BY id_producto
+                FOR UPDATE
+                """,
+                (sorted(cantidades_por_producto),)
+            )
+            productos = {p["id_producto"]: p for p in cursor.fetchall()}
+
             # Validar que todos los productos existen y hay stock suficiente
             for detalle in venta.productos:
-                cursor.execute(
-                    "SELECT id_producto, nombre, cantidad, precio FROM productos WHERE id_producto = %s",
-                    (detalle.id_producto,)
-                )
-                producto = cursor.fetchone()
+                producto = productos.get(detalle.id_producto)
 
                 if not producto:
                     raise HTTPException(
@@ -43,10 +109,11 @@ class VentaController:
                         detail=f"Producto con ID {detalle.id_producto} no encontrado"
                     )
 
-                if producto["cantidad"] < detalle.cantidad:
+                solicitado = cantidades_por_producto[detalle.id_producto]
+                if producto["cantidad"] < solicitado:
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Stock insuficiente para {producto['nombre']}. Disponible: {producto['cantidad']}, Solicitado: {detalle.cantidad}"
+                        detail=f"Stock insuficiente para {producto['nombre']}. Disponible: {producto['cantidad']}, Solicitado: {solicitado}"
                     )
 
             # Calcular total si no se proporciona
@@ -54,71 +121,188 @@ class VentaController:
             if total is None:
                 total = sum(detalle.cantidad * detalle.precio_unitario for detalle in venta.productos)
 
-            # Insertar venta
+            # Insertar venta y obtener sus datos completos
             cursor.execute(
                 """
-                INSERT INTO ventas (id_usuario, id_cliente, total)
-                VALUES (%s, %s, %s)
-                RETURNING id_venta, id_usuario, id_cliente, total, fecha_venta
-                """,
-                (venta.id_usuario, venta.id_cliente, total)
-            )
-            nueva_venta = cursor.fetchone()
-            id_venta = nueva_venta["id_venta"]
-
-            # Insertar detalles de venta y actualizar stock
-            detalles_creados = []
-            for detalle in venta.productos:
-                # Insertar detalle
-                cursor.execute(
-                    """
-                    INSERT INTO detalle_ventas (id_venta, id_producto, cantidad, precio_unitario)
-                    VALUES (%s, %s, %s, %s)
-                    RETURNING id_detalle, id_venta, id_producto, cantidad, precio_unitario
-                    """,
-                    (id_venta, detalle.id_producto, detalle.cantidad, detalle.precio_unitario)
-                )
-                detalle_creado = cursor.fetchone()
-                detalles_creados.append(dict(detalle_creado))
-
-                # Actualizar stock del producto
-                cursor.execute(
-                    """
-                    UPDATE productos
-                    SET cantidad = cantidad - %s
-                    WHERE id_producto = %s
-                    """,
-                    (detalle.cantidad, detalle.id_producto)
+                WITH nueva_venta AS (
+                    INSERT INTO ventas (id_usuario, id_cliente, total)
+                    VALUES (%s, %s, %s)
+                    RETURNING id_venta, id_usuario, id_cliente, total, fecha_venta
                 )
-
-            # Obtener datos completos de la venta
-            cursor.execute(
-                """
                 SELECT v.id_venta, v.id_usuario, v.id_cliente, v.total, v.fecha_venta,
                        c.nombre as nombre_cliente, u.username as nombre_usuario
-                FROM ventas v
+                FROM nueva_venta v
                 JOIN clientes c ON v.id_cliente = c.id_cliente
                 JOIN usuarios u ON v.id_usuario = u.id_usuario
-                WHERE v.id_venta = %s
                 """,
-                (id_venta,)
+                (venta.id_usuario, venta.id_cliente, total)
             )
             venta_completa = cursor.fetchone()
+            id_venta = venta_completa["id_venta"]
+
+            # Insertar todos los detalles de venta en una sola sentencia; la categoria
+            # del momento de la venta es la que usan los totales por categoria
+            detalles_creados = execute_values(
+                cursor,
+                """
+                INSERT INTO detalle_ventas (id_venta, id_producto, cantidad, precio_unitario, categoria)
+                VALUES %s
+                RETURNING id_detalle, id_venta, id_producto, cantidad, precio_unitario
+                """,
+                [
+                    (id_venta, detalle.id_producto, detalle.cantidad, detalle.precio_unitario,
+                     productos[detalle.id_producto]["categoria"])
+                    for detalle in venta.productos
+                ],
+                fetch=True
+            )
+
+            # Actualizar el stock de todos los productos en una sola sentencia;
+            # la condicion sobre la cantidad impide que el stock quede negativo
+            execute_values(
+                cursor,
+                """
+                UPDATE productos p
+                SET cantidad = p.cantidad - v.cantidad
+                FROM (VALUES %s) AS v(id_producto, cantidad)
+                WHERE p.id_producto = v.id_producto
+                AND p.cantidad >= v.cantidad
+                """,
+                sorted(cantidades_por_producto.items()),
+                page_size=len(cantidades_por_producto)
+            )
+
+            if cursor.rowcount != len(cantidades_por_producto):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="El stock cambio durante la venta, intente nuevamente"
+                )
+
+            # Sumar la venta a los totales diarios en la misma transaccion
+            VentaController._acumular_resumen(cursor, venta_completa, venta, productos)
+
+            # El stock de los productos vendidos cambio (las filas estaban bloqueadas,
+            # por lo que el stock resultante es el leido menos lo vendido)
+            stock_resultante = [
+                (id_producto, productos[id_producto]["cantidad"] - cantidad)
+                for id_producto, cantidad in sorted(cantidades_por_producto.items())
+            ]
+            notificar_cambio_productos(cursor, "venta", stock_resultante)
+
+        invalidar_catalogo_cache(cantidades_por_producto)
+        for id_producto, cantidad in stock_resultante:
+            publicar_evento_producto("venta", id_producto, cantidad)
 
         return {
             "success": True,
             "message": "Venta registrada exitosamente",
             "data": {
                 **dict(venta_completa),
-                "detalles": detalles_creados
+                "detalles": [dict(d) for d in detalles_creados]
             }
         }
 
     @staticmethod
-    def obtener_ventas(
+    def _acumular_resumen(cursor, venta_completa: dict, venta: VentaCreate, productos: Dict[int, dict]) -> None:
+        """
+        Suma una venta nueva a ventas_resumen_diario y ventas_resumen_categoria
+
+        Las filas de categoria se actualizan en orden para que dos ventas
+        concurrentes del mismo dia no se bloqueen en orden cruzado.
+
+        Args:
+            cursor: Cursor de la transaccion de la venta
+            venta_completa: Venta insertada (id_usuario, total, fecha_venta)
+            venta: Datos de la venta incluyendo productos
+            productos: Productos de la venta por id (con su categoria)
+        """
+        dia = venta_completa["fecha_venta"].date()
+        id_usuario = venta_completa["id_usuario"]
+
+        por_categoria: Dict[str, list] = {}
+        for detalle in venta.productos:
+            acumulado = por_categoria.setdefault(productos[detalle.id_producto]["categoria"], [0, 0, Decimal("0")])
+            acumulado[0] += 1
+            acumulado[1] += detalle.cantidad
+            acumulado[2] += detalle.cantidad * Decimal(str(detalle.precio_unitario))
+
+        cursor.execute(
+            """
+            INSERT INTO ventas_resumen_diario AS r (dia, id_usuario, total_ventas, monto_total, productos_vendidos)
+            VALUES (%s, %s, 1, %s, %s)
+            ON CONFLICT (dia, id_usuario) DO UPDATE SET
+                total_ventas = r.total_ventas + 1,
+                monto_total = r.monto_total + EXCLUDED.monto_total,
+                productos_vendidos = r.productos_vendidos + EXCLUDED.productos_vendidos
+            """,
+            (dia, id_usuario, venta_completa["total"], sum(d.cantidad for d in venta.productos))
+        )
+
+        execute_values(
+            cursor,
+            """
+            INSERT INTO ventas_resumen_categoria AS r (dia, categoria, id_usuario, lineas, productos_vendidos, monto)
+            VALUES %s
+            ON CONFLICT (dia, categoria, id_usuario) DO UPDATE SET
+                lineas = r.lineas + EXCLUDED.lineas,
+                productos_vendidos = r.productos_vendidos + EXCLUDED.productos_vendidos,
+                monto = r.monto + EXCLUDED.monto
+            """,
+            [
+                (dia, categoria, id_usuario, lineas, cantidad, monto)
+                for categoria, (lineas, cantidad, monto) in sorted(por_categoria.items())
+            ],
+            page_size=len(por_categoria)
+        )
+
+    @staticmethod
+    def reconstruir_resumen(desde: Optional[date] = None, hasta: Optional[date] = None) -> None:
+        """
+        Recalcula los totales diarios desde ventas y detalle_ventas
+
+        Args:
+            desde: Primer dia a recalcular (por defecto desde el inicio)
+            hasta: Ultimo dia a recalcular, incluido (por defecto hasta hoy)
+        """
+        with get_db_cursor() as cursor:
+            cursor.execute("SELECT ventas_resumen_reconstruir(%s, %s)", (desde, hasta))
+
+    @staticmethod
+    def _filtros_ventas(
         fecha_inicio: Optional[datetime] = None,
         fecha_fin: Optional[datetime] = None,
         id_cliente: Optional[int] = None
+    ) -> Tuple[str, list]:
+        """
+        Construye las condiciones WHERE de los filtros de ventas
+
+        Returns:
+            Tupla (fragmento SQL, parametros)
+        """
+        condiciones = ""
+        params = []
+
+        if fecha_inicio:
+            condiciones += " AND v.fecha_venta >= %s"
+            params.append(fecha_inicio)
+
+        if fecha_fin:
+            condiciones += " AND v.fecha_venta <= %s"
+            params.append(fecha_fin)
+
+        if id_cliente:
+            condiciones += " AND v.id_cliente = %s"
+            params.append(id_cliente)
+
+        return condiciones, params
+
+    @staticmethod
+    def obtener_ventas(
+        fecha_inicio: Optional[datetime] = None,
+        fecha_fin: Optional[datetime] = None,
+        id_cliente: Optional[int] = None,
+        limite: Optional[int] = None,
+        cursor_pagina: Optional[str] = None
     ) -> List[dict]:
         """
         RF-05: Obtener lista de ventas con filtros
@@ -127,62 +311,99 @@ class VentaController:
             fecha_inicio: Fecha inicial (opcional)
             fecha_fin: Fecha final (opcional)
             id_cliente: Filtrar por cliente (opcional)
+            limite: Cantidad maxima de resultados (opcional)
+            cursor_pagina: Cursor de paginacion de la pagina anterior (opcional)
 
         Returns:
             Lista de ventas con detalles de productos
         """
+        condiciones, params_filtros = VentaController._filtros_ventas(fecha_inicio, fecha_fin, id_cliente)
+        condicion_cursor, params_cursor = condicion_keyset("v.fecha_venta", "v.id_venta", cursor_pagina)
+
+        query = f"""
+            SELECT v.id_venta, v.id_usuario, v.id_cliente, v.total, v.fecha_venta,
+                   c.nombre as nombre_cliente, u.username as nombre_usuario
+            FROM ventas v
+            JOIN clientes c ON v.id_cliente = c.id_cliente
+            JOIN usuarios u ON v.id_usuario = u.id_usuario
+            WHERE 1=1{condiciones}{condicion_cursor}
+            ORDER BY v.fecha_venta DESC, v.id_venta DESC
+        """
+        params = [*params_filtros, *params_cursor]
+
+        if limite:
+            query += " LIMIT %s"
+            params.append(limite)
+
         with get_db_cursor() as cursor:
-            query = """
-                SELECT v.id_venta, v.id_usuario, v.id_cliente, v.total, v.fecha_venta,
-                       c.nombre as nombre_cliente, u.username as nombre_usuario
-                FROM ventas v
-                JOIN clientes c ON v.id_cliente = c.id_cliente
-                JOIN usuarios u ON v.id_usuario = u.id_usuario
-                WHERE 1=1
-            """
-            params = []
+            cursor.execute(query, params)
+            ventas = [dict(venta) for venta in cursor.fetchall()]
 
-            if fecha_inicio:
-                query += " AND v.fecha_venta >= %s"
-                params.append(fecha_inicio)
+            # Obtener los productos de todas las ventas en una sola consulta
+            productos_por_venta = VentaController._obtener_productos_de_ventas(
+                cursor, [venta['id_venta'] for venta in ventas]
+            )
 
-            if fecha_fin:
-                query += " AND v.fecha_venta <= %s"
-                params.append(fecha_fin)
+        ventas_con_productos = []
+        for venta_dict in ventas:
+            venta_dict['productos'] = productos_por_venta.get(venta_dict['id_venta'], [])
+            venta_dict['total_productos'] = len(venta_dict['productos'])
+            ventas_con_productos.append(venta_dict)
 
-            if id_cliente:
-                query += " AND v.id_cliente = %s"
-                params.append(id_cliente)
+        return ventas_con_productos
 
-            query += " ORDER BY v.fecha_venta DESC"
+    @staticmethod
+    def contar_ventas(
+        fecha_inicio: Optional[datetime] = None,
+        fecha_fin: Optional[datetime] = None,
+        id_cliente: Optional[int] = None
+    ) -> int:
+        """
+        Contar las ventas que cumplen los filtros
 
-            cursor.execute(query, params)
-            ventas = cursor.fetchall()
+        Returns:
+            Total de ventas
+        """
+        condiciones, params = VentaController._filtros_ventas(fecha_inicio, fecha_fin, id_cliente)
 
-            # Para cada venta, obtener sus productos
-            ventas_con_productos = []
-            for venta in ventas:
-                venta_dict = dict(venta)
+        with get_db_cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) as total FROM ventas v WHERE 1=1{condiciones}", params)
+            return cursor.fetchone()["total"]
 
-                # Obtener detalles de productos de esta venta
-                cursor.execute(
-                    """
-                    SELECT dv.id_producto, dv.cantidad, dv.precio_unitario,
-                           (dv.cantidad * dv.precio_unitario) as subtotal,
-                           p.nombre, p.codigo, p.categoria, p.imagen_url
-                    FROM detalle_ventas dv
-                    JOIN productos p ON dv.id_producto = p.id_producto
-                    WHERE dv.id_venta = %s
-                    """,
-                    (venta_dict['id_venta'],)
-                )
-                productos = cursor.fetchall()
-                venta_dict['productos'] = [dict(prod) for prod in productos]
-                venta_dict['total_productos'] = len(venta_dict['productos'])
+    @staticmethod
+    def _obtener_productos_de_ventas(cursor, ids_venta: List[int]) -> Dict[int, List[dict]]:
+        """
+        Obtiene los productos de varias ventas con una sola consulta
 
-                ventas_con_productos.append(venta_dict)
+        Args:
+            cursor: Cursor de base de datos abierto
+            ids_venta: IDs de las ventas
 
-        return ventas_con_productos
+        Returns:
+            Diccionario id_venta -> lista de productos de la venta
+        """
+        productos_por_venta: Dict[int, List[dict]] = {}
+        if not ids_venta:
+            return productos_por_venta
+
+        cursor.execute(
+            """
+            SELECT dv.id_venta, dv.id_producto, dv.cantidad, dv.precio_unitario,
+                   (dv.cantidad * dv.precio_unitario) as subtotal,
+                   p.nombre, p.codigo, p.categoria, p.imagen_url
+            FROM detalle_ventas dv
+            JOIN productos p ON dv.id_producto = p.id_producto
+            WHERE dv.id_venta = ANY(%s)
+            ORDER BY dv.id_venta, dv.id_detalle
+            """,
+            (ids_venta,)
+        )
+        for fila in cursor.fetchall():
+            producto = dict(fila)
+            id_venta = producto.pop('id_venta')
+            productos_por_venta.setdefault(id_venta, []).append(producto)
+
+        return productos_por_venta
 
     @staticmethod
     def obtener_venta(id_venta: int) -> dict:
@@ -239,6 +460,108 @@ class VentaController:
             "detalles": [dict(d) for d in detalles]
         }
 
+    @staticmethod
+    def version_datos_reporte(
+        fecha_inicio: Optional[datetime] = None,
+        fecha_fin: Optional[datetime] = None,
+        id_cliente: Optional[int] = None
+    ) -> str:
+        """
+        Marca de version de las ventas que entran en un reporte
+
+        Cambia cuando se registra una venta en el rango (las ventas no se editan ni
+        se eliminan). Se usa como parte de la clave de la cache de reportes.
+
+        Returns:
+            Texto con la cantidad de ventas, el mayor id y la suma de totales
+        """
+        condiciones, params = VentaController._filtros_ventas(fecha_inicio, fecha_fin, id_cliente)
+
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT COUNT(*) AS ventas, COALESCE(MAX(v.id_venta), 0) AS ultima,
+                       COALESCE(SUM(v.total), 0) AS monto
+                FROM ventas v
+                WHERE 1=1{condiciones}
+                """,
+                params
+            )
+            marca = cursor.fetchone()
+
+        return f"{marca['ventas']}:{marca['ultima']}:{marca['monto']}"
+
+    @staticmethod
+    def generar_reporte_pdf(
+        fecha_inicio: Optional[datetime] = None,
+        fecha_fin: Optional[datetime] = None,
+        id_cliente: Optional[int] = None
+    ) -> BinaryIO:
+        """
+        Genera el reporte de ventas en PDF leyendo las ventas con un cursor del servidor
+
+        Las ventas llegan en bloques y el PDF se escribe pagina por pagina en un
+        archivo temporal (en memoria hasta REPORT_SPOOL_MAX_MB, luego en disco).
+        Es una funcion bloqueante: ejecutarla en un hilo de trabajo.
+
+        Args:
+            fecha_inicio: Fecha inicial (opcional)
+            fecha_fin: Fecha final (opcional)
+            id_cliente: Filtrar por cliente (opcional)
+
+        Returns:
+            Archivo temporal con el PDF, posicionado al inicio (el llamador lo cierra)
+        """
+        condiciones, params = VentaController._filtros_ventas(fecha_inicio, fecha_fin, id_cliente)
+        archivo = tempfile.SpooledTemporaryFile(max_size=settings.report_spool_max_mb * 1024 * 1024)
+
+        try:
+            with get_db_server_cursor("reporte_ventas_pdf", itersize=VentaController.LOTE_REPORTE) as cursor:
+                # Totales y filas se leen de la misma foto de los datos (REPEATABLE READ)
+                with cursor.connection.cursor() as cursor_resumen:
+                    cursor_resumen.execute(
+                        f"""
+                        SELECT COUNT(*) AS total_ventas,
+                               COALESCE(SUM(v.total), 0) AS monto_total,
+                               (SELECT COUNT(*) FROM detalle_ventas dv
+                                JOIN ventas v ON v.id_venta = dv.id_venta
+                                WHERE 1=1{condiciones}) AS productos_vendidos
+                        FROM ventas v
+                        WHERE 1=1{condiciones}
+                        """,
+                        [*params, *params]
+                    )
+                    resumen = dict(cursor_resumen.fetchone())
+
+                cursor.execute(
+                    f"""
+                    SELECT v.id_venta, v.total, v.fecha_venta,
+                           c.nombre as nombre_cliente, u.username as nombre_usuario,
+                           (SELECT COUNT(*) FROM detalle_ventas dv WHERE dv.id_venta = v.id_venta) as total_productos
+                    FROM ventas v
+                    JOIN clientes c ON v.id_cliente = c.id_cliente
+                    JOIN usuarios u ON v.id_usuario = u.id_usuario
+                    WHERE 1=1{condiciones}
+                    ORDER BY v.fecha_venta DESC, v.id_venta DESC
+                    """,
+                    params
+                )
+
+                def lotes():
+                    while True:
+                        filas = cursor.fetchmany(VentaController.LOTE_REPORTE)
+                        if not filas:
+                            return
+                        yield filas
+
+                PDFGenerator.escribir_reporte_ventas(archivo, resumen, lotes())
+        except BaseException:
+            archivo.close()
+            raise
+
+        archivo.seek(0)
+        return archivo
+
     @staticmethod
     def obtener_ventas_diarias(fecha: Optional[date] = None) -> dict:
         """
@@ -253,22 +576,124 @@ class VentaController:
         if fecha is None:
             fecha = date.today()
 
+        reporte = VentaController.obtener_reporte_ventas(fecha, fecha, "dia")
+
+        return {
+            "fecha": fecha.isoformat(),
+            **reporte["totales"]
+        }
+
+    @staticmethod
+    def obtener_reporte_ventas(
+        fecha_inicio: date,
+        fecha_fin: date,
+        agrupacion: str = "dia",
+        id_usuario: Optional[int] = None
+    ) -> dict:
+        """
+        RF-05: Reporte de ventas de un rango de fechas agrupado por dia, semana o mes
+
+        Lee los totales diarios (ventas_resumen_diario y ventas_resumen_categoria),
+        de modo que el costo depende de la cantidad de dias del rango y no de la
+        cantidad de ventas. Los periodos sin ventas se incluyen en cero.
+
+        Args:
+            fecha_inicio: Primer dia del rango
+            fecha_fin: Ultimo dia del rango (incluido)
+            agrupacion: 'dia', 'semana' (lunes a domingo) o 'mes'
+            id_usuario: Filtrar por el usuario que registro las ventas (opcional)
+
+        Returns:
+            Rango, periodos (inicio, total_ventas, monto_total, productos_vendidos),
+            totales y totales por categoria
+
+        Raises:
+            HTTPException: Si el rango o la agrupacion no son validos
+        """
+        unidad = VentaController.AGRUPACIONES_REPORTE.get(agrupacion)
+        if unidad is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Agrupacion invalida. Opciones: {', '.join(VentaController.AGRUPACIONES_REPORTE)}"
+            )
+
+        if fecha_fin < fecha_inicio:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La fecha final debe ser igual o posterior a la fecha inicial"
+            )
+
+        if (fecha_fin - fecha_inicio).days >= VentaController.MAX_DIAS_REPORTE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"El rango no puede superar {VentaController.MAX_DIAS_REPORTE} dias"
+            )
+
+        params = {
+            "unidad": unidad,
+            "desde": fecha_inicio,
+            "hasta": fecha_fin + timedelta(days=1),
+            "id_usuario": id_usuario,
+        }
+        filtro_usuario = " AND id_usuario = %(id_usuario)s" if id_usuario else ""
+
         with get_db_cursor() as cursor:
             cursor.execute(
-                """
-                SELECT
-                    COUNT(v.id_venta) as total_ventas,
-                    COALESCE(SUM(v.total), 0) as monto_total,
-                    COALESCE(SUM(dv.cantidad), 0) as productos_vendidos
-                FROM ventas v
-                LEFT JOIN detalle_ventas dv ON v.id_venta = dv.id_venta
-                WHERE DATE(v.fecha_venta) = %s
+                f"""
+                WITH por_periodo AS (
+                    SELECT date_trunc(%(unidad)s, dia::timestamp) AS periodo,
+                           SUM(total_ventas) AS total_ventas,
+                           SUM(monto_total) AS monto_total,
+                           SUM(productos_vendidos) AS productos_vendidos
+                    FROM ventas_resumen_diario
+                    WHERE dia >= %(desde)s AND dia < %(hasta)s{filtro_usuario}
+                    GROUP BY 1
+                ),
+                periodos AS (
+                    SELECT generate_series(
+                        date_trunc(%(unidad)s, %(desde)s::timestamp),
+                        %(hasta)s::timestamp - INTERVAL '1 microsecond',
+                        ('1 ' || %(unidad)s)::interval
+                    ) AS periodo
+                )
+                SELECT p.periodo::date AS inicio,
+                       COALESCE(pp.total_ventas, 0)::int AS total_ventas,
+                       COALESCE(pp.monto_total, 0) AS monto_total,
+                       COALESCE(pp.productos_vendidos, 0)::int AS productos_vendidos
+                FROM periodos p
+                LEFT JOIN por_periodo pp ON pp.periodo = p.periodo
+                ORDER BY p.periodo
                 """,
-                (fecha,)
+                params
             )
-            reporte = cursor.fetchone()
+            periodos = [dict(fila) for fila in cursor.fetchall()]
+
+            cursor.execute(
+                f"""
+                SELECT categoria,
+                       SUM(productos_vendidos)::int AS productos_vendidos,
+                       SUM(monto) AS monto
+                FROM ventas_resumen_categoria
+                WHERE dia >= %(desde)s AND dia < %(hasta)s{filtro_usuario}
+                GROUP BY categoria
+                ORDER BY monto DESC
+                """,
+                params
+            )
+            categorias = [dict(fila) for fila in cursor.fetchall()]
+
+        for periodo in periodos:
+            periodo["inicio"] = periodo["inicio"].isoformat()
 
         return {
-            "fecha": fecha.isoformat(),
-            **dict(reporte)
+            "fecha_inicio": fecha_inicio.isoformat(),
+            "fecha_fin": fecha_fin.isoformat(),
+            "agrupacion": agrupacion,
+            "periodos": periodos,
+            "totales": {
+                "total_ventas": sum(p["total_ventas"] for p in periodos),
+                "monto_total": sum((p["monto_total"] for p in periodos), Decimal("0")),
+                "productos_vendidos": sum(p["productos_vendidos"] for p in periodos),
+            },
+            "por_categoria": categorias
         }
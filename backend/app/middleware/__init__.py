@@ -1,9 +1,11 @@
 """
 Middleware de autenticacion y validacion
 """
-from .auth import get_current_user, get_current_user_optional
+from .auth import get_current_user, get_current_user_optional, get_current_user_sse, invalidar_usuario_cache
 
 __all__ = [
     "get_current_user",
     "get_current_user_optional",
+    "get_current_user_sse",
+    "invalidar_usuario_cache",
 ]
@@ -2,24 +2,73 @@
 Middleware de autenticacion
 RF-01: Validacion de tokens JWT para proteger endpoints
 """
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from app.utils.security import decode_access_token
-from app.config.database import get_db_cursor
+from app.utils.cache import TTLCache
+from app.utils.notificaciones import canal_cambios
+from app.config.database import get_db_cursor, run_in_db_thread
+from app.config.settings import settings
 
 # Sistema de seguridad Bearer Token
 security = HTTPBearer()
+# Igual, pero sin rechazar la solicitud si falta el header
+security_opcional = HTTPBearer(auto_error=False)
 
+# Usuarios autenticados recientemente, por id_usuario
+usuarios_cache = TTLCache(
+    maxsize=settings.user_cache_max_size,
+    ttl=settings.user_cache_ttl_seconds,
+    nombre="usuarios"
+)
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> dict:
+
+def _buscar_usuario(id_usuario: int) -> Optional[dict]:
+    """Consulta el usuario autenticado en la base de datos (solo activos y no eliminados)"""
+    with get_db_cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT id_usuario, username, email FROM usuarios
+            WHERE id_usuario = %s AND activo = TRUE AND eliminado = FALSE
+            """,
+            (id_usuario,)
+        )
+        user = cursor.fetchone()
+
+    return dict(user) if user else None
+
+
+def invalidar_usuario_cache(id_usuario: int) -> None:
     """
-    Obtiene el usuario actual desde el token JWT
+    Descarta el usuario de la cache de autenticacion, en este y en los demas procesos
+    Debe llamarse (ya confirmado el cambio) cuando el usuario se desactiva, se elimina
+    o cierra todas sus sesiones
 
     Args:
-        credentials: Credenciales Bearer del header
+        id_usuario: ID del usuario
+    """
+    usuarios_cache.invalidate(id_usuario)
+    canal_cambios.notificar_ahora("usuarios", {"id_usuario": id_usuario})
+
+
+def _aplicar_cambio_remoto(cambio: Optional[dict]) -> None:
+    """Aplica un cambio de usuarios hecho por otro proceso"""
+    if cambio is None:
+        usuarios_cache.clear()
+    else:
+        usuarios_cache.invalidate(cambio["id_usuario"])
+
+
+canal_cambios.suscribir("usuarios", _aplicar_cambio_remoto)
+
+
+async def _usuario_desde_token(token: str) -> dict:
+    """
+    Valida un token JWT y obtiene su usuario
+
+    Args:
+        token: Token de acceso
 
     Returns:
         Datos del usuario autenticado
@@ -27,8 +76,6 @@ async def get_current_user(
     Raises:
         HTTPException: Si el token es invalido o el usuario no existe
     """
-    token = credentials.credentials
-
     # Decodificar token
     payload = decode_access_token(token)
 
@@ -49,13 +96,14 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Verificar que el usuario existe en la base de datos
-    with get_db_cursor() as cursor:
-        cursor.execute(
-            "SELECT id_usuario, username, email FROM usuarios WHERE id_usuario = %s",
-            (id_usuario,)
-        )
-        user = cursor.fetchone()
+    # Verificar que el usuario existe (cache en memoria, luego base de datos)
+    user = usuarios_cache.get(id_usuario)
+    if user is None:
+        # Si el usuario se modifica durante la consulta, no guardar el dato viejo
+        generacion = usuarios_cache.generacion
+        user = await run_in_db_thread(_buscar_usuario, id_usuario)
+        if user is not None:
+            usuarios_cache.set(id_usuario, user, generacion=generacion)
 
     if user is None:
         raise HTTPException(
@@ -67,6 +115,58 @@ async def get_current_user(
     return dict(user)
 
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> dict:
+    """
+    Obtiene el usuario actual desde el token JWT
+
+    Args:
+        credentials: Credenciales Bearer del header
+
+    Returns:
+        Datos del usuario autenticado
+
+    Raises:
+        HTTPException: Si el token es invalido o el usuario no existe
+    """
+    return await _usuario_desde_token(credentials.credentials)
+
+
+async def get_current_user_sse(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security_opcional),
+    token: Optional[str] = Query(None, description="Token de acceso (EventSource no permite enviar encabezados)")
+) -> dict:
+    """
+    Obtiene el usuario actual para flujos de eventos (Server-Sent Events)
+
+    El EventSource del navegador no puede enviar el header Authorization, por lo
+    que tambien se acepta el token en el parametro ?token= de la URL. El header
+    tiene prioridad si viene en la solicitud.
+
+    Args:
+        credentials: Credenciales Bearer del header (opcional)
+        token: Token en la URL (opcional)
+
+    Returns:
+        Datos del usuario autenticado
+
+    Raises:
+        HTTPException: Si no hay token, es invalido o el usuario no existe
+    """
+    if credentials is not None:
+        token = credentials.credentials
+
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return await _usuario_desde_token(token)
+
+
 async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ) -> Optional[dict]:
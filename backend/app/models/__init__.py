@@ -10,6 +10,7 @@ from .cliente import (
 from .venta import (
     VentaBase, VentaCreate, VentaResponse, DetalleVentaBase, DetalleVentaCreate, DetalleVentaResponse, VentaFiltro, VentasDiarias
 )
+from .reporte import ReporteSolicitud
 from .servicio import (
     ServicioBase, ServicioCreate, ServicioUpdate, ServicioResponse, ServicioFiltro, ServicioPendiente, EstadoServicio
 )
@@ -19,5 +20,6 @@ __all__ = [
     "ProductoBase", "ProductoCreate", "ProductoUpdate", "ProductoResponse", "ProductoFiltro", "StockBajo", "CategoriaProducto",
     "ClienteBase", "ClienteCreate", "ClienteUpdate", "ClienteResponse",
     "VentaBase", "VentaCreate", "VentaResponse", "DetalleVentaBase", "DetalleVentaCreate", "DetalleVentaResponse", "VentaFiltro", "VentasDiarias",
+    "ReporteSolicitud",
     "ServicioBase", "ServicioCreate", "ServicioUpdate", "ServicioResponse", "ServicioFiltro", "ServicioPendiente", "EstadoServicio",
 ]
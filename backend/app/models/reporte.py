@@ -0,0 +1,15 @@
+"""
+Modelo de Reportes
+Solicitudes de reportes generados en segundo plano
+"""
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class ReporteSolicitud(BaseModel):
+    """Solicitud de un reporte (trabajo en segundo plano)"""
+    tipo: str = Field("ventas_pdf", description="Tipo de reporte")
+    fecha_inicio: Optional[datetime] = None
+    fecha_fin: Optional[datetime] = None
+    id_cliente: Optional[int] = None
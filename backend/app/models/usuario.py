@@ -2,7 +2,7 @@
 Modelo de Usuario
 RF-01: Iniciar Sesión
 """
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 
@@ -20,7 +20,8 @@ class UsuarioCreate(UsuarioBase):
 
 class UsuarioLogin(BaseModel):
     """RF-01: Modelo para inicio de sesión"""
-    username: str
+    # Limite de login_attempts.username y auditoria.username (VARCHAR(100))
+    username: str = Field(..., max_length=100)
     password: str
 
 
@@ -1,7 +1,7 @@
 """
 Rutas de la API REST
 """
-from . import auth, productos, clientes, ventas, servicios
+from . import auth, productos, clientes, ventas, servicios, dashboard, busqueda, reportes, exportar, eventos
 
 __all__ = [
     "auth",
@@ -9,4 +9,9 @@ __all__ = [
     "clientes",
     "ventas",
     "servicios",
+    "dashboard",
+    "busqueda",
+    "reportes",
+    "exportar",
+    "eventos",
 ]
@@ -8,6 +8,7 @@ from pydantic import BaseModel, EmailStr
 from app.models.usuario import UsuarioLogin, UsuarioCreate, Token
 from app.models.security import RefreshTokenRequest, TokenPair
 from app.controllers.auth_controller import AuthController
+from app.config.database import run_in_db_thread
 from app.middleware.auth import get_current_user
 
 router = APIRouter()
@@ -48,7 +49,7 @@ async def login(usuario: UsuarioLogin, request: Request):
     ip_address = request.client.host if request.client else "0.0.0.0"
     user_agent = request.headers.get("user-agent")
 
-    return AuthController.login(usuario, ip_address, user_agent)
+    return await AuthController.login(usuario, ip_address, user_agent)
 
 
 @router.post("/register", response_model=dict, summary="Registrar usuario")
@@ -64,7 +65,7 @@ async def register(usuario: UsuarioCreate, request: Request):
         Usuario creado
     """
     ip_address = request.client.host if request.client else None
-    return AuthController.register(usuario, ip_address)
+    return await AuthController.register(usuario, ip_address)
 
 
 @router.post("/refresh", response_model=dict, summary="Refrescar access token")
@@ -82,7 +83,8 @@ async def refresh_token(token_request: RefreshTokenRequest, request: Request):
     ip_address = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent")
 
-    return AuthController.refresh_access_token(
+    return await run_in_db_thread(
+        AuthController.refresh_access_token,
         token_request.refresh_token,
         ip_address,
         user_agent
@@ -108,7 +110,8 @@ async def logout(
     """
     ip_address = request.client.host if request.client else None
 
-    return AuthController.logout(
+    return await run_in_db_thread(
+        AuthController.logout,
         token_request.refresh_token,
         current_user["id_usuario"],
         current_user["username"],
@@ -138,7 +141,8 @@ async def logout_all_sessions(
     """
     ip_address = request.client.host if request.client else None
 
-    return AuthController.logout_all_sessions(
+    return await run_in_db_thread(
+        AuthController.logout_all_sessions,
         current_user["id_usuario"],
         current_user["username"],
         ip_address
@@ -161,7 +165,7 @@ async def forgot_password(reset_request: PasswordResetRequest, request: Request)
     """
     ip_address = request.client.host if request.client else None
 
-    return AuthController.request_password_reset(reset_request.email, ip_address)
+    return await AuthController.request_password_reset(reset_request.email, ip_address)
 
 
 @router.post("/reset-password", response_model=dict, summary="Restablecer contraseña")
@@ -181,7 +185,7 @@ async def reset_password(reset_confirm: PasswordResetConfirm, request: Request):
     """
     ip_address = request.client.host if request.client else None
 
-    return AuthController.reset_password(
+    return await AuthController.reset_password(
         reset_confirm.token,
         reset_confirm.new_password,
         ip_address
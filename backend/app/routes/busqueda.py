@@ -0,0 +1,35 @@
+"""
+Rutas de Busqueda
+RF-10, RF-14: Busqueda unificada de clientes, servicios y productos
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
+from app.controllers.busqueda_controller import BusquedaController, TIPOS_BUSQUEDA
+from app.config.database import run_in_db_thread
+from app.middleware.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get("", response_model=List[dict], summary="Buscar clientes, servicios y productos")
+async def buscar(
+    q: str = Query(..., min_length=1, max_length=100, description="Texto a buscar"),
+    tipos: Optional[List[str]] = Query(None, description="cliente, servicio y/o producto (por defecto todos)"),
+    limite: int = Query(20, ge=1, le=100, description="Cantidad maxima de resultados"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    RF-10, RF-14: Buscar en clientes, servicios y productos con resultados
+    ordenados por relevancia (ignora acentos y busca por prefijos)
+
+    Requiere autenticacion
+    """
+    if tipos:
+        invalidos = [t for t in tipos if t not in TIPOS_BUSQUEDA]
+        if invalidos:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Tipos de busqueda invalidos: {', '.join(invalidos)}"
+            )
+
+    return await run_in_db_thread(BusquedaController.buscar, q.strip(), tipos, limite)
@@ -2,10 +2,14 @@
 Rutas de Clientes
 RF-07: Datos Basicos Clientes
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from typing import List, Optional
 from app.models.cliente import ClienteCreate, ClienteUpdate, ClienteResponse
 from app.controllers.cliente_controller import ClienteController
+from app.config.database import run_in_db_thread
+from app.utils.pagination import LIMITE_MAXIMO, aplicar_encabezados_paginacion
+from app.utils.conditional import verificar_condicional
+from app.utils.responses import respuesta_json
 from app.middleware.auth import get_current_user
 
 router = APIRouter()
@@ -18,20 +22,46 @@ async def crear_cliente(cliente: ClienteCreate):
 
     Si el cliente ya existe (por documento), retorna el existente
     """
-    return ClienteController.crear_cliente(cliente)
+    return await run_in_db_thread(ClienteController.crear_cliente, cliente)
 
 
 @router.get("/", response_model=List[dict], summary="Listar clientes")
 async def obtener_clientes(
+    request: Request,
+    response: Response,
     busqueda: Optional[str] = Query(None, description="Buscar por nombre o documento"),
+    limite: Optional[int] = Query(None, ge=1, le=LIMITE_MAXIMO, description="Cantidad maxima de resultados por pagina"),
+    cursor: Optional[str] = Query(None, description="Cursor de la siguiente pagina (encabezado X-Next-Cursor)"),
+    incluir_total: bool = Query(False, description="Incluir el total de resultados (encabezado X-Total-Count)"),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Obtener lista de clientes con busqueda opcional
 
+    Paginacion por cursor: enviar limite y, para las paginas siguientes, el cursor
+    recibido en el encabezado X-Next-Cursor
+
+    Responde 304 Not Modified si el listado no cambio (If-None-Match)
+
     Requiere autenticacion
     """
-    return ClienteController.obtener_clientes(busqueda=busqueda)
+    no_modificado = verificar_condicional(request, response, ("clientes",))
+    if no_modificado:
+        return no_modificado
+
+    clientes = await run_in_db_thread(
+        ClienteController.obtener_clientes,
+        busqueda=busqueda,
+        limite=limite,
+        cursor_pagina=cursor
+    )
+
+    total = None
+    if incluir_total:
+        total = await run_in_db_thread(ClienteController.contar_clientes, busqueda=busqueda)
+
+    aplicar_encabezados_paginacion(response, clientes, limite, "fecha_registro", "id_cliente", total)
+    return respuesta_json(clientes, response)
 
 
 @router.get("/buscar/{documento}", response_model=dict, summary="Buscar cliente por documento")
@@ -44,20 +74,28 @@ async def buscar_cliente_por_documento(
 
     Requiere autenticacion
     """
-    return ClienteController.buscar_por_documento(documento)
+    return await run_in_db_thread(ClienteController.buscar_por_documento, documento)
 
 
 @router.get("/{id_cliente}", response_model=dict, summary="Obtener cliente")
 async def obtener_cliente(
     id_cliente: int,
+    request: Request,
+    response: Response,
     current_user: dict = Depends(get_current_user)
 ):
     """
     Obtener un cliente especifico por ID
 
+    Responde 304 Not Modified si el cliente no cambio (If-None-Match)
+
     Requiere autenticacion
     """
-    return ClienteController.obtener_cliente(id_cliente)
+    no_modificado = verificar_condicional(request, response, ("clientes",))
+    if no_modificado:
+        return no_modificado
+
+    return await run_in_db_thread(ClienteController.obtener_cliente, id_cliente)
 
 
 @router.put("/{id_cliente}", response_model=dict, summary="Actualizar cliente")
@@ -71,7 +109,7 @@ async def actualizar_cliente(
 
     Requiere autenticacion
     """
-    return ClienteController.actualizar_cliente(id_cliente, cliente)
+    return await run_in_db_thread(ClienteController.actualizar_cliente, id_cliente, cliente)
 
 
 @router.delete("/{id_cliente}", response_model=dict, summary="Eliminar cliente")
@@ -84,4 +122,4 @@ async def eliminar_cliente(
 
     Requiere autenticacion
     """
-    return ClienteController.eliminar_cliente(id_cliente)
+    return await run_in_db_thread(ClienteController.eliminar_cliente, id_cliente)
@@ -0,0 +1,24 @@
+"""
+Rutas del Dashboard
+RF-08: Tablero Inicial
+"""
+from fastapi import APIRouter, Depends, Query
+from app.controllers.dashboard_controller import DashboardController
+from app.config.database import run_in_db_thread
+from app.middleware.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get("/resumen", response_model=dict, summary="Resumen del tablero")
+async def obtener_resumen(
+    dias: int = Query(DashboardController.DIAS_GRAFICA, ge=1, le=90, description="Dias de la serie de ventas"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    RF-08: Obtener los contadores, ingresos del mes, producto mas vendido
+    y la serie de ventas por dia del tablero inicial
+
+    Requiere autenticacion
+    """
+    return await run_in_db_thread(DashboardController.obtener_resumen, dias)
@@ -0,0 +1,70 @@
+"""
+Rutas de Eventos en tiempo real
+Flujo Server-Sent Events con los cambios de stock y de servicios de reparacion
+"""
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from app.config.settings import settings
+from app.middleware.auth import get_current_user_sse
+from app.models.servicio import EstadoServicio
+from app.utils.eventos import bus_eventos, crear_filtro, transmitir, TIPOS_EVENTO
+
+router = APIRouter()
+
+
+@router.get("/", summary="Flujo de eventos (Server-Sent Events)")
+async def flujo_eventos(
+    tipos: Optional[List[str]] = Query(None, description="producto, servicio (por defecto ambos)"),
+    id_producto: Optional[List[int]] = Query(None, description="Solo eventos de estos productos"),
+    estado: Optional[List[EstadoServicio]] = Query(None, description="Solo servicios que quedaron en estos estados"),
+    solo_stock_bajo: bool = Query(False, description="Solo productos que quedaron con stock bajo"),
+    current_user: dict = Depends(get_current_user_sse)
+):
+    """
+    Flujo text/event-stream con los cambios de productos (stock) y servicios
+
+    Eventos:
+    - producto: {accion: creado|actualizado|eliminado|venta, id_producto, cantidad, stock_bajo}
+    - servicio: {accion: creado|actualizado|eliminado, id_servicio, id_cliente, estado}
+    - reinicio: se perdieron eventos; el cliente debe recargar sus listados
+
+    Uso desde el navegador: new EventSource('/api/eventos/?token=...&tipos=servicio').
+    Al reconectar no se reenvian los eventos perdidos: recargar los listados.
+
+    Requiere autenticacion (header Authorization o parametro token)
+    """
+    tipos_invalidos = set(tipos or []) - set(TIPOS_EVENTO)
+    if tipos_invalidos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tipo de evento invalido. Opciones: {', '.join(TIPOS_EVENTO)}"
+        )
+
+    if bus_eventos.lleno:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Demasiados clientes conectados, intente nuevamente en unos segundos"
+        )
+
+    filtro = crear_filtro(
+        tipos=tipos,
+        ids_producto=id_producto,
+        estados=[e.value for e in estado] if estado else None,
+        solo_stock_bajo=solo_stock_bajo
+    )
+
+    return StreamingResponse(
+        transmitir(
+            bus_eventos,
+            filtro,
+            heartbeat=settings.events_heartbeat_seconds,
+            duracion_maxima=settings.events_max_stream_seconds
+        ),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Evita que nginx acumule el flujo en su buffer
+            "X-Accel-Buffering": "no"
+        }
+    )
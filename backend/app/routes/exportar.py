@@ -0,0 +1,79 @@
+"""
+Rutas de Exportacion
+Descarga masiva de ventas, productos y servicios en CSV o NDJSON
+"""
+from datetime import datetime
+from typing import Iterator, Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from app.controllers.exportacion_controller import ExportacionController, FORMATOS_EXPORTACION
+from app.middleware.auth import get_current_user
+from app.models.servicio import EstadoServicio
+from app.utils.streaming import iterar_generador
+
+router = APIRouter()
+
+PATRON_FORMATO = "^(csv|ndjson)$"
+
+
+def _respuesta_exportacion(generador: Iterator[bytes], entidad: str, formato: str) -> StreamingResponse:
+    fecha_actual = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return StreamingResponse(
+        iterar_generador(generador),
+        media_type=FORMATOS_EXPORTACION[formato],
+        headers={
+            "Content-Disposition": f"attachment; filename=PlayZone_{entidad}_{fecha_actual}.{formato}"
+        }
+    )
+
+
+@router.get("/ventas", summary="Exportar ventas")
+async def exportar_ventas(
+    formato: str = Query("csv", pattern=PATRON_FORMATO, description="csv o ndjson"),
+    fecha_inicio: Optional[datetime] = Query(None, description="Fecha inicial"),
+    fecha_fin: Optional[datetime] = Query(None, description="Fecha final"),
+    id_cliente: Optional[int] = Query(None, description="Filtrar por cliente"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Exportar ventas con sus productos (CSV: una fila por producto vendido;
+    NDJSON: un objeto por venta)
+
+    Requiere autenticacion
+    """
+    generador = ExportacionController.exportar_ventas(formato, fecha_inicio, fecha_fin, id_cliente)
+    return _respuesta_exportacion(generador, "Ventas", formato)
+
+
+@router.get("/productos", summary="Exportar productos")
+async def exportar_productos(
+    formato: str = Query("csv", pattern=PATRON_FORMATO, description="csv o ndjson"),
+    categoria: Optional[str] = Query(None, description="Filtrar por categoria"),
+    stock_bajo: bool = Query(False, description="Solo productos con stock bajo"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Exportar el inventario de productos
+
+    Requiere autenticacion
+    """
+    generador = ExportacionController.exportar_productos(formato, categoria, stock_bajo)
+    return _respuesta_exportacion(generador, "Productos", formato)
+
+
+@router.get("/servicios", summary="Exportar servicios")
+async def exportar_servicios(
+    formato: str = Query("csv", pattern=PATRON_FORMATO, description="csv o ndjson"),
+    estado: Optional[EstadoServicio] = Query(None, description="Filtrar por estado"),
+    id_cliente: Optional[int] = Query(None, description="Filtrar por cliente"),
+    fecha_inicio: Optional[datetime] = Query(None, description="Fecha de ingreso inicial"),
+    fecha_fin: Optional[datetime] = Query(None, description="Fecha de ingreso final"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Exportar servicios de reparacion
+
+    Requiere autenticacion
+    """
+    generador = ExportacionController.exportar_servicios(formato, estado, id_cliente, fecha_inicio, fecha_fin)
+    return _respuesta_exportacion(generador, "Servicios", formato)
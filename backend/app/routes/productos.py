@@ -2,10 +2,14 @@
 Rutas de Productos
 RF-02, RF-03, RF-08, RF-09, RF-10, RF-11
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from typing import List, Optional
 from app.models.producto import ProductoCreate, ProductoUpdate, ProductoResponse
 from app.controllers.producto_controller import ProductoController
+from app.config.database import run_in_db_thread
+from app.utils.pagination import LIMITE_MAXIMO, HEADER_TOTAL, aplicar_encabezados_paginacion
+from app.utils.conditional import CACHE_PUBLICO, verificar_condicional
+from app.utils.responses import respuesta_json
 from app.middleware.auth import get_current_user
 
 router = APIRouter()
@@ -21,27 +25,93 @@ async def crear_producto(
 
     Requiere autenticacion
     """
-    return ProductoController.crear_producto(producto)
+    return await run_in_db_thread(ProductoController.crear_producto, producto)
 
 
 @router.get("/", response_model=List[dict], summary="Listar productos")
 async def obtener_productos(
+    request: Request,
+    response: Response,
     categoria: Optional[str] = Query(None, description="Filtrar por categoria"),
-    busqueda: Optional[str] = Query(None, description="Buscar por nombre"),
-    stock_bajo: bool = Query(False, description="Solo productos con stock bajo")
+    busqueda: Optional[str] = Query(None, description="Buscar por nombre (ignora acentos y mayusculas)"),
+    stock_bajo: bool = Query(False, description="Solo productos con stock bajo"),
+    orden: str = Query("reciente", pattern="^(reciente|relevancia)$", description="reciente o relevancia (requiere busqueda)"),
+    limite: Optional[int] = Query(None, ge=1, le=LIMITE_MAXIMO, description="Cantidad maxima de resultados por pagina"),
+    cursor: Optional[str] = Query(None, description="Cursor de la siguiente pagina (encabezado X-Next-Cursor)"),
+    incluir_total: bool = Query(False, description="Incluir el total de resultados (encabezado X-Total-Count)"),
 ):
     """
     RF-08: Tablero Inicial - Listar productos
     RF-09: Filtrado de productos por categoria
     RF-10: Busqueda especifica de productos por nombre
     RF-11: Productos con stock bajo
+
+    Paginacion por cursor: enviar limite y, para las paginas siguientes, el cursor
+    recibido en el encabezado X-Next-Cursor
+
+    Con orden=relevancia y busqueda, los resultados se ordenan por parecido con el
+    termino y se aceptan errores de escritura (campo relevancia). Este modo pagina
+    solo con limite, sin cursor.
+
+    Responde 304 Not Modified si el cliente envia el ETag de la version actual
+    (If-None-Match)
     """
-    return ProductoController.obtener_productos(
+    if orden == "relevancia":
+        if not busqueda:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El orden por relevancia requiere un termino de busqueda"
+            )
+        if cursor:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El orden por relevancia no admite cursor de paginacion"
+            )
+
+    no_modificado = verificar_condicional(request, response, ("productos",), CACHE_PUBLICO)
+    if no_modificado:
+        return no_modificado
+
+    if orden == "relevancia":
+        productos = await run_in_db_thread(
+            ProductoController.buscar_productos,
+            busqueda=busqueda,
+            categoria=categoria,
+            stock_bajo=stock_bajo,
+            limite=limite
+        )
+        if incluir_total:
+            total = await run_in_db_thread(
+                ProductoController.contar_productos,
+                categoria=categoria,
+                busqueda=busqueda,
+                stock_bajo=stock_bajo,
+                tolerante=True
+            )
+            response.headers[HEADER_TOTAL] = str(total)
+        return respuesta_json(productos, response)
+
+    productos = await run_in_db_thread(
+        ProductoController.obtener_productos,
         categoria=categoria,
         busqueda=busqueda,
-        stock_bajo=stock_bajo
+        stock_bajo=stock_bajo,
+        limite=limite,
+        cursor_pagina=cursor
     )
 
+    total = None
+    if incluir_total:
+        total = await run_in_db_thread(
+            ProductoController.contar_productos,
+            categoria=categoria,
+            busqueda=busqueda,
+            stock_bajo=stock_bajo
+        )
+
+    aplicar_encabezados_paginacion(response, productos, limite, "fecha_registro", "id_producto", total)
+    return respuesta_json(productos, response)
+
 
 @router.get("/stock-bajo", response_model=List[dict], summary="Productos con stock bajo")
 async def obtener_productos_stock_bajo(
@@ -52,15 +122,21 @@ async def obtener_productos_stock_bajo(
 
     Requiere autenticacion
     """
-    return ProductoController.obtener_productos_stock_bajo()
+    return await run_in_db_thread(ProductoController.obtener_productos_stock_bajo)
 
 
 @router.get("/{id_producto}", response_model=dict, summary="Obtener producto")
-async def obtener_producto(id_producto: int):
+async def obtener_producto(id_producto: int, request: Request, response: Response):
     """
     Obtener un producto especifico por ID
+
+    Responde 304 Not Modified si el producto no cambio (If-None-Match)
     """
-    return ProductoController.obtener_producto(id_producto)
+    no_modificado = verificar_condicional(request, response, ("productos",), CACHE_PUBLICO)
+    if no_modificado:
+        return no_modificado
+
+    return await run_in_db_thread(ProductoController.obtener_producto, id_producto)
 
 
 @router.put("/{id_producto}", response_model=dict, summary="Actualizar producto")
@@ -74,7 +150,7 @@ async def actualizar_producto(
 
     Requiere autenticacion
     """
-    return ProductoController.actualizar_producto(id_producto, producto)
+    return await run_in_db_thread(ProductoController.actualizar_producto, id_producto, producto)
 
 
 @router.delete("/{id_producto}", response_model=dict, summary="Eliminar producto")
@@ -87,4 +163,4 @@ async def eliminar_producto(
 
     Requiere autenticacion
     """
-    return ProductoController.eliminar_producto(id_producto)
+    return await run_in_db_thread(ProductoController.eliminar_producto, id_producto)
@@ -0,0 +1,73 @@
+"""
+Rutas de Reportes
+Reportes generados en segundo plano: solicitar, consultar el estado y descargar
+"""
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query, status
+from app.controllers.reporte_controller import ReporteController
+from app.models.reporte import ReporteSolicitud
+from app.middleware.auth import get_current_user
+from app.utils.streaming import respuesta_descarga
+
+router = APIRouter()
+
+
+def _respuesta_trabajo(trabajo) -> dict:
+    return {
+        **trabajo.a_dict(),
+        "url_estado": f"/api/reportes/trabajos/{trabajo.id}",
+        "url_archivo": f"/api/reportes/trabajos/{trabajo.id}/archivo",
+    }
+
+
+@router.post("/trabajos", response_model=dict, status_code=status.HTTP_202_ACCEPTED, summary="Solicitar reporte")
+async def solicitar_reporte(
+    solicitud: ReporteSolicitud,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Solicita la generacion de un reporte en segundo plano
+
+    Retorna el trabajo con su id; si el reporte ya se genero para los mismos
+    filtros y los datos no cambiaron, el trabajo viene con estado 'listo'
+
+    Requiere autenticacion
+    """
+    trabajo = await ReporteController.solicitar(solicitud, current_user.get("id_usuario"))
+    return _respuesta_trabajo(trabajo)
+
+
+@router.get("/trabajos/{id_trabajo}", response_model=dict, summary="Estado de un reporte")
+async def obtener_trabajo(
+    id_trabajo: str,
+    esperar: float = Query(0, ge=0, le=ReporteController.MAX_ESPERA, description="Segundos a esperar si aun no termina"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Consulta el estado de un trabajo (pendiente, en_proceso, listo o error)
+
+    Con esperar > 0 la respuesta se retiene hasta que el trabajo termine o
+    se cumpla el tiempo indicado
+
+    Requiere autenticacion
+    """
+    trabajo = await ReporteController.obtener(id_trabajo, esperar)
+    return _respuesta_trabajo(trabajo)
+
+
+@router.get("/trabajos/{id_trabajo}/archivo", summary="Descargar reporte")
+async def descargar_trabajo(
+    id_trabajo: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Descarga el archivo de un trabajo terminado
+
+    Requiere autenticacion
+    """
+    trabajo = await ReporteController.obtener(id_trabajo)
+    archivo = ReporteController.abrir_archivo(trabajo)
+
+    fecha = datetime.fromtimestamp(trabajo.terminado_en).strftime('%Y%m%d_%H%M%S')
+    nombre = f"PlayZone_Reporte_{trabajo.tipo.nombre}_{fecha}.{trabajo.tipo.extension}"
+    return respuesta_descarga(archivo, nombre, trabajo.tipo.media_type)
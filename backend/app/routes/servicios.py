@@ -2,10 +2,14 @@
 Rutas de Servicios de Reparacion
 RF-06, RF-13, RF-14
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from typing import List, Optional
 from app.models.servicio import ServicioCreate, ServicioUpdate, ServicioResponse, EstadoServicio
 from app.controllers.servicio_controller import ServicioController
+from app.config.database import run_in_db_thread
+from app.utils.pagination import LIMITE_MAXIMO, aplicar_encabezados_paginacion
+from app.utils.conditional import verificar_condicional
+from app.utils.responses import respuesta_json
 from app.middleware.auth import get_current_user
 
 router = APIRouter()
@@ -21,27 +25,57 @@ async def crear_servicio(
 
     Requiere autenticacion
     """
-    return ServicioController.crear_servicio(servicio)
+    return await run_in_db_thread(ServicioController.crear_servicio, servicio)
 
 
 @router.get("/", response_model=List[dict], summary="Listar servicios")
 async def obtener_servicios(
+    request: Request,
+    response: Response,
     estado: Optional[EstadoServicio] = Query(None, description="Filtrar por estado"),
     id_cliente: Optional[int] = Query(None, description="Filtrar por cliente"),
     consola: Optional[str] = Query(None, description="Buscar por tipo de consola"),
+    limite: Optional[int] = Query(None, ge=1, le=LIMITE_MAXIMO, description="Cantidad maxima de resultados por pagina"),
+    cursor: Optional[str] = Query(None, description="Cursor de la siguiente pagina (encabezado X-Next-Cursor)"),
+    incluir_total: bool = Query(False, description="Incluir el total de resultados (encabezado X-Total-Count)"),
     current_user: dict = Depends(get_current_user)
 ):
     """
     RF-14: Listar servicios con filtros opcionales
 
+    Paginacion por cursor: enviar limite y, para las paginas siguientes, el cursor
+    recibido en el encabezado X-Next-Cursor
+
+    Responde 304 Not Modified si el listado no cambio (If-None-Match)
+
     Requiere autenticacion
     """
-    return ServicioController.obtener_servicios(
+    # Los servicios incluyen datos del cliente
+    no_modificado = verificar_condicional(request, response, ("servicios", "clientes"))
+    if no_modificado:
+        return no_modificado
+
+    servicios = await run_in_db_thread(
+        ServicioController.obtener_servicios,
         estado=estado,
         id_cliente=id_cliente,
-        consola=consola
+        consola=consola,
+        limite=limite,
+        cursor_pagina=cursor
     )
 
+    total = None
+    if incluir_total:
+        total = await run_in_db_thread(
+            ServicioController.contar_servicios,
+            estado=estado,
+            id_cliente=id_cliente,
+            consola=consola
+        )
+
+    aplicar_encabezados_paginacion(response, servicios, limite, "fecha_ingreso", "id_servicio", total)
+    return respuesta_json(servicios, response)
+
 
 @router.get("/pendientes", response_model=List[dict], summary="Servicios pendientes")
 async def obtener_servicios_pendientes(
@@ -52,7 +86,7 @@ async def obtener_servicios_pendientes(
 
     Requiere autenticacion
     """
-    return ServicioController.obtener_servicios_pendientes()
+    return await run_in_db_thread(ServicioController.obtener_servicios_pendientes)
 
 
 @router.get("/buscar", response_model=List[dict], summary="Buscar servicios")
@@ -65,20 +99,28 @@ async def buscar_servicios(
 
     Requiere autenticacion
     """
-    return ServicioController.buscar_por_cliente_o_consola(termino)
+    return await run_in_db_thread(ServicioController.buscar_por_cliente_o_consola, termino)
 
 
 @router.get("/{id_servicio}", response_model=dict, summary="Obtener servicio")
 async def obtener_servicio(
     id_servicio: int,
+    request: Request,
+    response: Response,
     current_user: dict = Depends(get_current_user)
 ):
     """
     Obtener un servicio especifico por ID
 
+    Responde 304 Not Modified si el servicio no cambio (If-None-Match)
+
     Requiere autenticacion
     """
-    return ServicioController.obtener_servicio(id_servicio)
+    no_modificado = verificar_condicional(request, response, ("servicios", "clientes"))
+    if no_modificado:
+        return no_modificado
+
+    return await run_in_db_thread(ServicioController.obtener_servicio, id_servicio)
 
 
 @router.put("/{id_servicio}", response_model=dict, summary="Actualizar servicio")
@@ -92,7 +134,7 @@ async def actualizar_servicio(
 
     Requiere autenticacion
     """
-    return ServicioController.actualizar_servicio(id_servicio, servicio)
+    return await run_in_db_thread(ServicioController.actualizar_servicio, id_servicio, servicio)
 
 
 @router.delete("/{id_servicio}", response_model=dict, summary="Eliminar servicio")
@@ -105,4 +147,4 @@ async def eliminar_servicio(
 
     Requiere autenticacion
     """
-    return ServicioController.eliminar_servicio(id_servicio)
+    return await run_in_db_thread(ServicioController.eliminar_servicio, id_servicio)
@@ -3,14 +3,19 @@ Rutas de Ventas
 RF-04: Registro Ventas
 RF-05: Listado de Ventas
 """
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Query, Response
 from typing import List, Optional
 from datetime import datetime, date
 from app.models.venta import VentaCreate, VentaResponse
 from app.controllers.venta_controller import VentaController
+from app.config.database import run_in_db_thread
+from app.utils.pagination import LIMITE_MAXIMO, aplicar_encabezados_paginacion
+from app.utils.responses import respuesta_json
 from app.middleware.auth import get_current_user
-from app.utils.pdf_generator import PDFGenerator
+from app.controllers.reporte_controller import ReporteController
+from app.models.reporte import ReporteSolicitud
+from app.utils.report_jobs import report_jobs
+from app.utils.streaming import respuesta_descarga
 
 router = APIRouter()
 
@@ -27,27 +32,49 @@ async def crear_venta(
 
     Requiere autenticacion
     """
-    return VentaController.crear_venta(venta)
+    return await run_in_db_thread(VentaController.crear_venta, venta)
 
 
 @router.get("/", response_model=List[dict], summary="Listar ventas")
 async def obtener_ventas(
+    response: Response,
     fecha_inicio: Optional[datetime] = Query(None, description="Fecha inicial"),
     fecha_fin: Optional[datetime] = Query(None, description="Fecha final"),
     id_cliente: Optional[int] = Query(None, description="Filtrar por cliente"),
+    limite: Optional[int] = Query(None, ge=1, le=LIMITE_MAXIMO, description="Cantidad maxima de resultados por pagina"),
+    cursor: Optional[str] = Query(None, description="Cursor de la siguiente pagina (encabezado X-Next-Cursor)"),
+    incluir_total: bool = Query(False, description="Incluir el total de resultados (encabezado X-Total-Count)"),
     current_user: dict = Depends(get_current_user)
 ):
     """
     RF-05: Listar ventas con filtros opcionales
 
+    Paginacion por cursor: enviar limite y, para las paginas siguientes, el cursor
+    recibido en el encabezado X-Next-Cursor
+
     Requiere autenticacion
     """
-    return VentaController.obtener_ventas(
+    ventas = await run_in_db_thread(
+        VentaController.obtener_ventas,
         fecha_inicio=fecha_inicio,
         fecha_fin=fecha_fin,
-        id_cliente=id_cliente
+        id_cliente=id_cliente,
+        limite=limite,
+        cursor_pagina=cursor
     )
 
+    total = None
+    if incluir_total:
+        total = await run_in_db_thread(
+            VentaController.contar_ventas,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            id_cliente=id_cliente
+        )
+
+    aplicar_encabezados_paginacion(response, ventas, limite, "fecha_venta", "id_venta", total)
+    return respuesta_json(ventas, response)
+
 
 @router.get("/diarias", response_model=dict, summary="Reporte de ventas diarias")
 async def obtener_ventas_diarias(
@@ -59,7 +86,26 @@ async def obtener_ventas_diarias(
 
     Requiere autenticacion
     """
-    return VentaController.obtener_ventas_diarias(fecha)
+    return await run_in_db_thread(VentaController.obtener_ventas_diarias, fecha)
+
+
+@router.get("/reporte", response_model=dict, summary="Reporte de ventas por periodo")
+async def obtener_reporte_ventas(
+    fecha_inicio: date = Query(..., description="Primer dia del rango"),
+    fecha_fin: date = Query(..., description="Ultimo dia del rango (incluido)"),
+    agrupacion: str = Query("dia", pattern="^(dia|semana|mes)$", description="Agrupar por dia, semana o mes"),
+    id_usuario: Optional[int] = Query(None, description="Filtrar por usuario que registro la venta"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    RF-05: Obtener totales de ventas de un rango de fechas agrupados por periodo
+    y por categoria
+
+    Requiere autenticacion
+    """
+    return await run_in_db_thread(
+        VentaController.obtener_reporte_ventas, fecha_inicio, fecha_fin, agrupacion, id_usuario
+    )
 
 
 @router.get("/{id_venta}", response_model=dict, summary="Obtener venta")
@@ -72,7 +118,7 @@ async def obtener_venta(
 
     Requiere autenticacion
     """
-    return VentaController.obtener_venta(id_venta)
+    return await run_in_db_thread(VentaController.obtener_venta, id_venta)
 
 
 @router.get("/reporte/pdf", summary="Descargar reporte de ventas en PDF")
@@ -86,27 +132,21 @@ async def descargar_reporte_pdf(
     Genera y descarga un reporte profesional de ventas en formato PDF
     con branding de PlayZone, fecha automática y diseño profesional.
 
+    El PDF se genera en un hilo de trabajo y se envia por bloques. Si ya se
+    genero para los mismos filtros y las ventas no cambiaron, se envia el
+    archivo guardado (ver /api/reportes para generarlo en segundo plano).
+
     Requiere autenticacion
     """
-    # Obtener datos de ventas
-    ventas = VentaController.obtener_ventas(
-        fecha_inicio=fecha_inicio,
-        fecha_fin=fecha_fin,
-        id_cliente=id_cliente
+    trabajo = await ReporteController.solicitar(
+        ReporteSolicitud(tipo="ventas_pdf", fecha_inicio=fecha_inicio, fecha_fin=fecha_fin, id_cliente=id_cliente),
+        current_user.get("id_usuario")
     )
-
-    # Generar PDF
-    pdf_buffer = PDFGenerator.generar_reporte_ventas(ventas)
+    await report_jobs.esperar(trabajo)
 
     # Nombre del archivo con fecha actual
     fecha_actual = datetime.now().strftime('%Y%m%d_%H%M%S')
     filename = f"PlayZone_Reporte_Ventas_{fecha_actual}.pdf"
 
     # Retornar como descarga
-    return StreamingResponse(
-        pdf_buffer,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
-    )
+    return respuesta_descarga(ReporteController.abrir_archivo(trabajo), filename, "application/pdf")
@@ -1,13 +1,18 @@
 """
 Utilidades del sistema
 """
-from .security import hash_password, verify_password, create_access_token, decode_access_token
+from .security import (
+    hash_password, verify_password, hash_password_async, verify_password_async,
+    create_access_token, decode_access_token
+)
 from .generators import generar_codigo_producto, generar_codigo_venta, generar_codigo_servicio
 from .responses import success_response, error_response
 
 __all__ = [
     "hash_password",
     "verify_password",
+    "hash_password_async",
+    "verify_password_async",
     "create_access_token",
     "decode_access_token",
     "generar_codigo_producto",
@@ -3,11 +3,29 @@ Sistema de Auditoría
 Registra todas las acciones importantes del sistema
 """
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from app.config.database import get_db_cursor
+from app.config.settings import settings
 from app.models.security import AuditoriaCreate
+from app.utils.batch_writer import BatchWriter
 import json
 
+# Cola de registros de auditoria; se escribe en lotes desde un hilo iniciado en lifespan
+audit_writer = BatchWriter(
+    nombre="auditoria",
+    sql="""
+        INSERT INTO auditoria (
+            id_usuario, username, accion, modulo, entidad, id_entidad,
+            datos_anteriores, datos_nuevos, ip_address, user_agent, fecha_accion
+        )
+        VALUES %s
+    """,
+    max_cola=settings.audit_queue_max,
+    tam_lote=settings.audit_batch_size,
+    intervalo=settings.audit_flush_interval,
+    politica=settings.audit_queue_policy
+)
+
 
 class AuditLogger:
     """Logger de auditoría para el sistema"""
@@ -24,10 +42,13 @@ class AuditLogger:
         datos_nuevos: Optional[dict] = None,
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None
-    ) -> int:
+    ) -> None:
         """
         Registra una acción en el log de auditoría
 
+        El registro se encola y se inserta en lote en segundo plano; la fecha
+        de la acción se toma en el momento de la llamada.
+
         Args:
             accion: Acción realizada (ej: 'LOGIN', 'CREAR_PRODUCTO', 'ELIMINAR_CLIENTE')
             modulo: Módulo del sistema (ej: 'auth', 'productos', 'ventas')
@@ -39,31 +60,16 @@ class AuditLogger:
             datos_nuevos: Estado nuevo de los datos (JSON)
             ip_address: Dirección IP del usuario
             user_agent: User agent del navegador
-
-        Returns:
-            ID del registro de auditoría creado
         """
         # Convertir diccionarios a JSON si es necesario
         datos_anteriores_json = json.dumps(datos_anteriores) if datos_anteriores else None
         datos_nuevos_json = json.dumps(datos_nuevos) if datos_nuevos else None
 
-        with get_db_cursor() as cursor:
-            cursor.execute(
-                """
-                INSERT INTO auditoria (
-                    id_usuario, username, accion, modulo, entidad, id_entidad,
-                    datos_anteriores, datos_nuevos, ip_address, user_agent
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id_auditoria
-                """,
-                (
-                    id_usuario, username, accion, modulo, entidad, id_entidad,
-                    datos_anteriores_json, datos_nuevos_json, ip_address, user_agent
-                )
-            )
-            result = cursor.fetchone()
-            return result['id_auditoria']
+        audit_writer.put((
+            id_usuario, username, accion, modulo, entidad, id_entidad,
+            datos_anteriores_json, datos_nuevos_json, ip_address, user_agent,
+            datetime.now(timezone.utc)
+        ))
 
     @staticmethod
     def log_login(username: str, exitoso: bool, ip_address: str, user_agent: Optional[str] = None, razon: Optional[str] = None):
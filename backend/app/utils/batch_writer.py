@@ -0,0 +1,257 @@
+"""
+Escritura por lotes en segundo plano
+Acumula registros en memoria y los inserta en la base de datos en lotes,
+fuera del ciclo de la solicitud
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Deque, Optional, Sequence
+import psycopg2
+from psycopg2.extras import execute_values
+from app.config.database import get_db_cursor
+
+logger = logging.getLogger(__name__)
+
+# Politicas cuando la cola esta llena
+POLITICA_SINCRONA = "sincrona"                # Escribir el registro en linea (frena al llamador)
+POLITICA_DESCARTAR_NUEVOS = "descartar_nuevos"  # Descartar el registro que llega
+POLITICA_DESCARTAR_ANTIGUOS = "descartar_antiguos"  # Descartar el registro mas antiguo de la cola
+POLITICAS = (POLITICA_SINCRONA, POLITICA_DESCARTAR_NUEVOS, POLITICA_DESCARTAR_ANTIGUOS)
+
+
+class BatchWriter:
+    """
+    Cola acotada de registros que un hilo de fondo inserta en lotes (INSERT multi-fila)
+
+    Mientras el hilo no este iniciado (scripts, pruebas) cada registro se escribe
+    de inmediato, igual que antes de usar la cola.
+
+    Si un lote falla por los datos de algun registro (valor demasiado largo,
+    restriccion) se divide para escribir los demas y el registro invalido se
+    descarta; si falla la conexion el lote vuelve a la cola para reintentarlo.
+    """
+
+    def __init__(
+        self,
+        nombre: str,
+        sql: str,
+        plantilla: Optional[str] = None,
+        max_cola: int = 10000,
+        tam_lote: int = 500,
+        intervalo: float = 1.0,
+        politica: str = POLITICA_SINCRONA
+    ):
+        """
+        Args:
+            nombre: Nombre del escritor (para el hilo y las metricas)
+            sql: INSERT con un unico marcador VALUES %s
+            plantilla: Plantilla de fila para execute_values (opcional)
+            max_cola: Registros maximos en memoria
+            tam_lote: Registros maximos por INSERT
+            intervalo: Segundos maximos que un registro espera en la cola
+            politica: Que hacer cuando la cola esta llena (ver POLITICAS)
+        """
+        if politica not in POLITICAS:
+            raise ValueError(f"Politica de cola invalida: {politica}")
+
+        self.nombre = nombre
+        self.sql = sql
+        self.plantilla = plantilla
+        self.max_cola = max_cola
+        self.tam_lote = tam_lote
+        self.intervalo = intervalo
+        self.politica = politica
+
+        self._cola: Deque[tuple] = deque()
+        self._cond = threading.Condition()
+        self._hilo: Optional[threading.Thread] = None
+        self._detener = False
+
+        self._encolados = 0
+        self._escritos = 0
+        self._lotes = 0
+        self._descartados = 0
+        self._sincronos = 0
+        self._errores = 0
+        self._max_en_cola = 0
+
+    def put(self, fila: Sequence) -> None:
+        """
+        Agrega un registro a la cola
+
+        Args:
+            fila: Valores del registro en el orden de las columnas del INSERT
+        """
+        fila = tuple(fila)
+        with self._cond:
+            if self._hilo is None:
+                escribir_en_linea = True
+            elif len(self._cola) >= self.max_cola:
+                if self.politica == POLITICA_DESCARTAR_NUEVOS:
+                    self._descartados += 1
+                    return
+                if self.politica == POLITICA_DESCARTAR_ANTIGUOS:
+                    self._cola.popleft()
+                    self._descartados += 1
+                    escribir_en_linea = False
+                else:
+                    escribir_en_linea = True
+            else:
+                escribir_en_linea = False
+
+            if not escribir_en_linea:
+                self._cola.append(fila)
+                self._encolados += 1
+                self._max_en_cola = max(self._max_en_cola, len(self._cola))
+                if len(self._cola) >= self.tam_lote:
+                    self._cond.notify()
+                return
+
+            self._sincronos += 1
+
+        if self._escribir([fila]):
+            # No se pudo escribir en linea (error de conexion) y no hay cola donde dejarlo
+            with self._cond:
+                self._descartados += 1
+
+    def start(self) -> None:
+        """Inicia el hilo de escritura en segundo plano"""
+        with self._cond:
+            if self._hilo is not None:
+                return
+            self._detener = False
+            self._hilo = threading.Thread(target=self._ejecutar, name=f"batch-{self.nombre}", daemon=True)
+            self._hilo.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Detiene el hilo de escritura y vacia la cola
+
+        Args:
+            timeout: Segundos maximos de espera para el hilo
+        """
+        with self._cond:
+            hilo = self._hilo
+            if hilo is None:
+                return
+            self._detener = True
+            self._cond.notify()
+        hilo.join(timeout)
+        with self._cond:
+            self._hilo = None
+        # Lo que no alcanzo a escribir el hilo (p.ej. por errores) se intenta una vez mas
+        self.flush()
+        with self._cond:
+            perdidos = len(self._cola)
+            self._cola.clear()
+            self._descartados += perdidos
+        if perdidos:
+            logger.error("Se descartaron %d registros de %s al detener la escritura", perdidos, self.nombre)
+
+    def flush(self) -> int:
+        """
+        Escribe de inmediato todo lo que hay en la cola
+
+        Returns:
+            Cantidad de registros procesados (escritos o descartados por invalidos)
+        """
+        total = 0
+        while True:
+            lote = self._tomar_lote()
+            if not lote:
+                return total
+            pendientes = self._escribir(lote)
+            total += len(lote) - len(pendientes)
+            if pendientes:
+                self._devolver_lote(pendientes)
+                return total
+
+    def stats(self) -> dict:
+        """Metricas de la cola de escritura"""
+        with self._cond:
+            return {
+                "nombre": self.nombre,
+                "activo": self._hilo is not None,
+                "politica": self.politica,
+                "en_cola": len(self._cola),
+                "max_cola": self.max_cola,
+                "max_en_cola": self._max_en_cola,
+                "encolados": self._encolados,
+                "escritos": self._escritos,
+                "lotes": self._lotes,
+                "escritos_sincronos": self._sincronos,
+                "descartados": self._descartados,
+                "errores": self._errores,
+            }
+
+    def _ejecutar(self) -> None:
+        """Ciclo del hilo: espera un lote lleno o el intervalo y escribe"""
+        while True:
+            with self._cond:
+                if not self._detener and len(self._cola) < self.tam_lote:
+                    self._cond.wait(self.intervalo)
+                detener = self._detener
+
+            if not self.flush() and self.stats()["en_cola"] and not detener:
+                # La escritura fallo; esperar antes de reintentar
+                time.sleep(self.intervalo)
+
+            if detener:
+                return
+
+    def _tomar_lote(self) -> list:
+        with self._cond:
+            cantidad = min(self.tam_lote, len(self._cola))
+            return [self._cola.popleft() for _ in range(cantidad)]
+
+    def _devolver_lote(self, lote: list) -> None:
+        """Devuelve un lote fallido al frente de la cola, descartando lo que no quepa"""
+        with self._cond:
+            espacio = max(self.max_cola - len(self._cola), 0)
+            if espacio < len(lote):
+                self._descartados += len(lote) - espacio
+                lote = lote[len(lote) - espacio:] if espacio else []
+            self._cola.extendleft(reversed(lote))
+
+    def _escribir(self, lote: list) -> list:
+        """
+        Inserta un lote en una sola sentencia
+
+        Si falla por los datos (no por la conexion), divide el lote a la mitad y
+        escribe cada parte por separado hasta aislar los registros invalidos, que
+        se descartan.
+
+        Returns:
+            Registros que no se escribieron por un error de conexion (para reintentar)
+        """
+        try:
+            with get_db_cursor() as cursor:
+                execute_values(cursor, self.sql, lote, template=self.plantilla, page_size=self.tam_lote)
+        except psycopg2.OperationalError:
+            logger.exception("Error escribiendo lote de %s (%d registros)", self.nombre, len(lote))
+            with self._cond:
+                self._errores += 1
+            return lote
+        except psycopg2.DatabaseError as e:
+            with self._cond:
+                self._errores += 1
+            if len(lote) == 1:
+                logger.error("Registro de %s descartado por datos invalidos: %s", self.nombre, e)
+                with self._cond:
+                    self._descartados += 1
+                return []
+            mitad = len(lote) // 2
+            return self._escribir(lote[:mitad]) + self._escribir(lote[mitad:])
+        except Exception:
+            # Pool agotado u otro error transitorio
+            logger.exception("Error escribiendo lote de %s (%d registros)", self.nombre, len(lote))
+            with self._cond:
+                self._errores += 1
+            return lote
+
+        with self._cond:
+            self._escritos += len(lote)
+            self._lotes += 1
+        return []
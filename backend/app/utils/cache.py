@@ -0,0 +1,130 @@
+"""
+Cache en memoria con expiracion (TTL)
+Evita repetir consultas frecuentes a la base de datos dentro de un mismo proceso
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Cache LRU acotado con tiempo de vida por entrada
+
+    Es seguro para usarse desde varios hilos (los controladores se ejecutan en
+    hilos de trabajo). Cada proceso/worker tiene su propia copia.
+
+    Para que una lectura lenta no vuelva a guardar un dato ya invalidado, se puede
+    tomar la generacion antes de consultar la base de datos y pasarla a set():
+    si hubo una invalidacion entretanto, el valor se descarta.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, nombre: str = "cache"):
+        """
+        Args:
+            maxsize: Cantidad maxima de entradas (se descartan las menos usadas)
+            ttl: Segundos que una entrada se considera valida
+            nombre: Nombre de la cache (para metricas)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.nombre = nombre
+        self._datos: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._aciertos = 0
+        self._fallos = 0
+        self._expirados = 0
+        self._invalidaciones = 0
+        self._generacion = 0
+
+    @property
+    def generacion(self) -> int:
+        """Contador que aumenta con cada invalidacion"""
+        return self._generacion
+
+    def get(self, clave: Hashable, default: Any = None) -> Any:
+        """
+        Obtiene un valor vigente de la cache
+
+        Args:
+            clave: Clave buscada
+            default: Valor a retornar si no existe o expiro
+
+        Returns:
+            Valor almacenado o default
+        """
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                self._fallos += 1
+                return default
+
+            valor, expira = entrada
+            if expira <= time.monotonic():
+                del self._datos[clave]
+                self._expirados += 1
+                self._fallos += 1
+                return default
+
+            self._datos.move_to_end(clave)
+            self._aciertos += 1
+            return valor
+
+    def set(self, clave: Hashable, valor: Any, ttl: Optional[float] = None, generacion: Optional[int] = None) -> None:
+        """
+        Guarda un valor en la cache
+
+        Args:
+            clave: Clave del valor
+            valor: Valor a guardar
+            ttl: Tiempo de vida especifico (por defecto el de la cache)
+            generacion: Generacion leida antes de obtener el valor; si la cache se
+                invalido despues, el valor no se guarda (opcional)
+        """
+        expira = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if generacion is not None and generacion != self._generacion:
+                return
+            self._datos[clave] = (valor, expira)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maxsize:
+                self._datos.popitem(last=False)
+
+    def invalidate(self, clave: Hashable) -> bool:
+        """
+        Elimina una entrada de la cache
+
+        Args:
+            clave: Clave a eliminar
+
+        Returns:
+            True si la entrada existia
+        """
+        with self._lock:
+            self._invalidaciones += 1
+            self._generacion += 1
+            return self._datos.pop(clave, None) is not None
+
+    def clear(self) -> None:
+        """Elimina todas las entradas de la cache"""
+        with self._lock:
+            self._invalidaciones += len(self._datos)
+            self._generacion += 1
+            self._datos.clear()
+
+    def stats(self) -> dict:
+        """Metricas de uso de la cache"""
+        with self._lock:
+            consultas = self._aciertos + self._fallos
+            return {
+                "nombre": self.nombre,
+                "entradas": len(self._datos),
+                "maximo": self.maxsize,
+                "ttl_segundos": self.ttl,
+                "aciertos": self._aciertos,
+                "fallos": self._fallos,
+                "expirados": self._expirados,
+                "invalidaciones": self._invalidaciones,
+                "tasa_aciertos": round(self._aciertos / consultas, 4) if consultas else 0.0,
+            }
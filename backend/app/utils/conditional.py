@@ -0,0 +1,186 @@
+"""
+Solicitudes condicionales (ETag / Last-Modified)
+Los listados responden 304 Not Modified sin consultar la base de datos cuando
+las tablas de las que dependen no cambiaron desde la ultima respuesta del cliente
+
+Cada tabla tiene un contador de version que incrementan las operaciones de
+escritura de los controladores. Los contadores viven en memoria del proceso:
+el ETag incluye un identificador de arranque (un ETag de otro proceso o de antes
+de reiniciar nunca coincide) y una ventana de tiempo (ETAG_WINDOW_SECONDS), de
+modo que un cambio hecho por otro proceso se ve, como maximo, al cerrar la ventana.
+"""
+import functools
+import hashlib
+import threading
+import time
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Dict, Iterable, Optional, TypeVar
+from fastapi import Request, Response, status
+from app.config.settings import settings
+
+T = TypeVar("T")
+
+# Cache-Control de las respuestas condicionales: el navegador guarda la respuesta
+# pero la revalida en cada uso (If-None-Match)
+CACHE_PUBLICO = "no-cache"
+CACHE_PRIVADO = "private, no-cache"
+
+
+class VersionesTablas:
+    """Contadores de version por tabla (seguros entre hilos)"""
+
+    def __init__(self, ventana: int = 30):
+        """
+        Args:
+            ventana: Segundos maximos que un ETag se considera vigente
+        """
+        self.ventana = max(1, ventana)
+        self.arranque = uuid.uuid4().hex[:8]
+        self._inicio = time.time()
+        self._versiones: Dict[str, int] = {}
+        self._modificado: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, *tablas: str) -> None:
+        """
+        Registra un cambio en las tablas indicadas
+        Debe llamarse despues de confirmar la transaccion
+
+        Args:
+            tablas: Nombres de las tablas modificadas
+        """
+        ahora = time.time()
+        with self._lock:
+            for tabla in tablas:
+                self._versiones[tabla] = self._versiones.get(tabla, 0) + 1
+                self._modificado[tabla] = ahora
+
+    def etag(self, tablas: Iterable[str], variante: str = "") -> str:
+        """
+        ETag fuerte para una respuesta que depende de las tablas indicadas
+
+        Args:
+            tablas: Tablas de las que depende la respuesta
+            variante: Texto que distingue respuestas del mismo recurso (ruta y filtros)
+
+        Returns:
+            ETag entre comillas
+        """
+        with self._lock:
+            versiones = ".".join(str(self._versiones.get(tabla, 0)) for tabla in tablas)
+        ventana = int(time.time() // self.ventana)
+        resumen = hashlib.sha1(variante.encode()).hexdigest()[:16]
+        return f'"{self.arranque}-{ventana}-{versiones}-{resumen}"'
+
+    def ultima_modificacion(self, tablas: Iterable[str]) -> float:
+        """
+        Fecha (epoch) del ultimo cambio conocido en las tablas
+
+        Nunca es anterior al inicio de la ventana actual, por la misma razon que
+        el ETag incluye la ventana.
+        """
+        inicio_ventana = (time.time() // self.ventana) * self.ventana
+        with self._lock:
+            modificado = max((self._modificado.get(tabla, self._inicio) for tabla in tablas), default=self._inicio)
+        return max(modificado, inicio_ventana)
+
+    def stats(self) -> dict:
+        """Version actual de cada tabla"""
+        with self._lock:
+            return {
+                "arranque": self.arranque,
+                "ventana_segundos": self.ventana,
+                "versiones": dict(self._versiones),
+            }
+
+
+def modifica_tablas(*tablas: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Decorador para los metodos de escritura de los controladores: incrementa la
+    version de las tablas cuando el metodo termina sin errores (ya confirmada la transaccion)
+
+    Args:
+        tablas: Tablas que modifica el metodo
+    """
+    def decorador(funcion: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs) -> T:
+            resultado = funcion(*args, **kwargs)
+            versiones_tablas.incrementar(*tablas)
+            return resultado
+        return envoltura
+    return decorador
+
+
+def _coincide_etag(if_none_match: str, etag: str) -> bool:
+    """Comparacion debil de If-None-Match (RFC 9110): ignora el prefijo W/"""
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato == "*":
+            return True
+        if candidato.startswith("W/"):
+            candidato = candidato[2:]
+        if candidato == etag:
+            return True
+    return False
+
+
+def _no_modificado_desde(if_modified_since: str, ultima_modificacion: float) -> bool:
+    try:
+        fecha = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    # Last-Modified tiene resolucion de segundos
+    return int(ultima_modificacion) <= fecha.timestamp()
+
+
+def verificar_condicional(
+    request: Request,
+    response: Response,
+    tablas: Iterable[str],
+    cache_control: str = CACHE_PRIVADO
+) -> Optional[Response]:
+    """
+    Agrega ETag, Last-Modified y Cache-Control a la respuesta y evalua los
+    encabezados condicionales de la solicitud
+
+    Debe llamarse antes de consultar la base de datos. El ETag depende de la ruta,
+    los parametros de la consulta y la version de las tablas.
+
+    Args:
+        request: Solicitud actual
+        response: Respuesta de la ruta (recibe los encabezados)
+        tablas: Tablas de las que depende la respuesta
+        cache_control: Valor de Cache-Control (CACHE_PUBLICO o CACHE_PRIVADO)
+
+    Returns:
+        Respuesta 304 si el cliente ya tiene la version actual, None si hay que
+        generar la respuesta completa
+    """
+    tablas = tuple(tablas)
+    variante = f"{request.url.path}?{sorted(request.query_params.multi_items())}"
+    etag = versiones_tablas.etag(tablas, variante)
+    ultima_modificacion = versiones_tablas.ultima_modificacion(tablas)
+
+    encabezados = {
+        "ETag": etag,
+        "Last-Modified": formatdate(ultima_modificacion, usegmt=True),
+        "Cache-Control": cache_control,
+    }
+    response.headers.update(encabezados)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        no_modificado = _coincide_etag(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        no_modificado = bool(if_modified_since) and _no_modificado_desde(if_modified_since, ultima_modificacion)
+
+    if no_modificado:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=encabezados)
+    return None
+
+
+# Instancia global
+versiones_tablas = VersionesTablas(ventana=settings.etag_window_seconds)
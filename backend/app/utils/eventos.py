@@ -0,0 +1,281 @@
+"""
+Bus de eventos en memoria para notificaciones en tiempo real (Server-Sent Events)
+Los controladores publican cambios de stock y de servicios despues de confirmar
+la transaccion; cada cliente conectado a /api/eventos recibe los que coinciden
+con sus filtros
+
+El bus es por proceso: con varios workers, los cambios hechos por los demas llegan
+por el canal de LISTEN/NOTIFY (app.utils.notificaciones) y se publican aqui; sin
+ese canal cada worker solo ve los eventos de las escrituras que el mismo atiende.
+"""
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, Iterable, NamedTuple, Optional
+from app.config.settings import settings
+from app.utils.responses import serializar_json
+
+logger = logging.getLogger(__name__)
+
+# Tipos de evento
+EVENTO_PRODUCTO = "producto"
+EVENTO_SERVICIO = "servicio"
+# Se envia cuando el cliente perdio eventos (cola llena): debe recargar sus listados
+EVENTO_REINICIO = "reinicio"
+
+TIPOS_EVENTO = (EVENTO_PRODUCTO, EVENTO_SERVICIO)
+
+# Milisegundos que el navegador espera antes de reconectar
+REINTENTO_MS = 3000
+
+
+class BusEventosLlenoError(Exception):
+    """Se alcanzo el maximo de clientes conectados"""
+    pass
+
+
+class Evento(NamedTuple):
+    """Cambio publicado por un controlador"""
+    id: int
+    tipo: str
+    datos: dict
+
+
+_FIN = Evento(0, "", {})  # Marca de cierre de una suscripcion
+
+
+class Suscripcion:
+    """Cola de eventos de un cliente conectado"""
+
+    def __init__(self, filtro: Callable[[Evento], bool], max_cola: int):
+        self.filtro = filtro
+        self.cola: "asyncio.Queue[Evento]" = asyncio.Queue(maxsize=max_cola)
+        self.perdidos = 0
+        self.conectado_en = time.time()
+
+    def entregar(self, evento: Evento) -> None:
+        """Encola un evento; si la cola esta llena la vacia y deja solo un aviso de reinicio"""
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            self.perdidos += self.cola.qsize()
+            while not self.cola.empty():
+                self.cola.get_nowait()
+            self.cola.put_nowait(Evento(evento.id, EVENTO_REINICIO, {}))
+
+
+class BusEventos:
+    """
+    Distribuye eventos a las suscripciones activas
+
+    publicar() se puede llamar desde cualquier hilo (los controladores corren en
+    hilos de trabajo); la entrega a las colas ocurre en el event loop.
+    """
+
+    def __init__(self, max_suscriptores: int = 200, max_cola: int = 100):
+        """
+        Args:
+            max_suscriptores: Clientes conectados a la vez
+            max_cola: Eventos pendientes por cliente antes de descartarlos
+        """
+        self.max_suscriptores = max_suscriptores
+        self.max_cola = max_cola
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._suscripciones: Dict[int, Suscripcion] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._publicados = 0
+        self._cerrado = False
+
+    def iniciar(self) -> None:
+        """Asocia el bus al event loop actual (al iniciar el servidor)"""
+        self._loop = asyncio.get_running_loop()
+        self._cerrado = False
+
+    def publicar(self, tipo: str, datos: dict) -> None:
+        """
+        Publica un evento para los clientes conectados
+        Debe llamarse despues de confirmar la transaccion
+
+        Si el servidor no esta corriendo (scripts de consola) no hace nada.
+
+        Args:
+            tipo: Tipo de evento (EVENTO_PRODUCTO, EVENTO_SERVICIO)
+            datos: Contenido del evento
+        """
+        self._enviar(tipo, datos, self._distribuir)
+
+    def reiniciar(self) -> None:
+        """
+        Envia un aviso de reinicio a todos los clientes, sin pasar por sus filtros
+        (se pudieron perder cambios, por ejemplo de otros procesos): deben recargar
+        sus listados
+        """
+        self._enviar(EVENTO_REINICIO, {}, self._entregar_a_todos)
+
+    def _enviar(self, tipo: str, datos: dict, distribuir: Callable[[Evento], None]) -> None:
+        loop = self._loop
+        if loop is None or self._cerrado:
+            return
+
+        with self._lock:
+            evento = Evento(next(self._ids), tipo, datos)
+            self._publicados += 1
+
+        try:
+            loop.call_soon_threadsafe(distribuir, evento)
+        except RuntimeError:
+            # El event loop ya se cerro (apagado del servidor)
+            pass
+
+    def _entregar_a_todos(self, evento: Evento) -> None:
+        for suscripcion in list(self._suscripciones.values()):
+            suscripcion.entregar(evento)
+
+    def _distribuir(self, evento: Evento) -> None:
+        for suscripcion in list(self._suscripciones.values()):
+            try:
+                coincide = suscripcion.filtro(evento)
+            except Exception:
+                logger.exception("Error en el filtro de una suscripcion de eventos")
+                continue
+            if coincide:
+                suscripcion.entregar(evento)
+
+    def suscribir(self, filtro: Callable[[Evento], bool]) -> Suscripcion:
+        """
+        Registra un cliente
+
+        Args:
+            filtro: Funcion que decide si un evento se envia al cliente
+
+        Returns:
+            Suscripcion con la cola de eventos del cliente
+
+        Raises:
+            BusEventosLlenoError: Si ya hay max_suscriptores clientes conectados
+        """
+        if self.lleno:
+            raise BusEventosLlenoError()
+        suscripcion = Suscripcion(filtro, self.max_cola)
+        self._suscripciones[id(suscripcion)] = suscripcion
+        return suscripcion
+
+    @property
+    def lleno(self) -> bool:
+        return len(self._suscripciones) >= self.max_suscriptores
+
+    def cancelar(self, suscripcion: Suscripcion) -> None:
+        """Da de baja un cliente"""
+        self._suscripciones.pop(id(suscripcion), None)
+
+    async def cerrar(self) -> None:
+        """Termina todos los flujos abiertos (al apagar el servidor)"""
+        self._cerrado = True
+        for suscripcion in list(self._suscripciones.values()):
+            while not suscripcion.cola.empty():
+                suscripcion.cola.get_nowait()
+            suscripcion.cola.put_nowait(_FIN)
+
+    def stats(self) -> dict:
+        """Metricas del bus"""
+        suscripciones = list(self._suscripciones.values())
+        return {
+            "clientes": len(suscripciones),
+            "max_clientes": self.max_suscriptores,
+            "publicados": self._publicados,
+            "pendientes": sum(s.cola.qsize() for s in suscripciones),
+            "perdidos": sum(s.perdidos for s in suscripciones),
+        }
+
+
+def formatear_sse(evento: Evento) -> bytes:
+    """Evento en el formato de text/event-stream"""
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (
+        evento.id, evento.tipo.encode(), serializar_json(evento.datos)
+    )
+
+
+def crear_filtro(
+    tipos: Optional[Iterable[str]] = None,
+    ids_producto: Optional[Iterable[int]] = None,
+    estados: Optional[Iterable[str]] = None,
+    solo_stock_bajo: bool = False
+) -> Callable[[Evento], bool]:
+    """
+    Filtro de eventos de un cliente
+
+    Args:
+        tipos: Tipos de evento a recibir (por defecto todos)
+        ids_producto: Solo eventos de estos productos (opcional)
+        estados: Solo eventos de servicios en estos estados (opcional)
+        solo_stock_bajo: Solo eventos de productos que quedaron con stock bajo
+
+    Returns:
+        Funcion que retorna True si el evento se envia al cliente
+    """
+    tipos = set(tipos or TIPOS_EVENTO)
+    ids_producto = set(ids_producto) if ids_producto else None
+    estados = set(estados) if estados else None
+
+    def filtro(evento: Evento) -> bool:
+        if evento.tipo not in tipos:
+            return False
+        if evento.tipo == EVENTO_PRODUCTO:
+            if ids_producto is not None and evento.datos.get("id_producto") not in ids_producto:
+                return False
+            if solo_stock_bajo and not evento.datos.get("stock_bajo"):
+                return False
+        if evento.tipo == EVENTO_SERVICIO:
+            if estados is not None and evento.datos.get("estado") not in estados:
+                return False
+        return True
+
+    return filtro
+
+
+async def transmitir(
+    bus: "BusEventos",
+    filtro: Callable[[Evento], bool],
+    heartbeat: float,
+    duracion_maxima: float
+) -> AsyncIterator[bytes]:
+    """
+    Genera el flujo SSE de un cliente (para StreamingResponse)
+
+    La suscripcion se crea al empezar a enviar y se da de baja al terminar o si
+    el cliente se desconecta. Envia un comentario cada `heartbeat` segundos sin
+    eventos, para que proxies y navegadores no cierren la conexion, y termina
+    tras `duracion_maxima` segundos (el navegador reconecta solo).
+    """
+    yield f"retry: {REINTENTO_MS}\n\n".encode()
+    try:
+        suscripcion = bus.suscribir(filtro)
+    except BusEventosLlenoError:
+        return
+
+    limite = time.monotonic() + duracion_maxima
+    try:
+        while True:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                evento = await asyncio.wait_for(suscripcion.cola.get(), timeout=min(heartbeat, restante))
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            if evento is _FIN:
+                break
+            yield formatear_sse(evento)
+    finally:
+        bus.cancelar(suscripcion)
+
+
+# Instancia global
+bus_eventos = BusEventos(
+    max_suscriptores=settings.events_max_clients,
+    max_cola=settings.events_queue_max
+)
@@ -0,0 +1,239 @@
+"""
+Invalidacion de caches entre procesos con LISTEN/NOTIFY de PostgreSQL
+Los controladores envian un aviso (pg_notify) dentro de la misma transaccion que
+modifica los datos, por lo que solo se entrega si la transaccion se confirma.
+Cada proceso mantiene una conexion dedicada que escucha el canal y entrega los
+avisos de los demas procesos a las caches suscritas (productos, usuarios,
+versiones de ETag, eventos en tiempo real).
+
+LISTEN necesita una sesion propia: no funciona a traves del transaction pooler de
+Supabase (puerto 6543), por eso se usa DATABASE_LISTEN_URL con una conexion
+directa. Sin esa variable el canal queda desactivado y cada proceso solo ve sus
+propios cambios (las caches vencen por TTL).
+"""
+import asyncio
+import json
+import logging
+import uuid
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+import anyio
+import psycopg2
+import psycopg2.extensions
+from app.config.database import get_db_cursor
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+CANAL = "playzone_cambios"
+
+# Limite de PostgreSQL para el contenido de un NOTIFY (8000 bytes), con margen
+MAX_CONTENIDO = 7500
+
+
+class CanalCambios:
+    """
+    Envio y recepcion de avisos de cambios entre procesos
+
+    Los suscriptores reciben el aviso de su tabla: un dict con el detalle del
+    cambio, o None si no se sabe que cambio (aviso demasiado grande, o la
+    conexion se perdio y pudieron perderse avisos) y deben descartar todo lo
+    que tengan de esa tabla. Se ejecutan en el event loop: deben ser rapidos.
+    """
+
+    def __init__(self, url: str = "", espera_reconexion: float = 5.0):
+        """
+        Args:
+            url: Conexion directa a PostgreSQL para LISTEN (vacio = desactivado)
+            espera_reconexion: Segundos entre intentos de reconexion
+        """
+        self.url = url
+        self.espera_reconexion = espera_reconexion
+        self.origen = uuid.uuid4().hex  # Identifica los avisos de este proceso
+
+        self._suscriptores: Dict[str, List[Callable[[Optional[dict]], None]]] = defaultdict(list)
+        self._conexion = None
+        self._tarea: Optional[asyncio.Task] = None
+        self._desconectado: Optional[asyncio.Event] = None
+        self._cerrando = False
+
+        self._enviados = 0
+        self._recibidos = 0
+        self._propios = 0
+        self._conexiones = 0
+        self._errores = 0
+
+    @property
+    def habilitado(self) -> bool:
+        return bool(self.url)
+
+    @property
+    def conectado(self) -> bool:
+        return self._conexion is not None and not self._conexion.closed
+
+    def suscribir(self, tabla: str, callback: Callable[[Optional[dict]], None]) -> None:
+        """
+        Registra una funcion que recibe los cambios de una tabla hechos por otros procesos
+
+        Args:
+            tabla: Nombre de la tabla
+            callback: Funcion que recibe el detalle del cambio (o None = todo cambio)
+        """
+        self._suscriptores[tabla].append(callback)
+
+    def notificar(self, cursor, tabla: str, cambio: dict) -> None:
+        """
+        Envia el aviso de un cambio dentro de la transaccion del cursor
+        (se entrega al confirmarla; si se revierte, no se envia)
+
+        Args:
+            cursor: Cursor de la transaccion que modifica los datos
+            tabla: Tabla modificada
+            cambio: Detalle del cambio (se serializa como JSON)
+        """
+        if not self.habilitado:
+            return
+        cursor.execute("SELECT pg_notify(%s, %s)", (CANAL, self._contenido(tabla, cambio)))
+        self._enviados += 1
+
+    def notificar_ahora(self, tabla: str, cambio: dict) -> None:
+        """
+        Envia el aviso en una transaccion propia, para cambios que ya se confirmaron
+        (funcion bloqueante)
+
+        Args:
+            tabla: Tabla modificada
+            cambio: Detalle del cambio
+        """
+        if not self.habilitado:
+            return
+        with get_db_cursor() as cursor:
+            self.notificar(cursor, tabla, cambio)
+
+    def _contenido(self, tabla: str, cambio: Optional[dict]) -> str:
+        contenido = json.dumps({"origen": self.origen, "tabla": tabla, "cambio": cambio}, default=str)
+        if cambio is not None and len(contenido.encode()) > MAX_CONTENIDO:
+            return self._contenido(tabla, None)
+        return contenido
+
+    async def iniciar(self) -> None:
+        """Empieza a escuchar el canal (al iniciar el servidor)"""
+        if not self.habilitado or self._tarea is not None:
+            return
+        if ":6543" in self.url:
+            logger.warning(
+                "DATABASE_LISTEN_URL usa el puerto 6543 (transaction pooler), que no admite LISTEN; "
+                "use la conexion directa de la base de datos"
+            )
+        self._cerrando = False
+        self._tarea = asyncio.create_task(self._escuchar())
+
+    async def cerrar(self) -> None:
+        """Deja de escuchar y cierra la conexion (al apagar el servidor)"""
+        self._cerrando = True
+        if self._tarea is not None:
+            self._tarea.cancel()
+            await asyncio.gather(self._tarea, return_exceptions=True)
+            self._tarea = None
+
+    def stats(self) -> dict:
+        """Metricas del canal"""
+        return {
+            "habilitado": self.habilitado,
+            "conectado": self.conectado,
+            "enviados": self._enviados,
+            "recibidos": self._recibidos,
+            "propios_ignorados": self._propios,
+            "conexiones": self._conexiones,
+            "errores": self._errores,
+        }
+
+    async def _escuchar(self) -> None:
+        """Mantiene la conexion de escucha, reconectando si se pierde"""
+        loop = asyncio.get_running_loop()
+        while not self._cerrando:
+            try:
+                self._conexion = await anyio.to_thread.run_sync(self._conectar)
+                self._conexiones += 1
+                self._desconectado = asyncio.Event()
+                loop.add_reader(self._conexion.fileno(), self._leer)
+                try:
+                    if self._conexiones > 1:
+                        # Los avisos enviados mientras la conexion estaba caida se perdieron
+                        self._entregar_a_todos(None)
+                    await self._desconectado.wait()
+                finally:
+                    loop.remove_reader(self._conexion.fileno())
+                if not self._cerrando:
+                    logger.warning("Se perdio la conexion de LISTEN/NOTIFY, reconectando")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._errores += 1
+                logger.exception("Error en la conexion de LISTEN/NOTIFY")
+            finally:
+                self._cerrar_conexion()
+
+            if not self._cerrando:
+                await asyncio.sleep(self.espera_reconexion)
+
+    def _conectar(self):
+        conexion = psycopg2.connect(
+            self.url,
+            # Detectar conexiones caidas aunque no lleguen avisos
+            keepalives=1, keepalives_idle=30, keepalives_interval=10, keepalives_count=3
+        )
+        conexion.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conexion.cursor() as cursor:
+            cursor.execute(f"LISTEN {CANAL}")
+        return conexion
+
+    def _cerrar_conexion(self) -> None:
+        if self._conexion is not None:
+            try:
+                self._conexion.close()
+            except psycopg2.Error:
+                pass
+            self._conexion = None
+
+    def _leer(self) -> None:
+        """Lee los avisos pendientes (se llama desde el event loop cuando hay datos en el socket)"""
+        try:
+            self._conexion.poll()
+        except psycopg2.Error:
+            self._desconectado.set()
+            return
+
+        while self._conexion.notifies:
+            aviso = self._conexion.notifies.pop(0)
+            self._procesar(aviso.payload)
+
+    def _procesar(self, contenido: str) -> None:
+        try:
+            mensaje = json.loads(contenido)
+            origen, tabla, cambio = mensaje["origen"], mensaje["tabla"], mensaje.get("cambio")
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Aviso de cambios invalido: %s", contenido[:200])
+            return
+
+        if origen == self.origen:
+            self._propios += 1
+            return
+
+        self._recibidos += 1
+        self._entregar(tabla, cambio)
+
+    def _entregar(self, tabla: str, cambio: Optional[dict]) -> None:
+        for callback in self._suscriptores.get(tabla, []):
+            try:
+                callback(cambio)
+            except Exception:
+                logger.exception("Error aplicando un cambio de %s", tabla)
+
+    def _entregar_a_todos(self, cambio: Optional[dict]) -> None:
+        for tabla in list(self._suscriptores):
+            self._entregar(tabla, cambio)
+
+
+# Instancia global (las caches se suscriben al importarse sus modulos)
+canal_cambios = CanalCambios(settings.database_listen_url, settings.notify_reconnect_seconds)
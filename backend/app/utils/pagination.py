@@ -0,0 +1,117 @@
+"""
+Paginacion por cursor (keyset)
+Recorre listados grandes sin OFFSET usando (fecha, id) como clave de orden estable
+
+Los listados ordenan por fecha DESC, id DESC; en PostgreSQL DESC deja las fechas
+NULL al principio (NULLS FIRST, el mismo orden de los indices), por eso el cursor
+admite una fecha vacia.
+"""
+import base64
+import binascii
+from datetime import datetime
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, Response, status
+
+# Limite maximo de resultados por pagina
+LIMITE_MAXIMO = 500
+
+# Encabezados con los datos de paginacion (el cuerpo sigue siendo la lista de resultados)
+HEADER_SIGUIENTE_CURSOR = "X-Next-Cursor"
+HEADER_TOTAL = "X-Total-Count"
+
+
+def codificar_cursor(fecha: Optional[datetime], id_registro: int) -> str:
+    """
+    Codifica la posicion de un registro como cursor opaco
+
+    Args:
+        fecha: Fecha del ultimo registro de la pagina (None si la columna es NULL)
+        id_registro: ID del ultimo registro de la pagina
+
+    Returns:
+        Cursor en base64 url-safe
+    """
+    valor = f"{fecha.isoformat() if fecha is not None else ''}|{id_registro}"
+    return base64.urlsafe_b64encode(valor.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """
+    Decodifica un cursor generado por codificar_cursor
+
+    Args:
+        cursor: Cursor recibido del cliente
+
+    Returns:
+        Tupla (fecha, id) del ultimo registro visto (fecha None si era NULL)
+
+    Raises:
+        HTTPException: Si el cursor no es valido
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valor = base64.urlsafe_b64decode(cursor + relleno).decode()
+        fecha, id_registro = valor.rsplit("|", 1)
+        return (datetime.fromisoformat(fecha) if fecha else None), int(id_registro)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginacion invalido"
+        )
+
+
+def condicion_keyset(columna_fecha: str, columna_id: str, cursor: Optional[str]) -> Tuple[str, list]:
+    """
+    Construye la condicion SQL para continuar despues del cursor
+    (orden descendente por fecha e id)
+
+    Args:
+        columna_fecha: Columna de fecha usada para ordenar (ej: 'v.fecha_venta')
+        columna_id: Columna id usada como desempate (ej: 'v.id_venta')
+        cursor: Cursor de la pagina anterior (opcional)
+
+    Returns:
+        Tupla (fragmento SQL, parametros); vacia si no hay cursor
+    """
+    if not cursor:
+        return "", []
+
+    fecha, id_registro = decodificar_cursor(cursor)
+    if fecha is None:
+        # Quedan las demas filas con fecha NULL (id menor) y todas las que tienen fecha
+        return (
+            f" AND (({columna_fecha} IS NULL AND {columna_id} < %s) OR {columna_fecha} IS NOT NULL)",
+            [id_registro]
+        )
+    # La comparacion de filas excluye las fechas NULL, que ya se recorrieron
+    return f" AND ({columna_fecha}, {columna_id}) < (%s, %s)", [fecha, id_registro]
+
+
+def aplicar_encabezados_paginacion(
+    response: Response,
+    items: List[dict],
+    limite: Optional[int],
+    campo_fecha: str,
+    campo_id: str,
+    total: Optional[int] = None
+) -> None:
+    """
+    Agrega a la respuesta el cursor de la siguiente pagina y el total (si se calculo)
+
+    Si la pagina viene llena se asume que puede haber mas resultados; la ultima
+    pagina puede por tanto llegar vacia.
+
+    Args:
+        response: Respuesta de FastAPI
+        items: Resultados de la pagina actual
+        limite: Limite solicitado (None = sin paginacion)
+        campo_fecha: Campo de fecha del resultado usado en el cursor
+        campo_id: Campo id del resultado usado en el cursor
+        total: Total de registros que cumplen los filtros (opcional)
+    """
+    if limite and len(items) == limite:
+        ultimo = items[-1]
+        response.headers[HEADER_SIGUIENTE_CURSOR] = codificar_cursor(ultimo[campo_fecha], ultimo[campo_id])
+
+    if total is not None:
+        response.headers[HEADER_TOTAL] = str(total)
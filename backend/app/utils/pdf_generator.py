@@ -3,13 +3,14 @@ Generador de Reportes PDF
 Genera reportes profesionales con branding de PlayZone
 """
 from datetime import datetime
-from typing import List
+from typing import BinaryIO, Iterable, List
 from io import BytesIO
+from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.platypus import Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
 
 
@@ -22,6 +23,22 @@ class PDFGenerator:
     COLOR_TEXTO = colors.HexColor('#1a1a2e')
     COLOR_GRIS = colors.HexColor('#666666')
 
+    # Margenes de pagina (puntos)
+    MARGEN_IZQUIERDO = 0.75*inch
+    MARGEN_DERECHO = 0.75*inch
+    MARGEN_SUPERIOR = 1*inch
+    MARGEN_INFERIOR = 0.75*inch
+
+    ANCHOS_COLUMNAS_VENTAS = [0.5*inch, 1.8*inch, 0.8*inch, 1.2*inch, 1*inch, 1.2*inch]
+    ENCABEZADO_VENTAS = ['ID', 'Cliente', 'Productos', 'Total', 'Fecha', 'Usuario']
+
+    MESES_ES = {
+        'January': 'Enero', 'February': 'Febrero', 'March': 'Marzo',
+        'April': 'Abril', 'May': 'Mayo', 'June': 'Junio',
+        'July': 'Julio', 'August': 'Agosto', 'September': 'Septiembre',
+        'October': 'Octubre', 'November': 'Noviembre', 'December': 'Diciembre'
+    }
+
     @staticmethod
     def generar_reporte_ventas(ventas_data: List[dict]) -> BytesIO:
         """
@@ -33,87 +50,173 @@ class PDFGenerator:
         Returns:
             BytesIO: Buffer con el PDF generado
         """
+        resumen = {
+            "total_ventas": len(ventas_data),
+            "monto_total": sum(venta['total'] for venta in ventas_data),
+            "productos_vendidos": sum(venta.get('total_productos', 0) for venta in ventas_data),
+        }
+
         buffer = BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=letter,
-            rightMargin=0.75*inch,
-            leftMargin=0.75*inch,
-            topMargin=1*inch,
-            bottomMargin=0.75*inch
-        )
+        PDFGenerator.escribir_reporte_ventas(buffer, resumen, [ventas_data])
+        buffer.seek(0)
+        return buffer
 
-        # Contenedor de elementos del PDF
-        elements = []
-        styles = getSampleStyleSheet()
+    @staticmethod
+    def escribir_reporte_ventas(destino: BinaryIO, resumen: dict, lotes: Iterable[List[dict]]) -> int:
+        """
+        Escribe el reporte de ventas pagina por pagina
 
-        # Estilo personalizado para el título
-        titulo_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=28,
-            textColor=PDFGenerator.COLOR_SECUNDARIO,
-            spaceAfter=6,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
+        Las ventas se consumen por lotes (p.ej. desde un cursor del servidor) y cada
+        pagina se dibuja en cuanto tiene sus filas, de modo que la memoria usada no
+        depende de la cantidad de ventas.
 
-        # Estilo para subtítulo
-        subtitulo_style = ParagraphStyle(
-            'CustomSubtitle',
-            parent=styles['Normal'],
-            fontSize=14,
-            textColor=PDFGenerator.COLOR_PRIMARIO,
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
+        Args:
+            destino: Archivo binario donde se escribe el PDF
+            resumen: Totales del reporte (total_ventas, monto_total, productos_vendidos)
+            lotes: Iterable de listas de ventas, en el orden en que se listan
 
-        # Estilo para fecha
-        fecha_style = ParagraphStyle(
-            'DateStyle',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=PDFGenerator.COLOR_GRIS,
-            spaceAfter=20,
-            alignment=TA_RIGHT,
-            fontName='Helvetica'
-        )
+        Returns:
+            Cantidad de paginas generadas
+        """
+        ancho_pagina, alto_pagina = letter
+        ancho = ancho_pagina - PDFGenerator.MARGEN_IZQUIERDO - PDFGenerator.MARGEN_DERECHO
+        alto = alto_pagina - PDFGenerator.MARGEN_SUPERIOR - PDFGenerator.MARGEN_INFERIOR
+        tope = alto_pagina - PDFGenerator.MARGEN_SUPERIOR
+
+        estilos = PDFGenerator._estilos()
+        c = canvas.Canvas(destino, pagesize=letter)
+        c.setTitle("PlayZone - Reporte de Ventas")
+
+        # Alto del encabezado de la tabla y de cada fila (las filas son de una linea)
+        alto_encabezado = PDFGenerator._tabla_ventas([]).wrapOn(c, ancho, alto)[1]
+        alto_fila = PDFGenerator._tabla_ventas([PDFGenerator.ENCABEZADO_VENTAS]).wrapOn(c, ancho, alto)[1] - alto_encabezado
+        alto_pie = 0.3*inch
+
+        # Primera pagina: encabezado y resumen
+        y = tope
+        for flowable in PDFGenerator._encabezado(estilos, resumen):
+            y = PDFGenerator._dibujar(c, flowable, y, ancho)
+
+        paginas = 1
+        pendientes: List[list] = []
+
+        def filas_disponibles(y_actual: float) -> int:
+            return max(int((y_actual - PDFGenerator.MARGEN_INFERIOR - alto_pie - alto_encabezado) // alto_fila), 1)
+
+        def dibujar_pagina(filas: List[list], y_actual: float) -> None:
+            PDFGenerator._dibujar(c, PDFGenerator._tabla_ventas(filas), y_actual, ancho)
+            PDFGenerator._numero_pagina(c, paginas, ancho_pagina)
+            c.showPage()
+
+        for lote in lotes:
+            for venta in lote:
+                pendientes.append(PDFGenerator._fila_venta(venta))
+                if len(pendientes) >= filas_disponibles(y):
+                    dibujar_pagina(pendientes, y)
+                    pendientes = []
+                    paginas += 1
+                    y = tope
+
+        # Ultima pagina: filas restantes y pie del reporte
+        if pendientes or paginas == 1:
+            y = PDFGenerator._dibujar(c, PDFGenerator._tabla_ventas(pendientes), y, ancho)
+        y -= 0.5*inch
+
+        pie = PDFGenerator._pie(estilos)
+        if pie.wrapOn(c, ancho, alto)[1] > y - PDFGenerator.MARGEN_INFERIOR - alto_pie:
+            PDFGenerator._numero_pagina(c, paginas, ancho_pagina)
+            c.showPage()
+            paginas += 1
+            y = tope
+        PDFGenerator._dibujar(c, pie, y, ancho)
+        PDFGenerator._numero_pagina(c, paginas, ancho_pagina)
+        c.showPage()
+        c.save()
+
+        return paginas
 
-        # ENCABEZADO
-        titulo = Paragraph("PLAYZONE", titulo_style)
-        elements.append(titulo)
+    @staticmethod
+    def _dibujar(c: canvas.Canvas, flowable, y: float, ancho: float) -> float:
+        """Dibuja un elemento con su borde superior en y; retorna la y disponible debajo"""
+        y -= flowable.getSpaceBefore()
+        _, alto = flowable.wrapOn(c, ancho, y)
+        flowable.drawOn(c, PDFGenerator.MARGEN_IZQUIERDO, y - alto)
+        return y - alto - flowable.getSpaceAfter()
+
+    @staticmethod
+    def _numero_pagina(c: canvas.Canvas, pagina: int, ancho_pagina: float) -> None:
+        c.setFont('Helvetica', 8)
+        c.setFillColor(PDFGenerator.COLOR_GRIS)
+        c.drawRightString(ancho_pagina - PDFGenerator.MARGEN_DERECHO, PDFGenerator.MARGEN_INFERIOR / 2, f"Pagina {pagina}")
 
-        subtitulo = Paragraph("REPORTE DE VENTAS", subtitulo_style)
-        elements.append(subtitulo)
+    @staticmethod
+    def _estilos() -> dict:
+        """Estilos de parrafo del reporte"""
+        styles = getSampleStyleSheet()
+        return {
+            # Estilo personalizado para el título
+            "titulo": ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Heading1'],
+                fontSize=28,
+                textColor=PDFGenerator.COLOR_SECUNDARIO,
+                spaceAfter=6,
+                alignment=TA_CENTER,
+                fontName='Helvetica-Bold'
+            ),
+            # Estilo para subtítulo
+            "subtitulo": ParagraphStyle(
+                'CustomSubtitle',
+                parent=styles['Normal'],
+                fontSize=14,
+                textColor=PDFGenerator.COLOR_PRIMARIO,
+                spaceAfter=30,
+                alignment=TA_CENTER,
+                fontName='Helvetica-Bold'
+            ),
+            # Estilo para fecha
+            "fecha": ParagraphStyle(
+                'DateStyle',
+                parent=styles['Normal'],
+                fontSize=10,
+                textColor=PDFGenerator.COLOR_GRIS,
+                spaceAfter=20,
+                alignment=TA_RIGHT,
+                fontName='Helvetica'
+            ),
+            "pie": ParagraphStyle(
+                'Footer',
+                parent=styles['Normal'],
+                fontSize=8,
+                textColor=PDFGenerator.COLOR_GRIS,
+                alignment=TA_CENTER,
+                fontName='Helvetica-Oblique'
+            ),
+        }
+
+    @staticmethod
+    def _encabezado(estilos: dict, resumen: dict) -> list:
+        """Titulo, fecha de generacion y tabla de resumen de la primera pagina"""
+        elements = []
+
+        # ENCABEZADO
+        elements.append(Paragraph("PLAYZONE", estilos["titulo"]))
+        elements.append(Paragraph("REPORTE DE VENTAS", estilos["subtitulo"]))
 
         # Fecha de generación
         fecha_actual = datetime.now().strftime('%d de %B de %Y - %H:%M:%S')
-        meses_es = {
-            'January': 'Enero', 'February': 'Febrero', 'March': 'Marzo',
-            'April': 'Abril', 'May': 'Mayo', 'June': 'Junio',
-            'July': 'Julio', 'August': 'Agosto', 'September': 'Septiembre',
-            'October': 'Octubre', 'November': 'Noviembre', 'December': 'Diciembre'
-        }
-        for en, es in meses_es.items():
+        for en, es in PDFGenerator.MESES_ES.items():
             fecha_actual = fecha_actual.replace(en, es)
 
-        fecha_gen = Paragraph(f"<b>Fecha de generación:</b> {fecha_actual}", fecha_style)
-        elements.append(fecha_gen)
-
+        elements.append(Paragraph(f"<b>Fecha de generación:</b> {fecha_actual}", estilos["fecha"]))
         elements.append(Spacer(1, 0.3*inch))
 
         # RESUMEN ESTADÍSTICO
-        total_ventas = len(ventas_data)
-        total_monto = sum(venta['total'] for venta in ventas_data)
-        total_productos = sum(venta.get('total_productos', 0) for venta in ventas_data)
-
-        # Tabla de resumen
         resumen_data = [
             ['RESUMEN GENERAL', '', ''],
-            ['Total de Ventas:', str(total_ventas), 'ventas'],
-            ['Monto Total:', f"${total_monto:,.2f}", 'COP'],
-            ['Productos Vendidos:', str(total_productos), 'unidades']
+            ['Total de Ventas:', str(resumen["total_ventas"]), 'ventas'],
+            ['Monto Total:', f"${resumen['monto_total']:,.2f}", 'COP'],
+            ['Productos Vendidos:', str(resumen["productos_vendidos"]), 'unidades']
         ]
 
         resumen_table = Table(resumen_data, colWidths=[3.5*inch, 1.5*inch, 1*inch])
@@ -143,40 +246,38 @@ class PDFGenerator:
 
         elements.append(resumen_table)
         elements.append(Spacer(1, 0.4*inch))
+        return elements
 
-        # TABLA DE VENTAS DETALLADAS
-        # Encabezados
-        tabla_data = [
-            ['ID', 'Cliente', 'Productos', 'Total', 'Fecha', 'Usuario']
+    @staticmethod
+    def _fila_venta(venta: dict) -> list:
+        """Fila de la tabla de ventas detalladas"""
+        fecha_venta = venta['fecha_venta']
+        if isinstance(fecha_venta, str):
+            try:
+                fecha_venta = datetime.fromisoformat(fecha_venta.replace('Z', '+00:00'))
+            except ValueError:
+                pass
+
+        if isinstance(fecha_venta, datetime):
+            fecha_str = fecha_venta.strftime('%d/%m/%Y')
+        else:
+            fecha_str = str(fecha_venta)
+
+        return [
+            str(venta['id_venta']),
+            venta['nombre_cliente'][:20] + '...' if len(venta['nombre_cliente']) > 20 else venta['nombre_cliente'],
+            str(venta.get('total_productos', 0)),
+            f"${venta['total']:,.2f}",
+            fecha_str,
+            venta['nombre_usuario'][:15] + '...' if len(venta['nombre_usuario']) > 15 else venta['nombre_usuario']
         ]
 
-        # Datos de ventas
-        for venta in ventas_data:
-            fecha_venta = venta['fecha_venta']
-            if isinstance(fecha_venta, str):
-                try:
-                    fecha_venta = datetime.fromisoformat(fecha_venta.replace('Z', '+00:00'))
-                except:
-                    pass
-
-            if isinstance(fecha_venta, datetime):
-                fecha_str = fecha_venta.strftime('%d/%m/%Y')
-            else:
-                fecha_str = str(fecha_venta)
-
-            tabla_data.append([
-                str(venta['id_venta']),
-                venta['nombre_cliente'][:20] + '...' if len(venta['nombre_cliente']) > 20 else venta['nombre_cliente'],
-                str(venta.get('total_productos', 0)),
-                f"${venta['total']:,.2f}",
-                fecha_str,
-                venta['nombre_usuario'][:15] + '...' if len(venta['nombre_usuario']) > 15 else venta['nombre_usuario']
-            ])
-
-        # Crear tabla
+    @staticmethod
+    def _tabla_ventas(filas: List[list]) -> Table:
+        """Tabla de ventas detalladas (encabezado + filas) de una pagina"""
         ventas_table = Table(
-            tabla_data,
-            colWidths=[0.5*inch, 1.8*inch, 0.8*inch, 1.2*inch, 1*inch, 1.2*inch]
+            [PDFGenerator.ENCABEZADO_VENTAS, *filas],
+            colWidths=PDFGenerator.ANCHOS_COLUMNAS_VENTAS
         )
 
         ventas_table.setStyle(TableStyle([
@@ -208,30 +309,13 @@ class PDFGenerator:
             ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
             ('BOX', (0, 0), (-1, -1), 1, PDFGenerator.COLOR_SECUNDARIO),
         ]))
+        return ventas_table
 
-        elements.append(ventas_table)
-        elements.append(Spacer(1, 0.5*inch))
-
-        # PIE DE PÁGINA
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=8,
-            textColor=PDFGenerator.COLOR_GRIS,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Oblique'
-        )
-
-        footer_text = Paragraph(
+    @staticmethod
+    def _pie(estilos: dict) -> Paragraph:
+        """Pie del reporte"""
+        return Paragraph(
             "Este reporte ha sido generado automáticamente por el Sistema de Inventario PlayZone<br/>"
             "Para más información, contacte al administrador del sistema",
-            footer_style
+            estilos["pie"]
         )
-        elements.append(footer_text)
-
-        # Construir PDF
-        doc.build(elements)
-
-        # Mover el puntero al inicio del buffer
-        buffer.seek(0)
-        return buffer
@@ -1,10 +1,290 @@
 """
 Sistema de Rate Limiting
 Previene ataques de fuerza bruta limitando intentos de login
+
+Los contadores viven en un backend en memoria (ventana deslizante), de modo que
+puede_intentar_login no consulta la base de datos. Los intentos se siguen
+guardando en login_attempts, pero en lotes desde un hilo de fondo.
 """
-from datetime import datetime, timedelta
-from typing import Optional, Tuple
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Dict, Optional, Tuple
 from app.config.database import get_db_cursor
+from app.config.settings import settings
+from app.utils.batch_writer import BatchWriter
+
+
+class RateLimitBackend(ABC):
+    """
+    Interfaz de almacenamiento de contadores de intentos fallidos
+
+    Cada clave (usuario o IP) tiene una ventana deslizante de marcas de tiempo
+    y, opcionalmente, un bloqueo con fecha de vencimiento.
+    """
+
+    def __init__(self, ventana_segundos: float):
+        """
+        Args:
+            ventana_segundos: Duracion de la ventana deslizante
+        """
+        self.ventana_segundos = ventana_segundos
+
+    @abstractmethod
+    def registrar(self, clave: str, ahora: float) -> int:
+        """Agrega un intento a la ventana y retorna los intentos dentro de ella"""
+
+    @abstractmethod
+    def contar(self, clave: str, ahora: float) -> int:
+        """Retorna los intentos dentro de la ventana"""
+
+    @abstractmethod
+    def limpiar(self, clave: str) -> None:
+        """Elimina la ventana de intentos de la clave"""
+
+    @abstractmethod
+    def bloquear(self, clave: str, hasta: float) -> None:
+        """Bloquea la clave hasta la marca de tiempo indicada"""
+
+    @abstractmethod
+    def bloqueado_hasta(self, clave: str, ahora: float) -> Optional[float]:
+        """Retorna el vencimiento del bloqueo vigente o None"""
+
+    def stats(self) -> dict:
+        """Metricas del backend"""
+        return {"backend": type(self).__name__}
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Backend en memoria del proceso (un worker)
+
+    Acota la cantidad de claves (ventanas y bloqueos) para que un ataque con
+    muchas IPs o usuarios distintos no haga crecer la memoria sin limite.
+    """
+
+    def __init__(self, ventana_segundos: float, max_claves: int = 100000):
+        super().__init__(ventana_segundos)
+        self.max_claves = max_claves
+        self._ventanas: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self._bloqueos: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _podar(self, ventana: Deque[float], ahora: float) -> None:
+        limite = ahora - self.ventana_segundos
+        while ventana and ventana[0] <= limite:
+            ventana.popleft()
+
+    def registrar(self, clave: str, ahora: float) -> int:
+        with self._lock:
+            ventana = self._ventanas.get(clave)
+            if ventana is None:
+                ventana = self._ventanas[clave] = deque()
+                while len(self._ventanas) > self.max_claves:
+                    self._ventanas.popitem(last=False)
+            else:
+                self._ventanas.move_to_end(clave)
+            self._podar(ventana, ahora)
+            ventana.append(ahora)
+            return len(ventana)
+
+    def contar(self, clave: str, ahora: float) -> int:
+        with self._lock:
+            ventana = self._ventanas.get(clave)
+            if ventana is None:
+                return 0
+            self._podar(ventana, ahora)
+            if not ventana:
+                del self._ventanas[clave]
+                return 0
+            return len(ventana)
+
+    def limpiar(self, clave: str) -> None:
+        with self._lock:
+            self._ventanas.pop(clave, None)
+
+    def bloquear(self, clave: str, hasta: float) -> None:
+        with self._lock:
+            self._bloqueos.pop(clave, None)
+            self._bloqueos[clave] = hasta
+            # Todos los bloqueos duran lo mismo: los vencidos quedan al principio
+            ahora = time.time()
+            while self._bloqueos:
+                primera, vence = next(iter(self._bloqueos.items()))
+                if vence > ahora and len(self._bloqueos) <= self.max_claves:
+                    break
+                del self._bloqueos[primera]
+
+    def bloqueado_hasta(self, clave: str, ahora: float) -> Optional[float]:
+        with self._lock:
+            hasta = self._bloqueos.get(clave)
+            if hasta is None:
+                return None
+            if hasta <= ahora:
+                del self._bloqueos[clave]
+                return None
+            return hasta
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memoria",
+                "claves": len(self._ventanas),
+                "bloqueos": len(self._bloqueos),
+            }
+
+
+class LocalStore:
+    """
+    Sustituto local (en memoria) del subconjunto de comandos de Redis que usa
+    StoreRateLimitBackend: zadd, zremrangebyscore, zcard, expire, set, get, delete
+
+    Sirve para desarrollo y pruebas sin un servidor Redis.
+    """
+
+    def __init__(self):
+        self._datos: Dict[str, object] = {}
+        self._expira: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _vigente(self, clave: str) -> bool:
+        expira = self._expira.get(clave)
+        if expira is not None and expira <= time.time():
+            self._datos.pop(clave, None)
+            self._expira.pop(clave, None)
+        return clave in self._datos
+
+    def zadd(self, clave: str, miembros: Dict[str, float]) -> int:
+        with self._lock:
+            if not self._vigente(clave):
+                self._datos[clave] = {}
+            zset = self._datos[clave]
+            nuevos = len([m for m in miembros if m not in zset])
+            zset.update(miembros)
+            return nuevos
+
+    def zremrangebyscore(self, clave: str, minimo: float, maximo: float) -> int:
+        with self._lock:
+            if not self._vigente(clave):
+                return 0
+            zset = self._datos[clave]
+            quitar = [m for m, puntaje in zset.items() if minimo <= puntaje <= maximo]
+            for miembro in quitar:
+                del zset[miembro]
+            return len(quitar)
+
+    def zcard(self, clave: str) -> int:
+        with self._lock:
+            return len(self._datos[clave]) if self._vigente(clave) else 0
+
+    def expire(self, clave: str, segundos: int) -> bool:
+        with self._lock:
+            if not self._vigente(clave):
+                return False
+            self._expira[clave] = time.time() + segundos
+            return True
+
+    def set(self, clave: str, valor: str, ex: Optional[int] = None) -> bool:
+        with self._lock:
+            self._datos[clave] = valor
+            self._expira.pop(clave, None)
+            if ex is not None:
+                self._expira[clave] = time.time() + ex
+            return True
+
+    def get(self, clave: str) -> Optional[str]:
+        with self._lock:
+            return self._datos[clave] if self._vigente(clave) else None
+
+    def delete(self, *claves: str) -> int:
+        with self._lock:
+            eliminadas = 0
+            for clave in claves:
+                if self._vigente(clave):
+                    eliminadas += 1
+                self._datos.pop(clave, None)
+                self._expira.pop(clave, None)
+            return eliminadas
+
+
+class StoreRateLimitBackend(RateLimitBackend):
+    """
+    Backend sobre un almacen compartido con API de Redis (sorted sets)
+
+    Permite que varios workers/instancias compartan los contadores. En desarrollo
+    puede usarse con LocalStore en lugar de un cliente Redis.
+    """
+
+    def __init__(self, store, ventana_segundos: float, prefijo: str = "playzone:rl:"):
+        """
+        Args:
+            store: Cliente con API de Redis (redis.Redis o LocalStore)
+            ventana_segundos: Duracion de la ventana deslizante
+            prefijo: Prefijo de las claves en el almacen
+        """
+        super().__init__(ventana_segundos)
+        self.store = store
+        self.prefijo = prefijo
+
+    def registrar(self, clave: str, ahora: float) -> int:
+        clave = f"{self.prefijo}intentos:{clave}"
+        self.store.zadd(clave, {f"{ahora}:{uuid.uuid4().hex}": ahora})
+        self.store.zremrangebyscore(clave, 0, ahora - self.ventana_segundos)
+        self.store.expire(clave, int(self.ventana_segundos) + 1)
+        return self.store.zcard(clave)
+
+    def contar(self, clave: str, ahora: float) -> int:
+        clave = f"{self.prefijo}intentos:{clave}"
+        self.store.zremrangebyscore(clave, 0, ahora - self.ventana_segundos)
+        return self.store.zcard(clave)
+
+    def limpiar(self, clave: str) -> None:
+        self.store.delete(f"{self.prefijo}intentos:{clave}")
+
+    def bloquear(self, clave: str, hasta: float) -> None:
+        segundos = max(int(hasta - time.time()) + 1, 1)
+        self.store.set(f"{self.prefijo}bloqueo:{clave}", str(hasta), ex=segundos)
+
+    def bloqueado_hasta(self, clave: str, ahora: float) -> Optional[float]:
+        valor = self.store.get(f"{self.prefijo}bloqueo:{clave}")
+        if valor is None:
+            return None
+        hasta = float(valor.decode() if isinstance(valor, bytes) else valor)
+        return hasta if hasta > ahora else None
+
+    def stats(self) -> dict:
+        return {"backend": type(self.store).__name__}
+
+
+def crear_backend(nombre: str, ventana_segundos: float) -> RateLimitBackend:
+    """
+    Crea el backend de rate limiting configurado
+
+    Args:
+        nombre: 'memoria' (por proceso), 'local' (almacen compartido simulado) o 'redis'
+        ventana_segundos: Duracion de la ventana deslizante
+
+    Returns:
+        Backend de rate limiting
+
+    Raises:
+        RuntimeError: Si se pide Redis y la libreria no esta instalada
+        ValueError: Si el nombre no es valido
+    """
+    if nombre == "memoria":
+        return MemoryRateLimitBackend(ventana_segundos)
+    if nombre == "local":
+        return StoreRateLimitBackend(LocalStore(), ventana_segundos)
+    if nombre == "redis":
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requiere instalar el paquete 'redis'")
+        return StoreRateLimitBackend(redis.Redis.from_url(settings.rate_limit_redis_url), ventana_segundos)
+    raise ValueError(f"Backend de rate limiting invalido: {nombre}")
 
 
 class RateLimiter:
@@ -16,43 +296,83 @@ class RateLimiter:
     TIEMPO_BLOQUEO_MINUTOS = 15  # Tiempo de bloqueo en minutos
     VENTANA_TIEMPO_MINUTOS = 10  # Ventana de tiempo para contar intentos
 
+    backend: RateLimitBackend = crear_backend(settings.rate_limit_backend, VENTANA_TIEMPO_MINUTOS * 60)
+
+    # Los intentos se guardan en login_attempts en lotes (misma configuracion que la auditoria)
+    intentos_writer = BatchWriter(
+        nombre="login_attempts",
+        sql="""
+            INSERT INTO login_attempts (username, ip_address, exitoso, razon_fallo, user_agent, fecha_intento)
+            VALUES %s
+        """,
+        max_cola=settings.audit_queue_max,
+        tam_lote=settings.audit_batch_size,
+        intervalo=settings.audit_flush_interval,
+        politica=settings.audit_queue_policy
+    )
+
     @staticmethod
-    def registrar_intento(username: str, ip_address: str, exitoso: bool, razon_fallo: Optional[str] = None, user_agent: Optional[str] = None):
+    def _persistir_estado_usuario(username: str, intentos_fallidos: int, bloqueado_hasta: Optional[datetime]) -> None:
+        """Refleja el estado de bloqueo en la tabla usuarios (solo cuando cambia)"""
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                "UPDATE usuarios SET intentos_fallidos = %s, bloqueado_hasta = %s WHERE username = %s",
+                (intentos_fallidos, bloqueado_hasta, username)
+            )
+
+    @staticmethod
+    def registrar_intento(
+        username: str,
+        ip_address: str,
+        exitoso: bool,
+        razon_fallo: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        actualizar_usuario: bool = True
+    ):
         """
         Registra un intento de login
 
+        Actualiza los contadores en memoria y encola el registro para login_attempts.
+        La tabla usuarios solo se escribe cuando se bloquea o se desbloquea al usuario.
+
         Args:
             username: Usuario que intenta iniciar sesión
             ip_address: Dirección IP
             exitoso: Si el intento fue exitoso
             razon_fallo: Razón del fallo (opcional)
             user_agent: User agent del navegador
+            actualizar_usuario: Si es False, no se escribe el desbloqueo en usuarios
+                (el llamador ya lo hizo en su propia transacción)
         """
-        with get_db_cursor() as cursor:
-            cursor.execute(
-                """
-                INSERT INTO login_attempts (username, ip_address, exitoso, razon_fallo, user_agent)
-                VALUES (%s, %s, %s, %s, %s)
-                """,
-                (username, ip_address, exitoso, razon_fallo, user_agent)
-            )
-
-            # Si fue exitoso, resetear contador de intentos fallidos del usuario
-            if exitoso:
-                cursor.execute(
-                    "UPDATE usuarios SET intentos_fallidos = 0, bloqueado_hasta = NULL WHERE username = %s",
-                    (username,)
-                )
-            else:
-                # Incrementar contador de intentos fallidos
-                cursor.execute(
-                    """
-                    UPDATE usuarios
-                    SET intentos_fallidos = intentos_fallidos + 1
-                    WHERE username = %s
-                    """,
-                    (username,)
-                )
+        RateLimiter.intentos_writer.put(
+            (username, ip_address, exitoso, razon_fallo, user_agent, datetime.now(timezone.utc))
+        )
+
+        backend = RateLimiter.backend
+        ahora = time.time()
+        clave_usuario = f"usuario:{username}"
+
+        # Si fue exitoso, resetear contador de intentos fallidos del usuario
+        if exitoso:
+            if backend.contar(clave_usuario, ahora):
+                backend.limpiar(clave_usuario)
+                if actualizar_usuario:
+                    RateLimiter._persistir_estado_usuario(username, 0, None)
+            return
+
+        backend.registrar(f"ip:{ip_address}", ahora)
+
+        # Los intentos durante un bloqueo no lo extienden
+        if backend.bloqueado_hasta(clave_usuario, ahora):
+            return
+
+        intentos = backend.registrar(clave_usuario, ahora)
+        if intentos >= RateLimiter.MAX_INTENTOS_POR_USUARIO:
+            # Bloquear usuario
+            hasta = ahora + RateLimiter.TIEMPO_BLOQUEO_MINUTOS * 60
+            backend.bloquear(clave_usuario, hasta)
+            backend.limpiar(clave_usuario)
+            RateLimiter._persistir_estado_usuario(username, intentos, datetime.fromtimestamp(hasta))
 
     @staticmethod
     def verificar_bloqueo_usuario(username: str) -> Tuple[bool, Optional[str]]:
@@ -65,45 +385,46 @@ class RateLimiter:
         Returns:
             Tuple (bloqueado: bool, mensaje: str)
         """
-        with get_db_cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT intentos_fallidos, bloqueado_hasta
-                FROM usuarios
-                WHERE username = %s
-                """,
-                (username,)
-            )
-            user = cursor.fetchone()
-
-            if not user:
-                return False, None
-
-            # Verificar si tiene un bloqueo temporal activo
-            if user['bloqueado_hasta'] and user['bloqueado_hasta'] > datetime.now():
-                tiempo_restante = (user['bloqueado_hasta'] - datetime.now()).seconds // 60
-                return True, f"Usuario bloqueado temporalmente. Intente nuevamente en {tiempo_restante} minutos."
-
-            # Si el bloqueo expiró, limpiar
-            if user['bloqueado_hasta'] and user['bloqueado_hasta'] <= datetime.now():
-                cursor.execute(
-                    "UPDATE usuarios SET intentos_fallidos = 0, bloqueado_hasta = NULL WHERE username = %s",
-                    (username,)
-                )
-                return False, None
-
-            # Verificar si alcanzó el máximo de intentos
-            if user['intentos_fallidos'] >= RateLimiter.MAX_INTENTOS_POR_USUARIO:
-                # Bloquear usuario
-                bloqueado_hasta = datetime.now() + timedelta(minutes=RateLimiter.TIEMPO_BLOQUEO_MINUTOS)
-                cursor.execute(
-                    "UPDATE usuarios SET bloqueado_hasta = %s WHERE username = %s",
-                    (bloqueado_hasta, username)
-                )
-                return True, f"Demasiados intentos fallidos. Usuario bloqueado por {RateLimiter.TIEMPO_BLOQUEO_MINUTOS} minutos."
+        ahora = time.time()
+        hasta = RateLimiter.backend.bloqueado_hasta(f"usuario:{username}", ahora)
+
+        if hasta is None:
+            return False, None
+
+        return True, RateLimiter._mensaje_bloqueo(hasta, ahora)
+
+    @staticmethod
+    def verificar_bloqueo_persistido(username: str, bloqueado_hasta: Optional[datetime]) -> Tuple[bool, Optional[str]]:
+        """
+        Verifica el bloqueo guardado en usuarios.bloqueado_hasta
+
+        Cubre los bloqueos que el backend no conoce (puestos por un administrador,
+        por otro proceso o antes de reiniciar el servidor). Si sigue vigente, se
+        copia al backend para que los siguientes intentos no lleguen a la base de datos.
+
+        Args:
+            username: Usuario a verificar
+            bloqueado_hasta: Valor de usuarios.bloqueado_hasta (hora local, sin zona)
+
+        Returns:
+            Tuple (bloqueado: bool, mensaje: str)
+        """
+        if bloqueado_hasta is None:
+            return False, None
 
+        ahora = time.time()
+        hasta = bloqueado_hasta.timestamp()
+        if hasta <= ahora:
             return False, None
 
+        RateLimiter.backend.bloquear(f"usuario:{username}", hasta)
+        return True, RateLimiter._mensaje_bloqueo(hasta, ahora)
+
+    @staticmethod
+    def _mensaje_bloqueo(hasta: float, ahora: float) -> str:
+        tiempo_restante = max(int((hasta - ahora) // 60), 1)
+        return f"Usuario bloqueado temporalmente. Intente nuevamente en {tiempo_restante} minutos."
+
     @staticmethod
     def verificar_bloqueo_ip(ip_address: str) -> Tuple[bool, Optional[str]]:
         """
@@ -115,31 +436,17 @@ class RateLimiter:
         Returns:
             Tuple (bloqueado: bool, mensaje: str)
         """
-        ventana_inicio = datetime.now() - timedelta(minutes=RateLimiter.VENTANA_TIEMPO_MINUTOS)
+        intentos = RateLimiter.backend.contar(f"ip:{ip_address}", time.time())
 
-        with get_db_cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT COUNT(*) as intentos
-                FROM login_attempts
-                WHERE ip_address = %s
-                AND exitoso = FALSE
-                AND fecha_intento >= %s
-                """,
-                (ip_address, ventana_inicio)
-            )
-            result = cursor.fetchone()
-            intentos = result['intentos']
-
-            if intentos >= RateLimiter.MAX_INTENTOS_POR_IP:
-                return True, f"Demasiados intentos desde esta IP. Intente nuevamente en {RateLimiter.VENTANA_TIEMPO_MINUTOS} minutos."
+        if intentos >= RateLimiter.MAX_INTENTOS_POR_IP:
+            return True, f"Demasiados intentos desde esta IP. Intente nuevamente en {RateLimiter.VENTANA_TIEMPO_MINUTOS} minutos."
 
-            return False, None
+        return False, None
 
     @staticmethod
     def puede_intentar_login(username: str, ip_address: str) -> Tuple[bool, Optional[str]]:
         """
-        Verifica si se puede intentar un login
+        Verifica si se puede intentar un login (sin consultar la base de datos)
 
         Args:
             username: Usuario
@@ -160,6 +467,14 @@ class RateLimiter:
 
         return True, None
 
+    @staticmethod
+    def stats() -> dict:
+        """Metricas del backend y de la cola de login_attempts"""
+        return {
+            **RateLimiter.backend.stats(),
+            "escritura": RateLimiter.intentos_writer.stats(),
+        }
+
     @staticmethod
     def obtener_intentos_recientes(username: Optional[str] = None, ip_address: Optional[str] = None, limite: int = 20) -> list:
         """
@@ -26,7 +26,8 @@ class RefreshTokenManager:
     def crear_refresh_token(
         id_usuario: int,
         ip_address: Optional[str] = None,
-        user_agent: Optional[str] = None
+        user_agent: Optional[str] = None,
+        cursor=None
     ) -> str:
         """
         Crea un nuevo refresh token
@@ -35,6 +36,8 @@ class RefreshTokenManager:
             id_usuario: ID del usuario
             ip_address: Dirección IP del cliente
             user_agent: User agent del navegador
+            cursor: Cursor de una transacción en curso (opcional); si no se
+                indica, el token se guarda en su propia transacción
 
         Returns:
             Token de refresco (string seguro)
@@ -46,15 +49,17 @@ class RefreshTokenManager:
         # Calcular fecha de expiración
         expira_en = datetime.now() + timedelta(days=RefreshTokenManager.REFRESH_TOKEN_EXPIRE_DAYS)
 
-        with get_db_cursor() as cursor:
-            cursor.execute(
-                """
-                INSERT INTO refresh_tokens (id_usuario, token, token_hash, expira_en, ip_address, user_agent)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING id_refresh_token
-                """,
-                (id_usuario, token, token_hash, expira_en, ip_address, user_agent)
-            )
+        query = """
+            INSERT INTO refresh_tokens (id_usuario, token, token_hash, expira_en, ip_address, user_agent)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """
+        params = (id_usuario, token, token_hash, expira_en, ip_address, user_agent)
+
+        if cursor is not None:
+            cursor.execute(query, params)
+        else:
+            with get_db_cursor() as cursor:
+                cursor.execute(query, params)
 
         return token
 
@@ -0,0 +1,290 @@
+"""
+Trabajos de reportes en segundo plano con cache en disco
+Un reporte se solicita, se genera en un hilo de trabajo y queda guardado en disco
+bajo una clave formada por el tipo, los filtros y una marca de version de los
+datos: mientras los datos no cambien, la misma solicitud se sirve del archivo
+ya generado
+
+Los trabajos viven en memoria del proceso; los archivos en disco se comparten
+entre procesos que usen la misma carpeta (REPORT_CACHE_DIR).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, NamedTuple, Optional
+import anyio
+from app.config.database import run_in_db_thread
+from app.config.settings import settings
+from app.utils.streaming import run_in_report_thread
+
+logger = logging.getLogger(__name__)
+
+# Estados de un trabajo
+ESTADO_PENDIENTE = "pendiente"
+ESTADO_EN_PROCESO = "en_proceso"
+ESTADO_LISTO = "listo"
+ESTADO_ERROR = "error"
+
+
+class TipoReporte(NamedTuple):
+    """Reporte que se puede generar como trabajo"""
+    nombre: str
+    version: Callable[..., str]          # Marca de version de los datos (funcion bloqueante)
+    generar: Callable[..., BinaryIO]     # Genera el archivo (funcion bloqueante)
+    extension: str
+    media_type: str
+
+
+class ReportJob:
+    """Solicitud de un reporte y su resultado"""
+
+    def __init__(self, tipo: TipoReporte, params: dict, clave: str, ruta: Path, id_usuario: Optional[int] = None):
+        self.id = uuid.uuid4().hex
+        self.tipo = tipo
+        self.params = params
+        self.clave = clave
+        self.ruta = ruta
+        self.id_usuario = id_usuario
+        self.estado = ESTADO_PENDIENTE
+        self.desde_cache = False
+        self.error: Optional[str] = None
+        self.creado_en = time.time()
+        self.terminado_en: Optional[float] = None
+        self.terminado = asyncio.Event()
+
+    @property
+    def finalizado(self) -> bool:
+        return self.estado in (ESTADO_LISTO, ESTADO_ERROR)
+
+    def a_dict(self) -> dict:
+        """Datos publicos del trabajo"""
+        return {
+            "id": self.id,
+            "tipo": self.tipo.nombre,
+            "params": self.params,
+            "estado": self.estado,
+            "desde_cache": self.desde_cache,
+            "error": self.error,
+            "creado_en": self.creado_en,
+            "terminado_en": self.terminado_en,
+            "duracion_s": round(self.terminado_en - self.creado_en, 3) if self.terminado_en else None,
+        }
+
+
+class ReportJobManager:
+    """
+    Registro de trabajos de reportes y cache de archivos generados
+
+    Se usa desde el event loop: cada trabajo es una tarea asyncio que genera el
+    archivo con run_in_report_thread (como maximo REPORT_WORKERS a la vez).
+    """
+
+    def __init__(self, directorio: str, max_mb: int = 200, max_trabajos: int = 200):
+        """
+        Args:
+            directorio: Carpeta de la cache de archivos
+            max_mb: Tamaño maximo de la cache (se eliminan los archivos menos usados)
+            max_trabajos: Trabajos finalizados que se recuerdan en memoria
+        """
+        self.directorio = Path(directorio)
+        self.max_bytes = max_mb * 1024 * 1024
+        self.max_trabajos = max_trabajos
+
+        self._tipos: Dict[str, TipoReporte] = {}
+        self._trabajos: "OrderedDict[str, ReportJob]" = OrderedDict()
+        self._en_curso: Dict[str, ReportJob] = {}  # clave -> trabajo sin terminar
+        self._tareas: Dict[str, asyncio.Task] = {}
+
+        self._aciertos = 0
+        self._generados = 0
+        self._errores = 0
+
+    def registrar(self, tipo: TipoReporte) -> None:
+        """Registra un tipo de reporte"""
+        self._tipos[tipo.nombre] = tipo
+
+    @property
+    def tipos(self) -> list:
+        return list(self._tipos)
+
+    async def solicitar(self, nombre_tipo: str, params: dict, id_usuario: Optional[int] = None) -> ReportJob:
+        """
+        Solicita un reporte
+
+        Si el archivo para los mismos filtros y la misma version de los datos ya
+        existe, el trabajo se crea terminado. Si otro trabajo identico esta en
+        curso, se retorna ese trabajo.
+
+        Args:
+            nombre_tipo: Tipo de reporte registrado
+            params: Filtros del reporte (argumentos de version y generar)
+            id_usuario: Usuario que lo solicita
+
+        Returns:
+            Trabajo del reporte
+
+        Raises:
+            KeyError: Si el tipo no esta registrado
+        """
+        tipo = self._tipos[nombre_tipo]
+        version = await run_in_db_thread(tipo.version, **params)
+        clave = self._clave(tipo, params, version)
+
+        en_curso = self._en_curso.get(clave)
+        if en_curso is not None:
+            return en_curso
+
+        trabajo = ReportJob(tipo, params, clave, self.directorio / f"{clave}.{tipo.extension}", id_usuario)
+        self._agregar(trabajo)
+
+        if await anyio.to_thread.run_sync(self._usar_archivo, trabajo.ruta):
+            self._aciertos += 1
+            trabajo.desde_cache = True
+            self._finalizar(trabajo, ESTADO_LISTO)
+            return trabajo
+
+        self._en_curso[clave] = trabajo
+        self._tareas[trabajo.id] = asyncio.create_task(self._ejecutar(trabajo))
+        return trabajo
+
+    def obtener(self, id_trabajo: str) -> Optional[ReportJob]:
+        """Trabajo por id (None si no existe o ya se olvido)"""
+        return self._trabajos.get(id_trabajo)
+
+    async def esperar(self, trabajo: ReportJob, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que un trabajo termine
+
+        Args:
+            trabajo: Trabajo a esperar
+            timeout: Segundos maximos (None = sin limite)
+
+        Returns:
+            True si el trabajo termino
+        """
+        with anyio.move_on_after(timeout):
+            await trabajo.terminado.wait()
+        return trabajo.finalizado
+
+    def abrir(self, trabajo: ReportJob) -> BinaryIO:
+        """Abre el archivo de un trabajo listo (lo cierra quien lo lee)"""
+        return open(trabajo.ruta, "rb")
+
+    async def cerrar(self) -> None:
+        """Cancela los trabajos en curso (al apagar el servidor)"""
+        tareas = list(self._tareas.values())
+        for tarea in tareas:
+            tarea.cancel()
+        if tareas:
+            await asyncio.gather(*tareas, return_exceptions=True)
+
+    def stats(self) -> dict:
+        """Metricas de trabajos y de la cache en disco"""
+        archivos = [a for a in self.directorio.iterdir() if a.suffix != ".tmp"] if self.directorio.exists() else []
+        return {
+            "trabajos": len(self._trabajos),
+            "en_curso": len(self._en_curso),
+            "aciertos_cache": self._aciertos,
+            "generados": self._generados,
+            "errores": self._errores,
+            "archivos": len(archivos),
+            "bytes": sum(a.stat().st_size for a in archivos if a.is_file()),
+            "max_bytes": self.max_bytes,
+        }
+
+    async def _ejecutar(self, trabajo: ReportJob) -> None:
+        trabajo.estado = ESTADO_EN_PROCESO
+        try:
+            archivo = await run_in_report_thread(trabajo.tipo.generar, **trabajo.params)
+            await anyio.to_thread.run_sync(self._guardar, archivo, trabajo.ruta)
+            self._generados += 1
+            self._finalizar(trabajo, ESTADO_LISTO)
+        except asyncio.CancelledError:
+            self._finalizar(trabajo, ESTADO_ERROR, "Generacion cancelada")
+            raise
+        except Exception as e:
+            logger.exception("Error generando el reporte %s (%s)", trabajo.tipo.nombre, trabajo.id)
+            self._errores += 1
+            self._finalizar(trabajo, ESTADO_ERROR, str(e) or e.__class__.__name__)
+        finally:
+            self._en_curso.pop(trabajo.clave, None)
+            self._tareas.pop(trabajo.id, None)
+
+    def _finalizar(self, trabajo: ReportJob, estado: str, error: Optional[str] = None) -> None:
+        trabajo.estado = estado
+        trabajo.error = error
+        trabajo.terminado_en = time.time()
+        trabajo.terminado.set()
+
+    def _agregar(self, trabajo: ReportJob) -> None:
+        """Registra un trabajo y olvida los finalizados mas antiguos"""
+        self._trabajos[trabajo.id] = trabajo
+        for id_antiguo in list(self._trabajos):
+            if len(self._trabajos) <= self.max_trabajos:
+                break
+            if self._trabajos[id_antiguo].finalizado:
+                del self._trabajos[id_antiguo]
+
+    @staticmethod
+    def _clave(tipo: TipoReporte, params: dict, version: str) -> str:
+        contenido = json.dumps([tipo.nombre, params, version], sort_keys=True, default=str)
+        return hashlib.sha256(contenido.encode()).hexdigest()
+
+    @staticmethod
+    def _usar_archivo(ruta: Path) -> bool:
+        """Marca un archivo de la cache como usado recientemente; False si no existe"""
+        try:
+            os.utime(ruta)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _guardar(self, archivo: BinaryIO, ruta: Path) -> None:
+        """Copia el archivo generado a la cache (reemplazo atomico) y aplica el limite de tamaño"""
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        try:
+            archivo.seek(0)
+            with tempfile.NamedTemporaryFile(dir=self.directorio, suffix=".tmp", delete=False) as destino:
+                shutil.copyfileobj(archivo, destino)
+            os.replace(destino.name, ruta)
+        finally:
+            archivo.close()
+        self._recortar(conservar=ruta)
+
+    def _recortar(self, conservar: Optional[Path] = None) -> None:
+        """Elimina los archivos menos usados mientras la cache supere max_bytes"""
+        archivos = []
+        for ruta in self.directorio.iterdir():
+            if ruta.suffix == ".tmp" or ruta == conservar:
+                continue
+            try:
+                info = ruta.stat()
+            except FileNotFoundError:
+                continue
+            archivos.append((info.st_mtime, info.st_size, ruta))
+
+        total = sum(tamano for _, tamano, _ in archivos)
+        for _, tamano, ruta in sorted(archivos):
+            if total <= self.max_bytes:
+                break
+            try:
+                ruta.unlink()
+                total -= tamano
+            except FileNotFoundError:
+                pass
+
+
+# Instancia global (los tipos de reporte se registran en app/controllers/reporte_controller.py)
+report_jobs = ReportJobManager(
+    settings.report_cache_dir,
+    max_mb=settings.report_cache_max_mb,
+    max_trabajos=settings.report_jobs_max
+)
@@ -2,10 +2,67 @@
 Utilidades para respuestas estandarizadas de la API
 RF-15: Confirmacion de Registro
 """
+from decimal import Decimal
 from typing import Any, Optional
+import orjson
+from fastapi import Response
 from fastapi.responses import JSONResponse
 
 
+def _valor_json(valor: Any) -> Any:
+    """Tipos que orjson no serializa por si mismo"""
+    if isinstance(valor, Decimal):
+        # Como texto, igual que la serializacion de FastAPI/pydantic (sin perder precision)
+        return str(valor)
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+def serializar_json(contenido: Any) -> bytes:
+    """Serializa con orjson (Decimal como texto, fechas en ISO 8601)"""
+    return orjson.dumps(
+        contenido,
+        default=_valor_json,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+    )
+
+
+class RespuestaJSON(JSONResponse):
+    """
+    JSONResponse serializada con orjson
+
+    Acepta directamente las filas de la base de datos (Decimal, datetime, date)
+    y produce el mismo JSON que la validacion de response_model, sin convertir
+    antes cada fila a tipos basicos de Python.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return serializar_json(content)
+
+
+def respuesta_json(contenido: Any, response: Optional[Response] = None, status_code: int = 200) -> RespuestaJSON:
+    """
+    Respuesta JSON para listados grandes
+
+    Al retornar una respuesta ya armada FastAPI omite la validacion y
+    serializacion del response_model (que se mantiene para la documentacion).
+
+    Args:
+        contenido: Datos a serializar (filas de la base de datos)
+        response: Respuesta inyectada en la ruta, para conservar sus encabezados
+            (paginacion, ETag) (opcional)
+        status_code: Codigo HTTP
+
+    Returns:
+        RespuestaJSON
+    """
+    respuesta = RespuestaJSON(content=contenido, status_code=status_code)
+    if response is not None:
+        for nombre, valor in response.headers.items():
+            if nombre not in ("content-length", "content-type"):
+                respuesta.headers.append(nombre, valor)
+    return respuesta
+
+
 def success_response(
     message: str,
     data: Any = None,
@@ -2,8 +2,12 @@
 Utilidades de seguridad - Hash de passwords y JWT
 RF-01: Autenticacion segura
 """
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Optional, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config.settings import settings
@@ -11,10 +15,123 @@ from app.config.settings import settings
 # Contexto para hash de passwords
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
+
+class PasswordHasherBusyError(Exception):
+    """Se lanza cuando la cola de hashing de contrasenas esta llena"""
+    pass
+
+
+class PasswordHasher:
+    """
+    Pool acotado de hilos para bcrypt
+
+    bcrypt libera el GIL mientras calcula el hash, por lo que un pool de hilos
+    basta para sacarlo del event loop. El pool limita cuantos hashes corren a la
+    vez y la cola limita cuantos pueden esperar; si se llena se rechaza la
+    solicitud en lugar de acumular latencia.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        """
+        Args:
+            max_workers: Hashes simultaneos
+            max_queue: Solicitudes que pueden esperar en cola
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._en_cola = 0
+        self._en_proceso = 0
+        self._max_en_cola = 0
+        self._completadas = 0
+        self._rechazadas = 0
+        self._tiempo_espera = 0.0
+        self._tiempo_hash = 0.0
+
+    def submit(self, func: Callable[..., T], *args: Any) -> "Future[T]":
+        """
+        Encola una operacion de hashing
+
+        Args:
+            func: Funcion a ejecutar (hash o verificacion)
+            *args: Argumentos de la funcion
+
+        Returns:
+            Future con el resultado
+
+        Raises:
+            PasswordHasherBusyError: Si la cola esta llena
+        """
+        with self._lock:
+            if self._en_cola >= self.max_queue:
+                self._rechazadas += 1
+                raise PasswordHasherBusyError("Cola de hashing de contrasenas llena")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="bcrypt"
+                )
+            self._en_cola += 1
+            self._max_en_cola = max(self._max_en_cola, self._en_cola)
+            executor = self._executor
+
+        encolado = time.perf_counter()
+
+        def tarea() -> T:
+            inicio = time.perf_counter()
+            with self._lock:
+                self._en_cola -= 1
+                self._en_proceso += 1
+                self._tiempo_espera += inicio - encolado
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._en_proceso -= 1
+                    self._completadas += 1
+                    self._tiempo_hash += time.perf_counter() - inicio
+
+        return executor.submit(tarea)
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Ejecuta la operacion en el pool y espera el resultado sin bloquear el event loop"""
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def stats(self) -> dict:
+        """Metricas del pool de hashing"""
+        with self._lock:
+            return {
+                "hilos": self.max_workers,
+                "cola_maxima": self.max_queue,
+                "en_cola": self._en_cola,
+                "en_proceso": self._en_proceso,
+                "max_en_cola": self._max_en_cola,
+                "completadas": self._completadas,
+                "rechazadas": self._rechazadas,
+                "espera_promedio_ms": round(self._tiempo_espera / self._completadas * 1000, 2) if self._completadas else 0.0,
+                "hash_promedio_ms": round(self._tiempo_hash / self._completadas * 1000, 2) if self._completadas else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        """Detiene el pool esperando las operaciones en curso"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue
+)
+
 
 def hash_password(password: str) -> str:
     """
-    Hashea una contrasena usando bcrypt
+    Hashea una contrasena usando bcrypt (en el pool de hashing)
 
     Args:
         password: Contrasena en texto plano
@@ -22,12 +139,39 @@ def hash_password(password: str) -> str:
     Returns:
         Hash de la contrasena
     """
-    return pwd_context.hash(password)
+    return password_hasher.submit(pwd_context.hash, password).result()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    Verifica si una contrasena coincide con su hash
+    Verifica si una contrasena coincide con su hash (en el pool de hashing)
+
+    Args:
+        plain_password: Contrasena en texto plano
+        hashed_password: Hash almacenado
+
+    Returns:
+        True si coinciden, False si no
+    """
+    return password_hasher.submit(pwd_context.verify, plain_password, hashed_password).result()
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Version asincrona de hash_password para usar desde el event loop
+
+    Args:
+        password: Contrasena en texto plano
+
+    Returns:
+        Hash de la contrasena
+    """
+    return await password_hasher.run(pwd_context.hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Version asincrona de verify_password para usar desde el event loop
 
     Args:
         plain_password: Contrasena en texto plano
@@ -36,7 +180,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True si coinciden, False si no
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return await password_hasher.run(pwd_context.verify, plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
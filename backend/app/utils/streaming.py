@@ -0,0 +1,127 @@
+"""
+Utilidades para respuestas generadas fuera del event loop
+Reportes pesados en hilos de trabajo acotados y envio por bloques de archivos temporales
+"""
+import functools
+from typing import Any, AsyncIterator, BinaryIO, Callable, Iterator, Optional, TypeVar
+import anyio
+from fastapi.responses import StreamingResponse
+from app.config.settings import settings
+
+T = TypeVar("T")
+
+TAM_BLOQUE = 64 * 1024  # Bytes por bloque enviado al cliente
+
+# Limita los reportes que se generan a la vez, para que no ocupen todos los hilos
+# y conexiones que usan las demas solicitudes
+_limitador_reportes: Optional[anyio.CapacityLimiter] = None
+
+
+# Limita las exportaciones simultaneas (cada una mantiene una conexion durante toda la descarga)
+_limitador_exportaciones: Optional[anyio.CapacityLimiter] = None
+
+
+def _get_limitador_reportes() -> anyio.CapacityLimiter:
+    global _limitador_reportes
+    if _limitador_reportes is None:
+        _limitador_reportes = anyio.CapacityLimiter(settings.report_workers)
+    return _limitador_reportes
+
+
+def _get_limitador_exportaciones() -> anyio.CapacityLimiter:
+    global _limitador_exportaciones
+    if _limitador_exportaciones is None:
+        _limitador_exportaciones = anyio.CapacityLimiter(settings.export_max_concurrent)
+    return _limitador_exportaciones
+
+
+async def run_in_report_thread(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Ejecuta la generacion de un reporte en un hilo de trabajo, sin bloquear el event loop
+
+    Como maximo REPORT_WORKERS reportes se generan a la vez; los demas esperan
+    en el event loop.
+
+    Args:
+        func: Funcion sincrona que genera el reporte
+        *args, **kwargs: Argumentos de la funcion
+
+    Returns:
+        El resultado de la funcion
+    """
+    return await anyio.to_thread.run_sync(
+        functools.partial(func, *args, **kwargs),
+        limiter=_get_limitador_reportes()
+    )
+
+
+def tamano_archivo(archivo: BinaryIO) -> int:
+    """Tamaño en bytes de un archivo abierto, dejandolo posicionado al inicio"""
+    archivo.seek(0, 2)
+    tamano = archivo.tell()
+    archivo.seek(0)
+    return tamano
+
+
+async def iterar_archivo(archivo: BinaryIO, tam_bloque: int = TAM_BLOQUE) -> AsyncIterator[bytes]:
+    """
+    Lee un archivo por bloques en un hilo de trabajo (para StreamingResponse)
+    y lo cierra al terminar o si el cliente se desconecta
+
+    Args:
+        archivo: Archivo abierto en modo binario
+        tam_bloque: Bytes por bloque
+    """
+    try:
+        while True:
+            bloque = await anyio.to_thread.run_sync(archivo.read, tam_bloque)
+            if not bloque:
+                break
+            yield bloque
+    finally:
+        archivo.close()
+
+
+async def iterar_generador(generador: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    Consume un generador bloqueante (p.ej. filas de un cursor del servidor) en hilos
+    de trabajo, un bloque a la vez (para StreamingResponse)
+
+    Como maximo EXPORT_MAX_CONCURRENT generadores se consumen a la vez; si el
+    cliente se desconecta el generador se cierra, liberando su conexion.
+
+    Args:
+        generador: Generador que produce los bloques de la respuesta
+    """
+    async with _get_limitador_exportaciones():
+        try:
+            while True:
+                bloque = await anyio.to_thread.run_sync(next, generador, None)
+                if bloque is None:
+                    break
+                yield bloque
+        finally:
+            with anyio.CancelScope(shield=True):
+                await anyio.to_thread.run_sync(generador.close)
+
+
+def respuesta_descarga(archivo: BinaryIO, nombre: str, media_type: str) -> StreamingResponse:
+    """
+    Respuesta de descarga que envia un archivo abierto por bloques
+
+    Args:
+        archivo: Archivo abierto en modo binario (se cierra al terminar el envio)
+        nombre: Nombre sugerido para el archivo descargado
+        media_type: Tipo de contenido
+
+    Returns:
+        StreamingResponse con Content-Disposition y Content-Length
+    """
+    return StreamingResponse(
+        iterar_archivo(archivo),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={nombre}",
+            "Content-Length": str(tamano_archivo(archivo))
+        }
+    )
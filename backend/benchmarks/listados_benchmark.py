@@ -0,0 +1,211 @@
+"""
+Benchmark de los listados grandes (serializacion JSON y compresion)
+Mide latencia (p50/p95) y bytes transferidos de los listados con y sin gzip, y la
+revalidacion con If-None-Match (304), contra un servidor en ejecucion
+
+Con --serializacion no se necesita servidor ni base de datos: compara, sobre filas
+sinteticas con el formato de /api/ventas/, la serializacion por response_model
+(pydantic), por jsonable_encoder + json.dumps y con RespuestaJSON (orjson), y el
+tamaño/tiempo de gzip.
+
+Uso (desde la carpeta backend/, con el servidor corriendo):
+    python -m benchmarks.listados_benchmark --usuario admin --password secreto --salida despues.json
+    python -m benchmarks.listados_benchmark --usuario admin --password secreto --comparar antes.json
+    python -m benchmarks.listados_benchmark --serializacion --filas 5000
+"""
+import argparse
+import gzip
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable, List, Optional
+
+from app.config.settings import settings
+
+# Listados medidos (ruta con filtros)
+ENDPOINTS = [
+    "/api/ventas/?limite=500",
+    "/api/productos/",
+    "/api/clientes/?limite=500",
+    "/api/servicios/?limite=500",
+]
+
+
+def _percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    indice = min(int(round(p / 100 * (len(ordenados) - 1))), len(ordenados) - 1)
+    return ordenados[indice]
+
+
+def _login(base_url: str, usuario: str, password: str) -> str:
+    cuerpo = json.dumps({"username": usuario, "password": password}).encode()
+    solicitud = urllib.request.Request(
+        f"{base_url}/api/auth/login", data=cuerpo, headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(solicitud, timeout=30) as respuesta:
+        return json.loads(respuesta.read())["access_token"]
+
+
+def _get(url: str, encabezados: dict) -> tuple:
+    """GET que retorna (latencia ms, bytes recibidos, encabezados); acepta 304"""
+    solicitud = urllib.request.Request(url, headers=encabezados)
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(solicitud, timeout=60) as respuesta:
+            cuerpo = respuesta.read()
+            cabeceras = respuesta.headers
+    except urllib.error.HTTPError as e:
+        if e.code != 304:
+            raise
+        cuerpo, cabeceras = b"", e.headers
+    return (time.perf_counter() - inicio) * 1000, len(cuerpo), cabeceras
+
+
+def _medir(url: str, encabezados: dict, repeticiones: int) -> dict:
+    muestras = [_get(url, encabezados) for _ in range(repeticiones)]
+    latencias = [m[0] for m in muestras]
+    return {
+        "p50_ms": round(statistics.median(latencias), 2),
+        "p95_ms": round(_percentil(latencias, 95), 2),
+        "bytes": muestras[-1][1],
+    }
+
+
+def ejecutar(base_url: str, token: str, repeticiones: int) -> dict:
+    """Mide cada listado sin compresion, con gzip y revalidado (304)"""
+    autorizacion = {"Authorization": f"Bearer {token}"}
+    resultado = {}
+
+    for ruta in ENDPOINTS:
+        url = f"{base_url}{ruta}"
+        _, _, cabeceras = _get(url, autorizacion)  # Calentamiento
+
+        for nombre, encabezados in (
+            ("identidad", {**autorizacion, "Accept-Encoding": "identity"}),
+            ("gzip", {**autorizacion, "Accept-Encoding": "gzip"}),
+        ):
+            for metrica, valor in _medir(url, encabezados, repeticiones).items():
+                resultado[f"{ruta} {nombre} {metrica}"] = valor
+
+        etag = cabeceras.get("ETag")
+        if etag:
+            medicion = _medir(url, {**autorizacion, "If-None-Match": etag}, repeticiones)
+            resultado[f"{ruta} 304 p50_ms"] = medicion["p50_ms"]
+
+    return resultado
+
+
+def _filas_sinteticas(cantidad: int) -> List[dict]:
+    """Filas con la forma de VentaController.obtener_ventas (con sus productos)"""
+    inicio = datetime(2025, 1, 1, 9, 0, 0)
+    return [
+        {
+            "id_venta": i,
+            "id_usuario": 1,
+            "id_cliente": i % 200,
+            "total": Decimal("459850.00"),
+            "fecha_venta": inicio + timedelta(minutes=i, microseconds=i),
+            "nombre_cliente": f"Cliente de prueba {i % 200}",
+            "nombre_usuario": "admin",
+            "productos": [
+                {
+                    "id_producto": j,
+                    "nombre": f"Producto de prueba {j}",
+                    "cantidad": 1 + j % 3,
+                    "precio_unitario": Decimal("91970.00"),
+                    "subtotal": Decimal("91970.00") * (1 + j % 3),
+                }
+                for j in range(5)
+            ],
+        }
+        for i in range(cantidad)
+    ]
+
+
+def _tiempo(funcion: Callable[[], bytes], repeticiones: int) -> tuple:
+    """(mediana en ms, bytes del resultado)"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return round(statistics.median(tiempos), 2), len(resultado)
+
+
+def serializacion(filas: int, repeticiones: int) -> dict:
+    """Compara las formas de serializar un listado grande, sin servidor"""
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from app.utils.responses import RespuestaJSON
+
+    datos = _filas_sinteticas(filas)
+    adaptador = TypeAdapter(List[dict])
+
+    formas = {
+        "response_model (pydantic)": lambda: adaptador.dump_json(adaptador.validate_python(datos)),
+        "jsonable_encoder + json": lambda: json.dumps(
+            jsonable_encoder(datos), ensure_ascii=False, separators=(",", ":")
+        ).encode(),
+        "RespuestaJSON (orjson)": lambda: RespuestaJSON(datos).body,
+    }
+
+    resultado = {"filas": filas}
+    for nombre, funcion in formas.items():
+        ms, tamano = _tiempo(funcion, repeticiones)
+        resultado[f"{nombre} ms"] = ms
+        resultado[f"{nombre} bytes"] = tamano
+
+    cuerpo = RespuestaJSON(datos).body
+    ms, tamano = _tiempo(lambda: gzip.compress(cuerpo, compresslevel=settings.gzip_level), repeticiones)
+    resultado[f"gzip nivel {settings.gzip_level} ms"] = ms
+    resultado[f"gzip nivel {settings.gzip_level} bytes"] = tamano
+    return resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=f"http://localhost:{settings.port}", help="URL base del servidor")
+    parser.add_argument("--usuario", help="Usuario valido (o --token)")
+    parser.add_argument("--password", help="Contrasena del usuario")
+    parser.add_argument("--token", help="Token de acceso ya obtenido")
+    parser.add_argument("--repeticiones", type=int, default=20, help="Solicitudes por medicion")
+    parser.add_argument("--serializacion", action="store_true", help="Solo comparar la serializacion (sin servidor)")
+    parser.add_argument("--filas", type=int, default=5000, help="Filas sinteticas con --serializacion")
+    parser.add_argument("--salida", help="Guardar las metricas en un archivo JSON")
+    parser.add_argument("--comparar", help="Archivo JSON de una ejecucion anterior")
+    args = parser.parse_args()
+
+    if args.serializacion:
+        resultado = serializacion(args.filas, args.repeticiones)
+    else:
+        token: Optional[str] = args.token
+        if not token:
+            if not (args.usuario and args.password):
+                parser.error("Se necesita --token o --usuario y --password")
+            token = _login(args.url, args.usuario, args.password)
+        resultado = ejecutar(args.url, token, args.repeticiones)
+
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            anterior = json.load(archivo)
+
+    ancho = max(len(clave) for clave in resultado) + 2
+    print(f"{'metrica':<{ancho}}{'actual':>12}" + (f"{'anterior':>12}" if anterior else ""))
+    for clave, valor in resultado.items():
+        linea = f"{clave:<{ancho}}{str(valor):>12}"
+        if anterior:
+            linea += f"{str(anterior.get(clave)):>12}"
+        print(linea)
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(resultado, archivo, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark del endpoint de login
+Mide latencia (p50/p95/p99) y viajes a la base de datos por login contra un
+servidor en ejecucion, para comparar versiones del codigo
+
+Viajes a la base de datos por login:
+- conexiones: conexiones tomadas del pool (database_pool.adquisiciones en /health)
+- transacciones: commits + rollbacks en pg_stat_database durante la prueba
+  (incluye la escritura en lote de auditoria/login_attempts)
+
+Uso (desde la carpeta backend/, con el servidor corriendo):
+    python -m benchmarks.login_benchmark --usuario admin --password secreto --salida despues.json
+    python -m benchmarks.login_benchmark --usuario admin --password secreto --comparar antes.json
+
+Para la medicion "antes", levantar el servidor en la version anterior y ejecutar el
+mismo comando con --salida antes.json (el script solo usa HTTP y la base de datos).
+"""
+import argparse
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import psycopg2
+
+from app.config.settings import settings
+
+
+def _get_json(url: str) -> dict:
+    with urllib.request.urlopen(url, timeout=30) as respuesta:
+        return json.loads(respuesta.read())
+
+
+def _login(url: str, usuario: str, password: str) -> float:
+    """Ejecuta un login y retorna la latencia en milisegundos"""
+    cuerpo = json.dumps({"username": usuario, "password": password}).encode()
+    solicitud = urllib.request.Request(url, data=cuerpo, headers={"Content-Type": "application/json"})
+    inicio = time.perf_counter()
+    with urllib.request.urlopen(solicitud, timeout=30) as respuesta:
+        respuesta.read()
+    return (time.perf_counter() - inicio) * 1000
+
+
+def _transacciones_db() -> Optional[int]:
+    """Commits + rollbacks acumulados de la base de datos (None si no hay acceso)"""
+    if not settings.database_url:
+        return None
+    try:
+        conn = psycopg2.connect(settings.database_url)
+    except psycopg2.Error:
+        return None
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_stat_clear_snapshot()")
+            cursor.execute(
+                "SELECT xact_commit + xact_rollback FROM pg_stat_database WHERE datname = current_database()"
+            )
+            return cursor.fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _adquisiciones_pool(base_url: str) -> Optional[int]:
+    try:
+        return _get_json(f"{base_url}/health").get("database_pool", {}).get("adquisiciones")
+    except (urllib.error.URLError, ValueError):
+        return None
+
+
+def _percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    indice = min(int(round(p / 100 * (len(ordenados) - 1))), len(ordenados) - 1)
+    return ordenados[indice]
+
+
+def ejecutar(base_url: str, usuario: str, password: str, total: int, concurrencia: int) -> dict:
+    """Ejecuta el benchmark y retorna las metricas"""
+    url = f"{base_url}/api/auth/login"
+
+    # Calentamiento (conexiones del pool, hash bcrypt, etc.)
+    for _ in range(min(5, total)):
+        _login(url, usuario, password)
+    time.sleep(2)  # Dejar que se vacien las colas de escritura en lote
+
+    pool_antes = _adquisiciones_pool(base_url)
+    xact_antes = _transacciones_db()
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as executor:
+        latencias = list(executor.map(lambda _: _login(url, usuario, password), range(total)))
+    duracion = time.perf_counter() - inicio
+
+    time.sleep(2)
+    pool_despues = _adquisiciones_pool(base_url)
+    xact_despues = _transacciones_db()
+
+    return {
+        "logins": total,
+        "concurrencia": concurrencia,
+        "duracion_s": round(duracion, 3),
+        "logins_por_s": round(total / duracion, 2),
+        "p50_ms": round(statistics.median(latencias), 2),
+        "p95_ms": round(_percentil(latencias, 95), 2),
+        "p99_ms": round(_percentil(latencias, 99), 2),
+        "max_ms": round(max(latencias), 2),
+        "conexiones_por_login": (
+            round((pool_despues - pool_antes) / total, 2)
+            if pool_antes is not None and pool_despues is not None else None
+        ),
+        "transacciones_por_login": (
+            round((xact_despues - xact_antes) / total, 2)
+            if xact_antes is not None and xact_despues is not None else None
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=f"http://localhost:{settings.port}", help="URL base del servidor")
+    parser.add_argument("--usuario", required=True, help="Usuario valido")
+    parser.add_argument("--password", required=True, help="Contrasena del usuario")
+    parser.add_argument("--logins", type=int, default=200, help="Cantidad de logins")
+    parser.add_argument("--concurrencia", type=int, default=10, help="Logins en paralelo")
+    parser.add_argument("--salida", help="Guardar las metricas en un archivo JSON")
+    parser.add_argument("--comparar", help="Archivo JSON de una ejecucion anterior")
+    args = parser.parse_args()
+
+    resultado = ejecutar(args.url, args.usuario, args.password, args.logins, args.concurrencia)
+
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            anterior = json.load(archivo)
+
+    print(f"{'metrica':<26}{'actual':>12}" + (f"{'anterior':>12}" if anterior else ""))
+    for clave, valor in resultado.items():
+        linea = f"{clave:<26}{str(valor):>12}"
+        if anterior:
+            linea += f"{str(anterior.get(clave)):>12}"
+        print(linea)
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(resultado, archivo, indent=2)
+
+
+if __name__ == "__main__":
+    main()
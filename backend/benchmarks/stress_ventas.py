@@ -0,0 +1,138 @@
+"""
+Prueba de estres de ventas concurrentes
+Verifica que varias cajas vendiendo el mismo producto a la vez no generen sobreventa
+
+Uso (desde la carpeta backend/, con DATABASE_URL apuntando a una base de pruebas):
+    python -m benchmarks.stress_ventas --stock 20 --cajas 16 --ventas 10
+"""
+import argparse
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from app.config.database import get_db_cursor, init_pool, close_pool
+from app.controllers.venta_controller import VentaController
+from app.models.producto import CategoriaProducto
+from app.models.venta import VentaCreate, DetalleVentaCreate
+
+
+def _preparar_datos(stock: int) -> dict:
+    """Crea dos productos de prueba y obtiene un usuario y cliente existentes"""
+    with get_db_cursor() as cursor:
+        cursor.execute("SELECT id_usuario FROM usuarios ORDER BY id_usuario LIMIT 1")
+        usuario = cursor.fetchone()
+        cursor.execute("SELECT id_cliente FROM clientes ORDER BY id_cliente LIMIT 1")
+        cliente = cursor.fetchone()
+        if not usuario or not cliente:
+            raise SystemExit("Se necesita al menos un usuario y un cliente en la base de datos")
+
+        ids = []
+        # Categorias validas para el CHECK de productos.categoria
+        for nombre, categoria in (
+            ("Consola estres", CategoriaProducto.CONSOLA),
+            ("Juego estres", CategoriaProducto.VIDEOJUEGO),
+        ):
+            cursor.execute(
+                """
+                INSERT INTO productos (codigo, nombre, categoria, precio, cantidad)
+                VALUES (%s, %s, %s, 10, %s)
+                RETURNING id_producto
+                """,
+                (f"STRESS-{uuid.uuid4().hex[:8]}", nombre, categoria.value, stock)
+            )
+            ids.append(cursor.fetchone()["id_producto"])
+
+    return {"id_usuario": usuario["id_usuario"], "id_cliente": cliente["id_cliente"], "productos": ids}
+
+
+def _vender(datos: dict, numero: int) -> str:
+    """Registra una venta; las ventas impares llevan los productos en orden inverso"""
+    ids = datos["productos"] if numero % 2 == 0 else list(reversed(datos["productos"]))
+    venta = VentaCreate(
+        id_usuario=datos["id_usuario"],
+        id_cliente=datos["id_cliente"],
+        productos=[DetalleVentaCreate(id_producto=i, cantidad=1, precio_unitario=10) for i in ids]
+    )
+    try:
+        VentaController.crear_venta(venta)
+        return "ok"
+    except HTTPException as e:
+        return str(e.status_code)
+
+
+def _limpiar(datos: dict) -> None:
+    """Elimina las ventas y productos de prueba y recalcula los totales diarios de esos dias"""
+    with get_db_cursor() as cursor:
+        cursor.execute(
+            """
+            DELETE FROM ventas WHERE id_venta IN (
+                SELECT id_venta FROM detalle_ventas WHERE id_producto = ANY(%s)
+            )
+            RETURNING fecha_venta::date AS dia
+            """,
+            (datos["productos"],)
+        )
+        dias = [fila["dia"] for fila in cursor.fetchall()]
+        # crear_venta sumo cada venta a ventas_resumen_*; sin recalcular, los totales
+        # del dashboard y de los reportes quedarian inflados
+        if dias:
+            cursor.execute("SELECT ventas_resumen_reconstruir(%s, %s)", (min(dias), max(dias)))
+        cursor.execute("DELETE FROM productos WHERE id_producto = ANY(%s)", (datos["productos"],))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stock", type=int, default=20, help="Stock inicial de cada producto")
+    parser.add_argument("--cajas", type=int, default=16, help="Hilos vendiendo en paralelo")
+    parser.add_argument("--ventas", type=int, default=10, help="Ventas por caja")
+    parser.add_argument("--conservar", action="store_true", help="No borrar los datos de prueba")
+    args = parser.parse_args()
+
+    init_pool()
+    datos = _preparar_datos(args.stock)
+    try:
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.cajas) as executor:
+            resultados = Counter(executor.map(
+                lambda n: _vender(datos, n), range(args.cajas * args.ventas)
+            ))
+        duracion = time.perf_counter() - inicio
+
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT p.id_producto, p.cantidad,
+                       COALESCE((SELECT SUM(dv.cantidad) FROM detalle_ventas dv
+                                 WHERE dv.id_producto = p.id_producto), 0) AS vendido
+                FROM productos p
+                WHERE p.id_producto = ANY(%s)
+                """,
+                (datos["productos"],)
+            )
+            productos = cursor.fetchall()
+
+        print(f"Ventas intentadas: {args.cajas * args.ventas} en {duracion:.2f}s")
+        print(f"Resultados: {dict(resultados)}")
+
+        correcto = True
+        for p in productos:
+            print(f"Producto {p['id_producto']}: stock final {p['cantidad']}, vendido {p['vendido']}")
+            if p["cantidad"] < 0 or p["cantidad"] + p["vendido"] != args.stock:
+                correcto = False
+        if resultados["ok"] != min(args.stock, args.cajas * args.ventas):
+            correcto = False
+
+        print("OK: sin sobreventa" if correcto else "ERROR: inventario inconsistente")
+        if not correcto:
+            raise SystemExit(1)
+    finally:
+        if not args.conservar:
+            _limpiar(datos)
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,29 @@ PlayZone Inventory System - Backend API
 Sistema de gestion de inventario y servicios de reparacion de consolas
 Desarrollado para la tienda Play Zone
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from contextlib import asynccontextmanager
 from pathlib import Path
 from app.config.settings import settings
-from app.config.database import test_connection
+from app.config.database import test_connection, init_pool, close_pool, get_pool_stats, PoolTimeoutError, run_in_db_thread
+from app.config import migrations
+from app.middleware.auth import usuarios_cache
+from app.controllers.producto_controller import productos_cache, catalogo_cache
+from app.utils.security import password_hasher, PasswordHasherBusyError
+from app.utils.audit import audit_writer
+from app.utils.rate_limiter import RateLimiter
+from app.utils.report_jobs import report_jobs
+from app.utils.conditional import versiones_tablas
+from app.utils.eventos import bus_eventos
+from app.utils.notificaciones import canal_cambios
 
 # Importar rutas
-from app.routes import auth, productos, ventas, clientes, servicios
+from app.routes import auth, productos, ventas, clientes, servicios, dashboard, busqueda, reportes, exportar, eventos
 
 
 @asynccontextmanager
@@ -23,11 +35,30 @@ async def lifespan(app: FastAPI):
     print(f"Iniciando {settings.app_name} v{settings.app_version}")
     print(f"Modo Debug: {settings.debug}")
     print(f"Puerto: {settings.port}")
+    print("Inicializando pool de conexiones...")
+    init_pool()
     print("Probando conexion a la base de datos...")
     test_connection()
+    if settings.db_migrate_on_startup:
+        print("Aplicando migraciones pendientes...")
+        aplicadas = await run_in_db_thread(migrations.aplicar)
+        print(f"Migraciones aplicadas: {', '.join(aplicadas) or 'ninguna'}")
+    audit_writer.start()
+    RateLimiter.intentos_writer.start()
+    bus_eventos.iniciar()
+    if canal_cambios.habilitado:
+        print("Escuchando cambios de otros procesos (LISTEN/NOTIFY)...")
+        await canal_cambios.iniciar()
     yield
     # Shutdown
     print("Apagando servidor...")
+    await canal_cambios.cerrar()
+    await bus_eventos.cerrar()
+    await report_jobs.cerrar()
+    password_hasher.shutdown()
+    audit_writer.stop()
+    RateLimiter.intentos_writer.stop()
+    close_pool()
 
 
 # Crear instancia de FastAPI
@@ -46,8 +77,36 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag"],
 )
 
+# Comprimir respuestas grandes (listados JSON, exportaciones CSV) si el cliente acepta gzip.
+# Los PDF ya vienen comprimidos internamente.
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.gzip_minimum_size,
+    compresslevel=settings.gzip_level,
+    exclude_content_types=DEFAULT_EXCLUDED_CONTENT_TYPES + ("application/pdf",),
+)
+
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    """Responde 503 cuando el pool de conexiones esta saturado"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Servidor ocupado, intente nuevamente en unos segundos"}
+    )
+
+
+@app.exception_handler(PasswordHasherBusyError)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusyError):
+    """Responde 503 cuando la cola de hashing de contrasenas esta llena"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Servidor ocupado, intente nuevamente en unos segundos"}
+    )
+
 
 @app.get("/", tags=["Health"])
 async def root():
@@ -65,7 +124,20 @@ async def health_check():
     return {
         "status": "healthy",
         "app": settings.app_name,
-        "version": settings.app_version
+        "version": settings.app_version,
+        "database_pool": get_pool_stats(),
+        "user_cache": usuarios_cache.stats(),
+        "product_cache": {
+            "productos": productos_cache.stats(),
+            "catalogo": catalogo_cache.stats()
+        },
+        "password_hasher": password_hasher.stats(),
+        "audit_writer": audit_writer.stats(),
+        "rate_limiter": RateLimiter.stats(),
+        "report_jobs": report_jobs.stats(),
+        "versiones_tablas": versiones_tablas.stats(),
+        "eventos": bus_eventos.stats(),
+        "canal_cambios": canal_cambios.stats()
     }
 
 
@@ -80,7 +152,12 @@ async def api_info():
             "productos": "/api/productos",
             "ventas": "/api/ventas",
             "clientes": "/api/clientes",
-            "servicios": "/api/servicios"
+            "servicios": "/api/servicios",
+            "dashboard": "/api/dashboard",
+            "buscar": "/api/buscar",
+            "reportes": "/api/reportes",
+            "exportar": "/api/exportar",
+            "eventos": "/api/eventos"
         }
     }
 
@@ -91,6 +168,11 @@ app.include_router(productos.router, prefix="/api/productos", tags=["Productos"]
 app.include_router(ventas.router, prefix="/api/ventas", tags=["Ventas"])
 app.include_router(clientes.router, prefix="/api/clientes", tags=["Clientes"])
 app.include_router(servicios.router, prefix="/api/servicios", tags=["Servicios"])
+app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
+app.include_router(busqueda.router, prefix="/api/buscar", tags=["Busqueda"])
+app.include_router(reportes.router, prefix="/api/reportes", tags=["Reportes"])
+app.include_router(exportar.router, prefix="/api/exportar", tags=["Exportacion"])
+app.include_router(eventos.router, prefix="/api/eventos", tags=["Eventos"])
 
 
 # Servir archivos estáticos del frontend
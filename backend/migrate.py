@@ -0,0 +1,100 @@
+"""
+Herramienta de migraciones del esquema
+
+Uso (desde la carpeta backend/):
+    python migrate.py estado
+    python migrate.py aplicar [--hasta VERSION]
+    python migrate.py revertir [--pasos N]
+    python migrate.py baseline VERSION
+    python migrate.py verificar-indices
+
+baseline registra como aplicadas las migraciones hasta VERSION sin ejecutarlas,
+para bases de datos donde los scripts ya se ejecutaron a mano en el SQL Editor.
+"""
+import argparse
+import sys
+
+from app.config import migrations
+
+
+def _estado(args) -> int:
+    for fila in migrations.estado():
+        marca = "x" if fila["aplicada"] else " "
+        notas = []
+        if fila["modificada"]:
+            notas.append("MODIFICADA despues de aplicarse")
+        if not fila["reversible"]:
+            notas.append("sin script de bajada")
+        fecha = f" ({fila['aplicada_en']:%Y-%m-%d %H:%M})" if fila["aplicada_en"] else ""
+        print(f"[{marca}] {fila['version']}{fecha}" + (f"  - {', '.join(notas)}" if notas else ""))
+    return 0
+
+
+def _aplicar(args) -> int:
+    aplicadas = migrations.aplicar(hasta=args.hasta)
+    for version in aplicadas:
+        print(f"Aplicada: {version}")
+    if not aplicadas:
+        print("No hay migraciones pendientes")
+    return 0
+
+
+def _revertir(args) -> int:
+    revertidas = migrations.revertir(pasos=args.pasos)
+    for version in revertidas:
+        print(f"Revertida: {version}")
+    if not revertidas:
+        print("No hay migraciones aplicadas")
+    return 0
+
+
+def _baseline(args) -> int:
+    for version in migrations.marcar_aplicadas(args.version):
+        print(f"Registrada sin ejecutar: {version}")
+    return 0
+
+
+def _verificar_indices(args) -> int:
+    fallidas = 0
+    for resultado in migrations.verificar_indices():
+        if resultado["usado"]:
+            print(f"OK    {resultado['consulta']}: {resultado['indice']}")
+        else:
+            fallidas += 1
+            usados = ", ".join(resultado["indices_plan"]) or "ninguno"
+            print(f"FALTA {resultado['consulta']}: se esperaba {resultado['indice']} (plan usa: {usados})")
+    return 1 if fallidas else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    comandos.add_parser("estado", help="Listar migraciones y si estan aplicadas").set_defaults(func=_estado)
+
+    aplicar = comandos.add_parser("aplicar", help="Aplicar migraciones pendientes")
+    aplicar.add_argument("--hasta", help="Ultima version a aplicar")
+    aplicar.set_defaults(func=_aplicar)
+
+    revertir = comandos.add_parser("revertir", help="Revertir las ultimas migraciones")
+    revertir.add_argument("--pasos", type=int, default=1, help="Cantidad de migraciones a revertir")
+    revertir.set_defaults(func=_revertir)
+
+    baseline = comandos.add_parser("baseline", help="Registrar migraciones ya ejecutadas a mano")
+    baseline.add_argument("version", help="Ultima version presente en la base de datos")
+    baseline.set_defaults(func=_baseline)
+
+    comandos.add_parser(
+        "verificar-indices", help="Comprobar con EXPLAIN que las consultas frecuentes usan sus indices"
+    ).set_defaults(func=_verificar_indices)
+
+    args = parser.parse_args()
+    try:
+        return args.func(args)
+    except migrations.MigrationError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2 @@
+-- Revert: Stock never negative
+ALTER TABLE productos DROP CONSTRAINT IF EXISTS chk_productos_cantidad_no_negativa;
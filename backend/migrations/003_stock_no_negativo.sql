@@ -0,0 +1,13 @@
+-- Migration: Stock never negative
+-- Description: Guarda a nivel de base de datos para que ventas concurrentes no dejen stock negativo
+-- Date: 2026-10-17
+
+-- Corregir registros que ya hubieran quedado con stock negativo
+UPDATE productos SET cantidad = 0 WHERE cantidad < 0;
+
+-- Agregar restriccion de stock no negativo
+ALTER TABLE productos DROP CONSTRAINT IF EXISTS chk_productos_cantidad_no_negativa;
+ALTER TABLE productos
+ADD CONSTRAINT chk_productos_cantidad_no_negativa CHECK (cantidad >= 0);
+
+COMMENT ON CONSTRAINT chk_productos_cantidad_no_negativa ON productos IS 'Impide sobreventa: el stock nunca puede quedar negativo';
@@ -0,0 +1,4 @@
+-- Revert: Product search with trigrams
+-- Las extensiones se conservan (pueden usarlas otros objetos)
+DROP INDEX IF EXISTS idx_productos_nombre_trgm;
+DROP FUNCTION IF EXISTS f_unaccent(TEXT);
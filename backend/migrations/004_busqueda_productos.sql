@@ -0,0 +1,21 @@
+-- Migration: Product search with trigrams
+-- Description: Busqueda de productos sin distinguir acentos ni mayusculas, tolerante a errores
+--              de escritura y con indice GIN de trigramas (evita el escaneo secuencial de LIKE '%x%')
+-- Date: 2026-10-17
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- unaccent() es STABLE y no puede usarse en indices; este envoltorio fija el diccionario
+-- y se declara IMMUTABLE para poder indexar la expresion
+CREATE OR REPLACE FUNCTION f_unaccent(texto TEXT)
+RETURNS TEXT AS $$
+    SELECT public.unaccent('public.unaccent'::regdictionary, $1)
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+
+-- Nombre normalizado (sin acentos, en minusculas) indexado por trigramas.
+-- La expresion debe coincidir exactamente con la usada en ProductoController.
+CREATE INDEX IF NOT EXISTS idx_productos_nombre_trgm
+ON productos USING GIN (lower(f_unaccent(nombre)) gin_trgm_ops);
+
+COMMENT ON FUNCTION f_unaccent(TEXT) IS 'unaccent inmutable para indices de busqueda';
@@ -0,0 +1,11 @@
+-- Revert: Unified search index
+DROP TRIGGER IF EXISTS trigger_busqueda_clientes ON clientes;
+DROP TRIGGER IF EXISTS trigger_busqueda_servicios ON servicios;
+DROP TRIGGER IF EXISTS trigger_busqueda_productos ON productos;
+DROP FUNCTION IF EXISTS busqueda_trigger_clientes();
+DROP FUNCTION IF EXISTS busqueda_trigger_servicios();
+DROP FUNCTION IF EXISTS busqueda_trigger_productos();
+DROP FUNCTION IF EXISTS busqueda_reindexar_clientes(INTEGER);
+DROP FUNCTION IF EXISTS busqueda_reindexar_servicios(INTEGER, INTEGER);
+DROP FUNCTION IF EXISTS busqueda_reindexar_productos(INTEGER);
+DROP TABLE IF EXISTS busqueda_indice;
@@ -0,0 +1,152 @@
+-- Migration: Unified search index
+-- Description: Tabla de busqueda (clientes, servicios y productos) con tsvector y trigramas,
+--              mantenida por triggers. Requiere 004_busqueda_productos.sql (pg_trgm, unaccent, f_unaccent)
+-- Date: 2026-10-17
+
+CREATE TABLE IF NOT EXISTS busqueda_indice (
+    tipo VARCHAR(20) NOT NULL,          -- 'cliente', 'servicio' o 'producto'
+    id_entidad INTEGER NOT NULL,
+    titulo TEXT NOT NULL,               -- Texto principal mostrado en resultados
+    subtitulo TEXT,
+    detalle TEXT,
+    fecha TIMESTAMP,
+    contenido TSVECTOR NOT NULL,        -- Documento de busqueda con pesos (A > B > C)
+    texto TEXT NOT NULL,                -- Campos principales normalizados (coincidencias parciales)
+    PRIMARY KEY (tipo, id_entidad)
+);
+
+CREATE INDEX IF NOT EXISTS idx_busqueda_contenido ON busqueda_indice USING GIN (contenido);
+CREATE INDEX IF NOT EXISTS idx_busqueda_texto_trgm ON busqueda_indice USING GIN (texto gin_trgm_ops);
+
+COMMENT ON TABLE busqueda_indice IS 'Indice de busqueda unificado, mantenido por triggers';
+
+-- ============================================
+-- Funciones de reindexado (NULL = todas las filas)
+-- ============================================
+CREATE OR REPLACE FUNCTION busqueda_reindexar_clientes(p_id_cliente INTEGER DEFAULT NULL)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO busqueda_indice (tipo, id_entidad, titulo, subtitulo, detalle, fecha, contenido, texto)
+    SELECT 'cliente', c.id_cliente, c.nombre, c.telefono, c.documento, c.fecha_registro,
+           setweight(to_tsvector('spanish', f_unaccent(coalesce(c.nombre, ''))), 'A') ||
+           setweight(to_tsvector('simple', f_unaccent(concat_ws(' ', c.documento, c.telefono, c.email))), 'B'),
+           lower(f_unaccent(concat_ws(' ', c.nombre, c.documento, c.telefono, c.email)))
+    FROM clientes c
+    WHERE p_id_cliente IS NULL OR c.id_cliente = p_id_cliente
+    ON CONFLICT (tipo, id_entidad) DO UPDATE SET
+        titulo = EXCLUDED.titulo, subtitulo = EXCLUDED.subtitulo, detalle = EXCLUDED.detalle,
+        fecha = EXCLUDED.fecha, contenido = EXCLUDED.contenido, texto = EXCLUDED.texto;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION busqueda_reindexar_servicios(
+    p_id_servicio INTEGER DEFAULT NULL,
+    p_id_cliente INTEGER DEFAULT NULL
+)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO busqueda_indice (tipo, id_entidad, titulo, subtitulo, detalle, fecha, contenido, texto)
+    SELECT 'servicio', s.id_servicio, s.consola, c.nombre, s.estado, s.fecha_ingreso,
+           setweight(to_tsvector('spanish', f_unaccent(concat_ws(' ', s.consola, c.nombre))), 'A') ||
+           setweight(to_tsvector('simple', f_unaccent(concat_ws(' ', c.documento, s.estado))), 'B') ||
+           setweight(to_tsvector('spanish', f_unaccent(coalesce(s.descripcion, ''))), 'C'),
+           lower(f_unaccent(concat_ws(' ', s.consola, c.nombre, c.documento)))
+    FROM servicios s
+    JOIN clientes c ON s.id_cliente = c.id_cliente
+    WHERE (p_id_servicio IS NULL OR s.id_servicio = p_id_servicio)
+    AND (p_id_cliente IS NULL OR s.id_cliente = p_id_cliente)
+    ON CONFLICT (tipo, id_entidad) DO UPDATE SET
+        titulo = EXCLUDED.titulo, subtitulo = EXCLUDED.subtitulo, detalle = EXCLUDED.detalle,
+        fecha = EXCLUDED.fecha, contenido = EXCLUDED.contenido, texto = EXCLUDED.texto;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION busqueda_reindexar_productos(p_id_producto INTEGER DEFAULT NULL)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO busqueda_indice (tipo, id_entidad, titulo, subtitulo, detalle, fecha, contenido, texto)
+    SELECT 'producto', p.id_producto, p.nombre, p.categoria, p.codigo, p.fecha_registro,
+           setweight(to_tsvector('spanish', f_unaccent(coalesce(p.nombre, ''))), 'A') ||
+           setweight(to_tsvector('simple', f_unaccent(concat_ws(' ', p.codigo, p.categoria))), 'B') ||
+           setweight(to_tsvector('spanish', f_unaccent(coalesce(p.descripcion, ''))), 'C'),
+           lower(f_unaccent(concat_ws(' ', p.nombre, p.codigo, p.categoria)))
+    FROM productos p
+    WHERE p_id_producto IS NULL OR p.id_producto = p_id_producto
+    ON CONFLICT (tipo, id_entidad) DO UPDATE SET
+        titulo = EXCLUDED.titulo, subtitulo = EXCLUDED.subtitulo, detalle = EXCLUDED.detalle,
+        fecha = EXCLUDED.fecha, contenido = EXCLUDED.contenido, texto = EXCLUDED.texto;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- Triggers (solo columnas que aparecen en el indice; p.ej. los cambios de stock no reindexan)
+-- ============================================
+CREATE OR REPLACE FUNCTION busqueda_trigger_clientes()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM busqueda_indice WHERE tipo = 'cliente' AND id_entidad = OLD.id_cliente;
+        RETURN OLD;
+    END IF;
+
+    PERFORM busqueda_reindexar_clientes(NEW.id_cliente);
+
+    -- Los servicios del cliente incluyen su nombre y documento
+    IF TG_OP = 'UPDATE' THEN
+        PERFORM busqueda_reindexar_servicios(NULL, NEW.id_cliente);
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_busqueda_clientes ON clientes;
+CREATE TRIGGER trigger_busqueda_clientes
+AFTER INSERT OR DELETE OR UPDATE OF nombre, documento, telefono, email ON clientes
+FOR EACH ROW
+EXECUTE FUNCTION busqueda_trigger_clientes();
+
+CREATE OR REPLACE FUNCTION busqueda_trigger_servicios()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM busqueda_indice WHERE tipo = 'servicio' AND id_entidad = OLD.id_servicio;
+        RETURN OLD;
+    END IF;
+
+    PERFORM busqueda_reindexar_servicios(NEW.id_servicio);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_busqueda_servicios ON servicios;
+CREATE TRIGGER trigger_busqueda_servicios
+AFTER INSERT OR DELETE OR UPDATE OF consola, descripcion, estado, id_cliente ON servicios
+FOR EACH ROW
+EXECUTE FUNCTION busqueda_trigger_servicios();
+
+CREATE OR REPLACE FUNCTION busqueda_trigger_productos()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM busqueda_indice WHERE tipo = 'producto' AND id_entidad = OLD.id_producto;
+        RETURN OLD;
+    END IF;
+
+    PERFORM busqueda_reindexar_productos(NEW.id_producto);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_busqueda_productos ON productos;
+CREATE TRIGGER trigger_busqueda_productos
+AFTER INSERT OR DELETE OR UPDATE OF nombre, codigo, categoria, descripcion ON productos
+FOR EACH ROW
+EXECUTE FUNCTION busqueda_trigger_productos();
+
+-- ============================================
+-- Carga inicial
+-- ============================================
+SELECT busqueda_reindexar_clientes();
+SELECT busqueda_reindexar_servicios();
+SELECT busqueda_reindexar_productos();
@@ -0,0 +1,7 @@
+-- Revert: Indexes for hot query predicates
+-- Solo los indices propios de 006; los del esquema base se conservan
+DROP INDEX IF EXISTS idx_productos_fecha_registro;
+DROP INDEX IF EXISTS idx_clientes_fecha_registro;
+DROP INDEX IF EXISTS idx_servicios_fecha_ingreso_id;
+DROP INDEX IF EXISTS idx_ventas_fecha_id;
+DROP INDEX IF EXISTS idx_login_attempts_ip_fecha;
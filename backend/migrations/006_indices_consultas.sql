@@ -0,0 +1,30 @@
+-- Migration: Indexes for hot query predicates
+-- Description: Indices para los filtros y ordenamientos usados por app/controllers y app/utils.
+--              Ya existian (000_init_database.sql): idx_productos_categoria, idx_refresh_tokens_token_hash,
+--              idx_auditoria_fecha, idx_login_attempts_username/ip/fecha
+--              Los indices compuestos usan nombres propios: database_schema.sql y
+--              database_production.sql ya definen idx_ventas_fecha e idx_servicios_fecha_ingreso
+--              sobre una sola columna, y con el mismo nombre IF NOT EXISTS no los crearia.
+-- Date: 2026-10-17
+
+-- Listados con paginacion por cursor (ORDER BY fecha DESC, id DESC)
+CREATE INDEX IF NOT EXISTS idx_productos_fecha_registro ON productos(fecha_registro DESC, id_producto DESC);
+CREATE INDEX IF NOT EXISTS idx_clientes_fecha_registro ON clientes(fecha_registro DESC, id_cliente DESC);
+CREATE INDEX IF NOT EXISTS idx_servicios_fecha_ingreso_id ON servicios(fecha_ingreso DESC, id_servicio DESC);
+
+-- Ventas: rangos de fecha (listado, reportes, dashboard)
+CREATE INDEX IF NOT EXISTS idx_ventas_fecha_id ON ventas(fecha_venta DESC, id_venta DESC);
+
+-- Intentos de login por IP dentro de una ventana de tiempo
+CREATE INDEX IF NOT EXISTS idx_login_attempts_ip_fecha ON login_attempts(ip_address, fecha_intento);
+
+-- Indices del esquema base (database_schema.sql / database_production.sql), con la
+-- misma definicion: solo se crean en bases inicializadas con 000_init_database.sql,
+-- que no los tiene. Son parte del esquema base, por eso la bajada no los elimina.
+-- Ventas por cliente, lineas por venta (carga en lote), ventas por producto (mas vendido),
+-- servicios por estado (pendientes) y por cliente
+CREATE INDEX IF NOT EXISTS idx_ventas_cliente ON ventas(id_cliente);
+CREATE INDEX IF NOT EXISTS idx_detalle_ventas_venta ON detalle_ventas(id_venta);
+CREATE INDEX IF NOT EXISTS idx_detalle_ventas_producto ON detalle_ventas(id_producto);
+CREATE INDEX IF NOT EXISTS idx_servicios_estado ON servicios(estado);
+CREATE INDEX IF NOT EXISTS idx_servicios_cliente ON servicios(id_cliente);
@@ -0,0 +1,4 @@
+-- Revert: Daily sales rollup
+DROP FUNCTION IF EXISTS ventas_resumen_reconstruir(DATE, DATE);
+DROP TABLE IF EXISTS ventas_resumen_categoria;
+DROP TABLE IF EXISTS ventas_resumen_diario;
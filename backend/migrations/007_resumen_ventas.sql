@@ -0,0 +1,80 @@
+-- Migration: Daily sales rollup
+-- Description: Totales de ventas por dia y usuario, y por dia, categoria y usuario.
+--              Los actualiza VentaController.crear_venta en la misma transaccion de la venta;
+--              ventas_resumen_reconstruir() los recalcula desde ventas/detalle_ventas
+--              Cualquier DELETE o UPDATE manual de ventas/detalle_ventas (SQL Editor, scripts)
+--              deja los totales desactualizados: despues, ejecutar
+--              SELECT ventas_resumen_reconstruir('AAAA-MM-DD', 'AAAA-MM-DD') para los dias afectados
+--              (o python reconstruir_resumen.py --desde ... --hasta ...)
+-- Date: 2026-10-17
+
+-- Una fila por dia y usuario (total_ventas se puede sumar entre usuarios y dias)
+CREATE TABLE IF NOT EXISTS ventas_resumen_diario (
+    dia DATE NOT NULL,
+    id_usuario INTEGER NOT NULL,
+    total_ventas INTEGER NOT NULL DEFAULT 0,
+    monto_total DECIMAL(12, 2) NOT NULL DEFAULT 0,      -- Suma de ventas.total
+    productos_vendidos INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, id_usuario)
+);
+
+-- Una fila por dia, categoria y usuario (una venta puede aparecer en varias categorias,
+-- por eso el conteo de ventas se toma de ventas_resumen_diario)
+CREATE TABLE IF NOT EXISTS ventas_resumen_categoria (
+    dia DATE NOT NULL,
+    categoria VARCHAR(100) NOT NULL,
+    id_usuario INTEGER NOT NULL,
+    lineas INTEGER NOT NULL DEFAULT 0,
+    productos_vendidos INTEGER NOT NULL DEFAULT 0,
+    monto DECIMAL(12, 2) NOT NULL DEFAULT 0,            -- Suma de cantidad * precio_unitario
+    PRIMARY KEY (dia, categoria, id_usuario)
+);
+
+COMMENT ON TABLE ventas_resumen_diario IS 'Rollup de ventas por dia y usuario, mantenido por crear_venta';
+COMMENT ON TABLE ventas_resumen_categoria IS 'Rollup de ventas por dia, categoria y usuario, mantenido por crear_venta';
+
+-- ============================================
+-- Reconstruccion (NULL = sin limite)
+-- ============================================
+CREATE OR REPLACE FUNCTION ventas_resumen_reconstruir(
+    p_desde DATE DEFAULT NULL,
+    p_hasta DATE DEFAULT NULL
+)
+RETURNS VOID AS $$
+BEGIN
+    -- Espera a las ventas en curso y bloquea nuevas hasta el fin de la transaccion,
+    -- para que ninguna quede fuera del recalculo ni se cuente dos veces
+    LOCK TABLE ventas IN SHARE MODE;
+
+    DELETE FROM ventas_resumen_diario
+    WHERE (p_desde IS NULL OR dia >= p_desde) AND (p_hasta IS NULL OR dia <= p_hasta);
+
+    DELETE FROM ventas_resumen_categoria
+    WHERE (p_desde IS NULL OR dia >= p_desde) AND (p_hasta IS NULL OR dia <= p_hasta);
+
+    INSERT INTO ventas_resumen_diario (dia, id_usuario, total_ventas, monto_total, productos_vendidos)
+    SELECT v.fecha_venta::date, v.id_usuario, COUNT(*), SUM(v.total), COALESCE(SUM(l.cantidad), 0)
+    FROM ventas v
+    LEFT JOIN (
+        SELECT id_venta, SUM(cantidad) AS cantidad FROM detalle_ventas GROUP BY id_venta
+    ) l ON l.id_venta = v.id_venta
+    WHERE (p_desde IS NULL OR v.fecha_venta >= p_desde)
+    AND (p_hasta IS NULL OR v.fecha_venta < p_hasta + 1)
+    GROUP BY v.fecha_venta::date, v.id_usuario;
+
+    INSERT INTO ventas_resumen_categoria (dia, categoria, id_usuario, lineas, productos_vendidos, monto)
+    SELECT v.fecha_venta::date, p.categoria, v.id_usuario,
+           COUNT(*), SUM(dv.cantidad), SUM(dv.cantidad * dv.precio_unitario)
+    FROM ventas v
+    JOIN detalle_ventas dv ON dv.id_venta = v.id_venta
+    JOIN productos p ON p.id_producto = dv.id_producto
+    WHERE (p_desde IS NULL OR v.fecha_venta >= p_desde)
+    AND (p_hasta IS NULL OR v.fecha_venta < p_hasta + 1)
+    GROUP BY v.fecha_venta::date, p.categoria, v.id_usuario;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- Carga inicial
+-- ============================================
+SELECT ventas_resumen_reconstruir();
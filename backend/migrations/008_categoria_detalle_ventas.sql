@@ -0,0 +1,57 @@
+-- Migration: Category at time of sale
+-- Description: Guarda en detalle_ventas la categoria del producto al momento de la venta.
+--              VentaController.crear_venta la escribe y ventas_resumen_reconstruir() la lee,
+--              asi el acumulado incremental y la reconstruccion coinciden aunque despues
+--              se cambie la categoria del producto.
+--              Las lineas anteriores a esta migracion toman la categoria actual del
+--              producto (la de entonces no se registraba).
+-- Date: 2026-10-17
+
+ALTER TABLE detalle_ventas ADD COLUMN IF NOT EXISTS categoria VARCHAR(50);
+
+UPDATE detalle_ventas dv
+SET categoria = p.categoria
+FROM productos p
+WHERE p.id_producto = dv.id_producto
+AND dv.categoria IS NULL;
+
+COMMENT ON COLUMN detalle_ventas.categoria IS 'Categoria del producto al momento de la venta';
+
+CREATE OR REPLACE FUNCTION ventas_resumen_reconstruir(
+    p_desde DATE DEFAULT NULL,
+    p_hasta DATE DEFAULT NULL
+)
+RETURNS VOID AS $$
+BEGIN
+    -- Espera a las ventas en curso y bloquea nuevas hasta el fin de la transaccion,
+    -- para que ninguna quede fuera del recalculo ni se cuente dos veces
+    LOCK TABLE ventas IN SHARE MODE;
+
+    DELETE FROM ventas_resumen_diario
+    WHERE (p_desde IS NULL OR dia >= p_desde) AND (p_hasta IS NULL OR dia <= p_hasta);
+
+    DELETE FROM ventas_resumen_categoria
+    WHERE (p_desde IS NULL OR dia >= p_desde) AND (p_hasta IS NULL OR dia <= p_hasta);
+
+    INSERT INTO ventas_resumen_diario (dia, id_usuario, total_ventas, monto_total, productos_vendidos)
+    SELECT v.fecha_venta::date, v.id_usuario, COUNT(*), SUM(v.total), COALESCE(SUM(l.cantidad), 0)
+    FROM ventas v
+    LEFT JOIN (
+        SELECT id_venta, SUM(cantidad) AS cantidad FROM detalle_ventas GROUP BY id_venta
+    ) l ON l.id_venta = v.id_venta
+    WHERE (p_desde IS NULL OR v.fecha_venta >= p_desde)
+    AND (p_hasta IS NULL OR v.fecha_venta < p_hasta + 1)
+    GROUP BY v.fecha_venta::date, v.id_usuario;
+
+    -- Categoria registrada en la venta; la del producto solo si falta
+    INSERT INTO ventas_resumen_categoria (dia, categoria, id_usuario, lineas, productos_vendidos, monto)
+    SELECT v.fecha_venta::date, COALESCE(dv.categoria, p.categoria), v.id_usuario,
+           COUNT(*), SUM(dv.cantidad), SUM(dv.cantidad * dv.precio_unitario)
+    FROM ventas v
+    JOIN detalle_ventas dv ON dv.id_venta = v.id_venta
+    JOIN productos p ON p.id_producto = dv.id_producto
+    WHERE (p_desde IS NULL OR v.fecha_venta >= p_desde)
+    AND (p_hasta IS NULL OR v.fecha_venta < p_hasta + 1)
+    GROUP BY v.fecha_venta::date, COALESCE(dv.categoria, p.categoria), v.id_usuario;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,31 @@
+"""
+Recalcula los totales diarios de ventas (ventas_resumen_diario y ventas_resumen_categoria)
+desde ventas y detalle_ventas
+
+Uso (desde la carpeta backend/):
+    python reconstruir_resumen.py                                  # Todo el historial
+    python reconstruir_resumen.py --desde 2026-01-01 --hasta 2026-01-31
+
+Mientras se recalcula, las ventas nuevas esperan (LOCK TABLE ventas IN SHARE MODE);
+en historiales grandes conviene hacerlo por rangos.
+"""
+import argparse
+import time
+from datetime import date
+
+from app.controllers.venta_controller import VentaController
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--desde", type=date.fromisoformat, help="Primer dia (AAAA-MM-DD)")
+    parser.add_argument("--hasta", type=date.fromisoformat, help="Ultimo dia, incluido (AAAA-MM-DD)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    VentaController.reconstruir_resumen(args.desde, args.hasta)
+    print(f"Resumen de ventas reconstruido en {time.perf_counter() - inicio:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,76 +19,45 @@ async function cargarEstadisticasDashboard() {
             'Content-Type': 'application/json'
         };
 
-        // Cargar productos (siempre disponible)
-        const productosResponse = await fetch(`${API_URL}/productos/`, { headers });
-        const productos = productosResponse.ok ? await productosResponse.json() : [];
-
-        // Cargar ventas (puede fallar si no hay permisos)
-        let ventas = [];
-        try {
-            const ventasResponse = await fetch(`${API_URL}/ventas/`, { headers });
-            if (ventasResponse.ok) {
-                ventas = await ventasResponse.json();
-            } else {
-                console.log('Error al cargar ventas. Status:', ventasResponse.status);
-                const errorData = await ventasResponse.text();
-                console.log('Detalle:', errorData);
-
-                // Si el token expiró, redirigir al login
-                if (ventasResponse.status === 401) {
-                    console.log('Token expirado, redirigiendo al login...');
-                    localStorage.removeItem('token');
-                    localStorage.removeItem('usuario');
-                    localStorage.removeItem('isLoggedIn');
-                    showWarning('Tu sesión ha expirado. Por favor inicia sesión nuevamente.', 'Sesión expirada');
-                    setTimeout(() => {
-                        window.location.href = '/login';
-                    }, 2000);
-                    return;
-                }
-            }
-        } catch (e) {
-            console.log('No se pudieron cargar ventas:', e);
-        }
-
-        // Cargar servicios (puede fallar si no hay permisos)
-        let servicios = [];
-        try {
-            const serviciosResponse = await fetch(`${API_URL}/servicios/`, { headers });
-            if (serviciosResponse.ok) {
-                servicios = await serviciosResponse.json();
-            } else {
-                console.log('Error al cargar servicios. Status:', serviciosResponse.status);
-                const errorData = await serviciosResponse.text();
-                console.log('Detalle:', errorData);
+        // Resumen calculado en el servidor (una sola consulta)
+        const resumenResponse = await fetch(`${API_URL}/dashboard/resumen`, { headers });
+
+        if (!resumenResponse.ok) {
+            console.log('Error al cargar resumen del dashboard. Status:', resumenResponse.status);
+            const errorData = await resumenResponse.text();
+            console.log('Detalle:', errorData);
+
+            // Si el token expiró, redirigir al login
+            if (resumenResponse.status === 401) {
+                console.log('Token expirado, redirigiendo al login...');
+                localStorage.removeItem('token');
+                localStorage.removeItem('usuario');
+                localStorage.removeItem('isLoggedIn');
+                showWarning('Tu sesión ha expirado. Por favor inicia sesión nuevamente.', 'Sesión expirada');
+                setTimeout(() => {
+                    window.location.href = '/login';
+                }, 2000);
+                return;
             }
-        } catch (e) {
-            console.log('No se pudieron cargar servicios:', e);
+            throw new Error(`Error ${resumenResponse.status} al cargar el resumen`);
         }
 
-        // Asegurar que sean arrays
-        const productosArray = Array.isArray(productos) ? productos : [];
-        const ventasArray = Array.isArray(ventas) ? ventas : [];
-        const serviciosArray = Array.isArray(servicios) ? servicios : [];
-
-        // Calcular estadísticas
-        const ingresosVentas = calcularIngresosMes(ventasArray);
-        const ingresosServicios = calcularIngresosServiciosMes(serviciosArray);
+        const resumen = await resumenResponse.json();
 
         const estadisticas = {
-            totalProductos: productosArray.length,
-            stockBajo: productosArray.filter(p => p.stock_bajo === true || p.cantidad <= 5).length,
-            ventasHoy: filtrarVentasHoy(ventasArray).length,
-            totalVentas: ventasArray.length,
-            serviciosPendientes: serviciosArray.filter(s => s.estado === 'En reparacion').length,
-            ingresosMes: ingresosVentas + ingresosServicios,
-            ingresosVentas: ingresosVentas,
-            ingresosServicios: ingresosServicios,
-            productoMasVendido: obtenerProductoMasVendido(ventasArray)
+            totalProductos: resumen.total_productos,
+            stockBajo: resumen.stock_bajo,
+            ventasHoy: resumen.ventas_hoy,
+            totalVentas: resumen.total_ventas,
+            serviciosPendientes: resumen.servicios_pendientes,
+            ingresosMes: parseFloat(resumen.ingresos_mes || 0),
+            ingresosVentas: parseFloat(resumen.ingresos_ventas_mes || 0),
+            ingresosServicios: parseFloat(resumen.ingresos_servicios_mes || 0),
+            productoMasVendido: resumen.producto_mas_vendido
         };
 
         mostrarEstadisticas(estadisticas);
-        crearGraficaVentasDiarias(ventasArray);
+        crearGraficaVentasDiarias(resumen.ventas_por_dia || []);
 
     } catch (error) {
         console.error('Error al cargar estadísticas:', error);
@@ -107,86 +76,6 @@ async function cargarEstadisticasDashboard() {
     }
 }
 
-// Filtrar ventas de hoy
-function filtrarVentasHoy(ventas) {
-    const hoy = new Date();
-    hoy.setHours(0, 0, 0, 0);
-
-    return ventas.filter(venta => {
-        const fechaVenta = new Date(venta.fecha_venta);
-        fechaVenta.setHours(0, 0, 0, 0);
-        return fechaVenta.getTime() === hoy.getTime();
-    });
-}
-
-// Calcular ingresos del mes actual
-function calcularIngresosMes(ventas) {
-    const ahora = new Date();
-    const mesActual = ahora.getMonth();
-    const añoActual = ahora.getFullYear();
-
-    return ventas
-        .filter(venta => {
-            const fecha = new Date(venta.fecha_venta);
-            return fecha.getMonth() === mesActual && fecha.getFullYear() === añoActual;
-        })
-        .reduce((total, venta) => total + parseFloat(venta.total), 0);
-}
-
-// Calcular ingresos de servicios del mes actual
-function calcularIngresosServiciosMes(servicios) {
-    const ahora = new Date();
-    const mesActual = ahora.getMonth();
-    const añoActual = ahora.getFullYear();
-
-    return servicios
-        .filter(servicio => {
-            // Solo contar servicios que estén pagados
-            if (!servicio.pagado) return false;
-
-            const fecha = new Date(servicio.fecha_ingreso || servicio.fecha_creacion);
-            return fecha.getMonth() === mesActual && fecha.getFullYear() === añoActual;
-        })
-        .reduce((total, servicio) => total + parseFloat(servicio.costo || 0), 0);
-}
-
-// Obtener producto más vendido
-function obtenerProductoMasVendido(ventas) {
-    const conteo = {};
-    const productosInfo = {}; // Guardar info completa del producto
-
-    ventas.forEach(venta => {
-        if (venta.productos && Array.isArray(venta.productos)) {
-            venta.productos.forEach(item => {
-                const id = item.id_producto || item.id;
-                if (id) {
-                    if (!conteo[id]) {
-                        conteo[id] = 0;
-                        productosInfo[id] = {
-                            nombre: item.nombre || 'Producto',
-                            imagen_url: item.imagen_url || null
-                        };
-                    }
-                    conteo[id] += (item.cantidad || 1);
-                }
-            });
-        }
-    });
-
-    const entries = Object.entries(conteo);
-    if (entries.length === 0) return { nombre: 'N/A', cantidad: 0, imagen_url: null };
-
-    const [id, cantidad] = entries.reduce((max, current) =>
-        current[1] > max[1] ? current : max
-    );
-
-    return {
-        nombre: productosInfo[id].nombre,
-        cantidad,
-        imagen_url: productosInfo[id].imagen_url
-    };
-}
-
 // Mostrar estadísticas en el dashboard
 function mostrarEstadisticas(stats) {
     // Actualizar tarjetas de estadísticas
@@ -228,48 +117,24 @@ function mostrarEstadisticas(stats) {
     }
 }
 
-// Crear gráfica de ventas diarias (últimos 7 días)
-function crearGraficaVentasDiarias(ventas) {
-    // Obtener los últimos 7 días
-    const hoy = new Date();
-    const dias = [];
+// Crear gráfica de ventas diarias (serie calculada por el servidor)
+function crearGraficaVentasDiarias(ventasPorDia) {
     const labels = [];
-    const ventasPorDia = {};
-    const ingresosPorDia = {};
-
-    // Inicializar los últimos 7 días
-    for (let i = 6; i >= 0; i--) {
-        const fecha = new Date(hoy);
-        fecha.setDate(fecha.getDate() - i);
-        fecha.setHours(0, 0, 0, 0);
+    const dataVentas = [];
+    const dataIngresos = [];
 
-        const fechaStr = fecha.toISOString().split('T')[0];
-        dias.push(fechaStr);
+    ventasPorDia.forEach(punto => {
+        // La fecha llega como YYYY-MM-DD; se interpreta en hora local
+        const fecha = new Date(`${punto.fecha}T00:00:00`);
 
         // Formatear etiqueta (ej: "Lun 10")
         const opciones = { weekday: 'short', day: 'numeric' };
         labels.push(fecha.toLocaleDateString('es', opciones));
 
-        ventasPorDia[fechaStr] = 0;
-        ingresosPorDia[fechaStr] = 0;
-    }
-
-    // Contar ventas e ingresos por día
-    ventas.forEach(venta => {
-        const fechaVenta = new Date(venta.fecha_venta);
-        fechaVenta.setHours(0, 0, 0, 0);
-        const fechaStr = fechaVenta.toISOString().split('T')[0];
-
-        if (ventasPorDia.hasOwnProperty(fechaStr)) {
-            ventasPorDia[fechaStr]++;
-            ingresosPorDia[fechaStr] += parseFloat(venta.total || 0);
-        }
+        dataVentas.push(punto.ventas);
+        dataIngresos.push(parseFloat(punto.ingresos || 0));
     });
 
-    // Preparar datos para la gráfica
-    const dataVentas = dias.map(dia => ventasPorDia[dia]);
-    const dataIngresos = dias.map(dia => ingresosPorDia[dia]);
-
     // Destruir gráfica anterior si existe
     if (ventasDiariasChart) {
         ventasDiariasChart.destroy();